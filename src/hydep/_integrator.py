@@ -1,13 +1,16 @@
 from abc import ABC, abstractmethod
 import logging
 import numbers
+from collections import namedtuple
 from collections.abc import Mapping
 import copy
 import pathlib
 import os
+import pickle
 import configparser
 import typing
 import tempfile
+import time
 import warnings
 
 import numpy
@@ -19,10 +22,18 @@ from .settings import Settings
 from .lib import HighFidelitySolver, ReducedOrderSolver, BaseStore
 from .typed import TypedAttr
 from .constants import SECONDS_PER_DAY
-from .internal import DataBank, compBundleFromMaterials, TimeStep
+from .internal import DataBank, compBundleFromMaterials, TimeStep, CompBundle
+from .internal.timing import TIMER
+from .internal.memory import MemoryTracker
+from .internal.hooks import HookDispatcher
 
 __logger__ = logging.getLogger("hydep")
 
+# Which compositions are written to the store, and how they are reduced
+_CompositionOutput = namedtuple(
+    "_CompositionOutput", "steps isotopes isotopeIndex weights"
+)
+
 
 class Integrator(ABC):
     """Base class for time integration
@@ -77,9 +88,36 @@ class Integrator(ABC):
     settings : hydep.Settings
         Simulation settings. Can be updated directly, or
         through :meth:`configure`
+    checkpointFile : pathlib.Path
+        Location of the checkpoint used to resume the simulation
+    hooks : hydep.internal.HookDispatcher
+        Callbacks for events during :meth:`integrate`
+
+    Notes
+    -----
+    Callbacks can be added to :attr:`hooks` to monitor, or stop, the
+    simulation without modifying this class, e.g.
+    ``integrator.hooks.add("after_transport", func)``. Each is passed
+    a :class:`hydep.internal.HookEvent` with read-only views of the
+    current data. The following events are emitted
+
+    * ``before_hf_solve`` - Prior to each high-fidelity solution, with
+      the compositions to be used
+    * ``after_transport`` - Following every transport solution,
+      high-fidelity or reduced order, with the result
+    * ``after_deplete`` - Following every depletion step, with the
+      end of step compositions
+    * ``after_store`` - After the :attr:`store` writes a transport
+      result or compositions, with the data that were written
+    * ``step_complete`` - After each coarse step, and the final
+      transport solution, with the most recent result and
+      compositions
 
     """
 
+    CHECKPOINT = "hydep-checkpoint.pkl"
+    _CHECKPOINT_VERSION = 1
+
     model = TypedAttr("model", Model)
     hf = TypedAttr("hf", HighFidelitySolver)
     ro = TypedAttr("ro", ReducedOrderSolver)
@@ -96,6 +134,8 @@ class Integrator(ABC):
         self.store = store
         self.settings = Settings()
         self._xs = None
+        self._compOutput = None
+        self.hooks = HookDispatcher()
 
     @abstractmethod
     def __call__(
@@ -155,7 +195,7 @@ class Integrator(ABC):
             )
         self._store = value
 
-    def beforeMain(self):
+    def beforeMain(self, append=False):
         """Perform the necessary setup steps before the main sequence
 
         Not required to be called by the user, and may go private.
@@ -168,6 +208,13 @@ class Integrator(ABC):
         necessary. If ``rundir`` is ``None``, it will be assigned
         as the base directory.
 
+        Parameters
+        ----------
+        append : bool, optional
+            If :attr:`store` is not provided, create a
+            :class:`hydep.hdf.Store` that appends to existing
+            results. Used when resuming from a checkpoint
+
         """
         __logger__.debug("Executing pre-solution routines")
 
@@ -181,16 +228,23 @@ class Integrator(ABC):
             filename = self.settings.basedir / "hydep-results.h5"
             __logger__.debug("Storing result in %s", filename)
 
-            self.store = Store(filename=filename)
+            self.store = Store(filename=filename, append=append)
+
+        ntransport = sum(self.dep.substeps) + 1
+        self._compOutput, burnableIndexes = self._setupCompositionOutput()
+        storeKwargs = {}
+        if len(self._compOutput.steps) < ntransport:
+            # Only passed if needed to support stores written prior
+            # to composition decimation
+            storeKwargs["compositionSteps"] = sorted(self._compOutput.steps)
 
         self.store.beforeMain(
             nhf=len(self.dep.timesteps) + 1,
-            ntransport=sum(self.dep.substeps) + 1,
+            ntransport=ntransport,
             ngroups=1,
-            isotopes=tuple(self.dep.chain),
-            burnableIndexes=[
-                (m.id, m.name, m.volume) for m in self.dep.burnable
-            ],
+            isotopes=self._compOutput.isotopes,
+            burnableIndexes=burnableIndexes,
+            **storeKwargs,
         )
 
         self._xs = DataBank(
@@ -200,16 +254,136 @@ class Integrator(ABC):
             self.settings.fittingOrder,
         )
 
-    def integrate(self, initialDays=0):
+    def _setupCompositionOutput(self):
+        """Determine which compositions are written to :attr:`store`
+
+        Uses :attr:`hydep.Settings.compositionInterval`,
+        :attr:`hydep.Settings.compositionIsotopes`, and
+        :attr:`hydep.Settings.aggregateCompositions`
+
+        Returns
+        -------
+        _CompositionOutput
+            Time steps where compositions are written, the isotopes
+            written and their positions in the depletion chain, and
+            volume fractions if compositions are aggregated
+        list of (int, str, float)
+            Material id, name, and volume for each set of compositions
+            written. A single material with id ``-1`` and the total
+            burnable volume if compositions are aggregated
+
+        Raises
+        ------
+        ValueError
+            If an isotope in
+            :attr:`hydep.Settings.compositionIsotopes` is not found in
+            the depletion chain
+
+        """
+        isotopes = tuple(self.dep.chain)
+        burnableIndexes = [(m.id, m.name, m.volume) for m in self.dep.burnable]
+
+        isoIndex = None
+        if self.settings.compositionIsotopes is not None:
+            positions = {iso.name: ix for ix, iso in enumerate(isotopes)}
+            missing = [
+                n for n in self.settings.compositionIsotopes if n not in positions
+            ]
+            if missing:
+                raise ValueError(
+                    f"Composition isotopes {', '.join(missing)} not found in "
+                    "depletion chain"
+                )
+            isoIndex = numpy.array(
+                [positions[n] for n in self.settings.compositionIsotopes], dtype=int
+            )
+            isotopes = tuple(isotopes[ix] for ix in isoIndex)
+
+        weights = None
+        if self.settings.aggregateCompositions:
+            volumes = numpy.array([b[2] for b in burnableIndexes], dtype=float)
+            weights = volumes / volumes.sum()
+            burnableIndexes = [(-1, "aggregate", volumes.sum())]
+
+        # Compositions are always written at the start of each coarse
+        # step and at the final step
+        interval = self.settings.compositionInterval
+        steps = [0]
+        start = 0
+        for nsubsteps in self.dep.substeps:
+            for substep in range(1, nsubsteps):
+                if interval and not substep % interval:
+                    steps.append(start + substep)
+            start += nsubsteps
+            steps.append(start)
+
+        output = _CompositionOutput(frozenset(steps), isotopes, isoIndex, weights)
+        return output, burnableIndexes
+
+    def _writeCompositions(self, timestep, compositions):
+        """Write compositions to :attr:`store` if requested by the settings"""
+        with self._phase("store", timestep):
+            written = self._storeCompositions(timestep, compositions)
+        if written:
+            self.hooks.emit("after_store", timestep, compositions=compositions)
+
+    def _storeCompositions(self, timestep, compositions) -> bool:
+        self.timer.noteArray("compositions", numpy.asarray(compositions.densities))
+        output = self._compOutput
+        if output is None:
+            self.store.writeCompositions(timestep, compositions)
+            return True
+        if timestep.total not in output.steps:
+            return False
+        if output.isotopeIndex is None and output.weights is None:
+            self.store.writeCompositions(timestep, compositions)
+            return True
+
+        densities = numpy.asarray(compositions.densities)
+        if output.isotopeIndex is not None:
+            densities = densities[:, output.isotopeIndex]
+        if output.weights is not None:
+            densities = output.weights.dot(densities)[numpy.newaxis]
+        self.store.writeCompositions(
+            timestep, CompBundle(output.isotopes, densities)
+        )
+        return True
+
+    def integrate(self, initialDays=0, restart=False):
         """Launch the coupled sequence and hold your breath
 
+        If :attr:`hydep.Settings.checkpointInterval` is positive, the
+        state of the simulation is written to :attr:`CHECKPOINT` in
+        :attr:`hydep.Settings.basedir` following the high-fidelity
+        solution at every ``checkpointInterval`` coarse steps. Passing
+        ``restart=True`` resumes from this checkpoint, without repeating
+        the high-fidelity solutions that preceded it. Results are
+        appended to the existing store, so a user-provided
+        :attr:`store` must be created to do so, e.g.
+        ``hydep.hdf.Store(append=True)``.
+
+        Wall and CPU time spent in each phase, e.g. transport
+        solutions, depletion, and writing results, are recorded at
+        each time step in :attr:`timer`. These are passed to
+        :meth:`hydep.lib.BaseStore.writeTimings` and summarized
+        through the logger once the sequence completes or fails.
+        Events are dispatched to :attr:`hooks` throughout, and any
+        exception raised by a hook stops the simulation.
+        If :attr:`hydep.Settings.trackMemory` is true, the peak
+        memory in each phase and the size of the largest arrays are
+        also recorded, and passed to
+        :meth:`hydep.lib.BaseStore.writeMemory`.
+
         Parameters
         ----------
         initialDays : float, optional
             Non-negative number indicating the starting day. Defaults
             to zero.  Useful for jumping into the middle of a schedule.
             Primarily for cosmetic changes (e.g. logging, storing in
-            :attr:`store`)
+            :attr:`store`). Ignored if ``restart`` is true
+        restart : bool, optional
+            Resume from the checkpoint in
+            :attr:`hydep.Settings.basedir`
 
         Raises
         ------
@@ -225,6 +399,11 @@ class Integrator(ABC):
         hydep.IncompatibilityError
             If :attr:`hf` is not compatible with :attr:`dep` or
             :attr:`ro`
+        FileNotFoundError
+            If ``restart`` is true and no checkpoint was found
+        ValueError
+            If the checkpoint is not consistent with the current
+            depletion schedule or chain
 
         """
         if not isinstance(initialDays, numbers.Real):
@@ -241,6 +420,8 @@ class Integrator(ABC):
         if not basedir.is_dir():
             basedir.mkdir(parents=True)
 
+        checkpoint = self._readCheckpoint() if restart else None
+
         rundir = self.settings.rundir
         tempdir = None
         if rundir is None:
@@ -255,74 +436,200 @@ class Integrator(ABC):
         previousDir = pathlib.Path.cwd()
 
         success = False
+        self.timer.reset()
+        if self.settings.trackMemory:
+            self.timer.memory = MemoryTracker()
+            self.timer.memory.start()
+        start = time.perf_counter()
 
         try:
             os.chdir(self.settings.rundir)
-            self.beforeMain()
+            with self.timer.phase("beforeMain"):
+                self.beforeMain(append=checkpoint is not None)
 
             # Context manager?
             self._locked = True
-            self._mainsequence(initialDays * SECONDS_PER_DAY)
+            self._mainsequence(initialDays * SECONDS_PER_DAY, checkpoint)
+            # Wait for, and raise errors from, asynchronous hooks
+            self.hooks.close()
             success = True
         finally:
-            self.hf.finalize(success)
-            self.ro.finalize(success)
-            self._locked = False
-            os.chdir(previousDir)
-            if tempdir is not None:
-                tempdir.cleanup()
-                self.settings.rundir = None
-
-    def _mainsequence(self, startSeconds):
-        compositions = compBundleFromMaterials(
-            self.dep.burnable, tuple(self.dep.chain)
-        )
-        timestep = TimeStep(currentTime=startSeconds)
-        self.store.writeCompositions(timestep, compositions)
-
-        # Run first solution to get information on micro xs
-
-        __logger__.info(
-            "Executing %s step 0 Time %.4E [d]",
-            type(self.hf).__name__, startSeconds / SECONDS_PER_DAY,
-        )
-        result = self.hf.bosSolve(compositions, timestep, self.dep.powers[0])
-        __logger__.info("   k =  %.6f +/- %.6E", result.keff[0], result.keff[1])
-        self.store.postTransport(timestep, result)
-        if numpy.less(result.flux, 0).any():
-            raise FailedSolverError(f"Negative fluxes obtained at {timestep}")
-        self.ro.processBOS(result, timestep, self.dep.powers[0])
+            if not success:
+                try:
+                    self.hooks.close()
+                except Exception as ee:
+                    __logger__.error("Hook failed after simulation error: %s", ee)
+            __logger__.info(
+                "Time spent in each phase\n%s",
+                self.timer.summary(total=time.perf_counter() - start),
+            )
+            memory = self.timer.memory
+            if memory is not None:
+                memory.stop()
+                self.timer.memory = None
+                __logger__.info(
+                    "Peak memory %.2f MiB\n%s",
+                    memory.peak / 2**20,
+                    self.timer.memorySummary(),
+                )
+            try:
+                self._finalize(success, memory is not None)
+            finally:
+                self._locked = False
+                os.chdir(previousDir)
+                if tempdir is not None:
+                    tempdir.cleanup()
+                    self.settings.rundir = None
+
+    def _finalize(self, success, withMemory):
+        """Write timings and finalize the store and solvers
+
+        Each solver and the store is finalized even if a previous
+        step raises an error
+        """
+        try:
+            if self.store is not None:
+                try:
+                    self.store.writeTimings(self.timer.toArrays())
+                    if withMemory:
+                        self.store.writeMemory(
+                            self.timer.peakMemory(), self.timer.largestArrays()
+                        )
+                finally:
+                    self.store.finalize(success)
+        finally:
+            try:
+                self.hf.finalize(success)
+            finally:
+                self.ro.finalize(success)
 
-        self._xs.push(startSeconds, result.microXS)
+    @property
+    def timer(self):
+        """Shared :class:`hydep.internal.PhaseTimer` used during :meth:`integrate`"""
+        return TIMER
 
-        fissionYields = result.fissionYields
+    def _phase(self, name, timestep):
+        """Time a phase, attributing it to ``timestep``"""
+        self.timer.step = timestep.total
+        return self.timer.phase(name)
 
-        dtSeconds = self.dep.timesteps[0] / self.dep.substeps[0]
-        result, compositions = self._marchSubstep(
-            timestep, self._xs, result, fissionYields, dtSeconds, compositions
-        )
+    @property
+    def checkpointFile(self) -> pathlib.Path:
+        """Location of the checkpoint written and read by :meth:`integrate`"""
+        return self.settings.basedir / self.CHECKPOINT
 
-        # Go from second step to final step
+    def _writeCheckpoint(self, timestep, compositions, result):
+        """Write the state following the high-fidelity solution at ``timestep``
 
-        for coarseIndex, (coarseDT, power) in enumerate(
-            zip(self.dep.timesteps[1:], self.dep.powers[1:]), start=1
+        The store is flushed first so all results up to this point
+        are written. The file is replaced atomically so an interrupted
+        write does not corrupt a previous checkpoint
+        """
+        with self._phase("checkpoint", timestep):
+            self._dumpCheckpoint(timestep, compositions, result)
+
+    def _dumpCheckpoint(self, timestep, compositions, result):
+        self.store.flush()
+        state = {
+            "version": self._CHECKPOINT_VERSION,
+            "timesteps": list(self.dep.timesteps),
+            "substeps": list(self.dep.substeps),
+            "timestep": (
+                timestep.coarse, timestep.substep, timestep.total,
+                timestep.currentTime,
+            ),
+            "zais": [iso.zai for iso in compositions.isotopes],
+            "densities": numpy.asarray(compositions.densities),
+            "result": result,
+            "xs": self._xs,
+            "hf": self.hf.checkpoint(),
+            "ro": self.ro.checkpoint(),
+        }
+        dest = self.checkpointFile
+        with tempfile.NamedTemporaryFile(
+            "wb", dir=dest.parent, suffix=".tmp", delete=False
+        ) as stream:
+            pickle.dump(state, stream, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(stream.name, dest)
+        __logger__.debug("Wrote checkpoint at %s to %s", timestep, dest)
+
+    def _readCheckpoint(self):
+        src = self.checkpointFile
+        if not src.is_file():
+            raise FileNotFoundError(f"No checkpoint found at {src}")
+        with src.open("rb") as stream:
+            state = pickle.load(stream)
+
+        if state.get("version") != self._CHECKPOINT_VERSION:
+            raise ValueError(
+                f"Found checkpoint version {state.get('version')} in {src}, "
+                f"expected {self._CHECKPOINT_VERSION}"
+            )
+        if (
+            state["substeps"] != list(self.dep.substeps)
+            or not numpy.allclose(state["timesteps"], self.dep.timesteps)
         ):
-            __logger__.info(
-                "Executing %s step %d Time %.4E [d]",
-                type(self.hf).__name__, coarseIndex,
-                timestep.currentTime / SECONDS_PER_DAY,
+            raise ValueError(
+                f"Checkpoint {src} was written with a different depletion schedule"
             )
+        if state["zais"] != [iso.zai for iso in self.dep.chain]:
+            raise ValueError(
+                f"Checkpoint {src} was written with a different depletion chain"
+            )
+        return state
+
+    def _restoreCheckpoint(self, state):
+        """Restore solvers and return the time step, compositions, and result"""
+        self._xs = state["xs"]
+        self.hf.restore(state["hf"])
+        self.ro.restore(state["ro"])
+        timestep = TimeStep(*state["timestep"])
+        compositions = CompBundle(tuple(self.dep.chain), state["densities"])
+        __logger__.info("Resuming from checkpoint at %s", timestep)
+        return timestep, compositions, state["result"]
+
+    def _bosSolve(self, timestep, compositions, power):
+        """Perform and process the high-fidelity solution at ``timestep``"""
+        __logger__.info(
+            "Executing %s step %d Time %.4E [d]",
+            type(self.hf).__name__, timestep.coarse,
+            timestep.currentTime / SECONDS_PER_DAY,
+        )
+        self.hooks.emit("before_hf_solve", timestep, compositions=compositions)
+        with self._phase("hf.solve", timestep):
             result = self.hf.bosSolve(compositions, timestep, power)
-            __logger__.info("   k =  %.6f +/- %.6E", result.keff[0], result.keff[1])
+        __logger__.info("   k =  %.6f +/- %.6E", result.keff[0], result.keff[1])
+        self._postTransport(timestep, result)
+        with self._phase("ro.processBOS", timestep):
             self.ro.processBOS(result, timestep, power)
-            self.store.postTransport(timestep, result)
 
-            self._xs.push(timestep.currentTime, result.microXS)
+        self._xs.push(timestep.currentTime, result.microXS)
+        return result
+
+    def _mainsequence(self, startSeconds, checkpoint=None):
+        if checkpoint is None:
+            compositions = compBundleFromMaterials(
+                self.dep.burnable, tuple(self.dep.chain)
+            )
+            timestep = TimeStep(currentTime=startSeconds)
+            self._writeCompositions(timestep, compositions)
+            result = None
+        else:
+            timestep, compositions, result = self._restoreCheckpoint(checkpoint)
+
+        interval = self.settings.checkpointInterval
+
+        for coarseIndex in range(timestep.coarse, len(self.dep.timesteps)):
+            coarseDT = self.dep.timesteps[coarseIndex]
+            # Result is only present when resuming from a checkpoint
+            if result is None:
+                power = self.dep.powers[coarseIndex]
+                result = self._bosSolve(timestep, compositions, power)
+                if interval and not coarseIndex % interval:
+                    self._writeCheckpoint(timestep, compositions, result)
 
-            # Substeps
-            # TODO Zip all three?
             dtSeconds = coarseDT / self.dep.substeps[coarseIndex]
-            result, compositions = self._marchSubstep(
+            lastResult, compositions = self._marchSubstep(
                 timestep,
                 self._xs,
                 result,
@@ -330,6 +637,10 @@ class Integrator(ABC):
                 dtSeconds,
                 compositions,
             )
+            self.hooks.emit(
+                "step_complete", timestep, result=lastResult, compositions=compositions
+            )
+            result = None
 
         # Final transport solution
         __logger__.info(
@@ -337,9 +648,23 @@ class Integrator(ABC):
             type(self.hf).__name__, timestep.coarse,
             timestep.currentTime / SECONDS_PER_DAY,
         )
-        result = self.hf.eolSolve(compositions, timestep, self.dep.powers[-1])
+        self.hooks.emit("before_hf_solve", timestep, compositions=compositions)
+        with self._phase("hf.solve", timestep):
+            result = self.hf.eolSolve(compositions, timestep, self.dep.powers[-1])
         __logger__.info("   k =  %.6f +/- %.6E", result.keff[0], result.keff[1])
-        self.store.postTransport(timestep, result)
+        self._postTransport(timestep, result)
+        self.hooks.emit(
+            "step_complete", timestep, result=result, compositions=compositions
+        )
+
+    def _postTransport(self, timestep, result):
+        """Store a transport result and check for negative fluxes"""
+        if result.microXS is not None:
+            self.timer.noteArray("microXS", result.microXS.data)
+        self.hooks.emit("after_transport", timestep, result=result)
+        with self._phase("store", timestep):
+            self.store.postTransport(timestep, result)
+        self.hooks.emit("after_store", timestep, result=result)
         if numpy.less(result.flux, 0).any():
             raise FailedSolverError(f"Negative fluxes obtained at {timestep}")
 
@@ -388,32 +713,33 @@ class Integrator(ABC):
             if substepIndex and result.fissionYields is not None:
                 fissionYields = result.fissionYields
 
-            compositions = self(
-                timestep, substepDT, compositions, result.flux, fissionYields,
-            )
+            with self._phase("scheme", timestep):
+                compositions = self(
+                    timestep, substepDT, compositions, result.flux, fissionYields,
+                )
 
             timestep += substepDT
-            self.store.writeCompositions(timestep, compositions)
+            self.hooks.emit("after_deplete", timestep, compositions=compositions)
+            self._writeCompositions(timestep, compositions)
             microXS = xsmachine.at(timestep.currentTime)
 
             __logger__.info(
                 "Executing %s for substep %d",
                 type(self.ro).__name__, substepIndex,
             )
-            result = self.ro.substepSolve(timestep, compositions, microXS)
+            with self._phase("ro.solve", timestep):
+                result = self.ro.substepSolve(timestep, compositions, microXS)
             if not numpy.isnan(result.keff).all():
                 __logger__.info("   k =  %.6f +/- %.6E", result.keff[0], result.keff[1])
-            self.store.postTransport(timestep, result)
-            if numpy.less(result.flux, 0).any():
-                raise FailedSolverError(
-                    f"Negative fluxes obtained at {timestep}"
-                )
+            self._postTransport(timestep, result)
 
-        compositions = self(
-            timestep, substepDT, compositions, result.flux, fissionYields,
-        )
+        with self._phase("scheme", timestep):
+            compositions = self(
+                timestep, substepDT, compositions, result.flux, fissionYields,
+            )
         timestep.increment(substepDT, coarse=True)
-        self.store.writeCompositions(timestep, compositions)
+        self.hooks.emit("after_deplete", timestep, compositions=compositions)
+        self._writeCompositions(timestep, compositions)
 
         return result, compositions
 
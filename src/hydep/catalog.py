@@ -0,0 +1,403 @@
+"""
+Index and query collections of HDF result files
+
+Requires :mod:`h5py` through :mod:`hydep.hdf`
+"""
+import os
+import json
+import pathlib
+import hashlib
+import logging
+import tempfile
+import functools
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+
+from .hdf import Processor, HdfAttrs
+
+__all__ = ["ResultCatalog"]
+
+__logger__ = logging.getLogger("hydep")
+
+
+def _checksum(path, blocksize=2**20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as stream:
+        for block in iter(lambda: stream.read(blocksize), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _tableKey(table):
+    return hashlib.sha1(json.dumps(table, sort_keys=True).encode()).hexdigest()
+
+
+def _summarize(path):
+    """Summary of a single result file. Module-level for process pools"""
+    path = pathlib.Path(path)
+    stat = path.stat()
+    with Processor(path) as processor:
+        hfFlags = processor.hfFlags[:]
+        summary = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "checksum": _checksum(path),
+            "fileVersion": [
+                int(x) for x in processor["/"].attrs[HdfAttrs.V_FORMAT.value]
+            ],
+            "days": processor.days.tolist(),
+            "highFidelity": hfFlags.astype(bool).tolist(),
+            "keff": processor.keff[:].tolist(),
+        }
+        isotopes = {
+            "zais": processor.zais[:].tolist(),
+            "names": list(processor.names),
+        }
+        materials = {
+            "ids": processor["materials/ids"][:].tolist(),
+            "names": [n.decode() for n in processor["materials/names"][:]],
+            "volumes": processor.volumes[:].tolist(),
+        }
+    return summary, isotopes, materials
+
+
+def _applyToRun(func, path):
+    with Processor(path) as processor:
+        return func(processor)
+
+
+def _getDensities(processor, **kwargs):
+    return processor.getDensities(**kwargs)
+
+
+class ResultCatalog(Mapping):
+    """Summary of many result files, with parallel cross-run queries
+
+    Rather than create directly, use :meth:`build` to index a directory
+    or :meth:`load` to read a previously saved catalog. The catalog acts
+    as a mapping from run names, the paths of result files relative to
+    :attr:`root`, to summaries with the following keys:
+
+    * ``"days"`` - list of points in calendar time [d]
+    * ``"highFidelity"`` - list of flags for high-fidelity solutions
+    * ``"keff"`` - list of ``[k, uncertainty]`` pairs
+    * ``"fileVersion"`` - version of the result file
+    * ``"checksum"``, ``"size"``, ``"mtime"`` - SHA-256 checksum, size
+      in bytes and modification time [ns] of the result file
+    * ``"isotopes"`` - key into :attr:`tables` for the isotope table
+      with ``"zais"`` and ``"names"``
+    * ``"materials"`` - key into :attr:`tables` for the material table
+      with ``"ids"``, ``"names"``, and ``"volumes"``
+
+    Isotope and material tables are stored once and shared by all runs
+    with identical tables, keeping the catalog compact.
+
+    Parameters
+    ----------
+    root : str or pathlib.Path
+        Directory containing the result files
+    runs : dict of str to dict
+        Summaries of each run
+    tables : dict of str to dict
+        Isotope and material tables referenced by the summaries
+
+    Attributes
+    ----------
+    SIDECAR : str
+        Default name of the catalog file written in :attr:`root`
+    root : pathlib.Path
+        Directory containing the result files
+    tables : dict of str to dict
+        Isotope and material tables referenced by the summaries
+
+    """
+
+    SIDECAR = "hydep-catalog.json"
+    _VERSION = 1
+
+    def __init__(self, root, runs, tables):
+        self.root = pathlib.Path(root).resolve()
+        self._runs = dict(runs)
+        self.tables = dict(tables)
+
+    def __getitem__(self, run):
+        return self._runs[run]
+
+    def __iter__(self):
+        return iter(self._runs)
+
+    def __len__(self):
+        return len(self._runs)
+
+    def path(self, run) -> pathlib.Path:
+        """Absolute path to the result file for ``run``"""
+        if run not in self._runs:
+            raise KeyError(run)
+        return self.root / run
+
+    def isotopes(self, run) -> dict:
+        """Isotope table with ``"zais"`` and ``"names"`` for ``run``"""
+        return self.tables[self._runs[run]["isotopes"]]
+
+    def materials(self, run) -> dict:
+        """Material table with ``"ids"``, ``"names"``, and ``"volumes"``"""
+        return self.tables[self._runs[run]["materials"]]
+
+    @classmethod
+    def build(cls, directory, pattern="**/*.h5", sidecar=None, processes=None):
+        """Index all result files in a directory and save the catalog
+
+        Files that have not changed since a previously saved catalog,
+        judged by size and modification time, are not re-read. All
+        other files are summarized in parallel.
+
+        Parameters
+        ----------
+        directory : str or pathlib.Path
+            Directory containing result files
+        pattern : str, optional
+            Glob pattern, relative to ``directory``, matching result
+            files. Default: ``"**/*.h5"``
+        sidecar : str or pathlib.Path, optional
+            Location of the catalog file to read and update. Defaults
+            to :attr:`SIDECAR` inside ``directory``
+        processes : int, optional
+            Number of worker processes. Passing ``1`` summarizes files
+            in this process. Defaults to the number of processors
+
+        Returns
+        -------
+        ResultCatalog
+
+        """
+        directory = pathlib.Path(directory).resolve()
+        if not directory.is_dir():
+            raise NotADirectoryError(f"{directory} is not a directory")
+        sidecar = directory / cls.SIDECAR if sidecar is None else pathlib.Path(sidecar)
+
+        previous = None
+        if sidecar.is_file():
+            try:
+                previous = cls.load(sidecar)
+            except (OSError, ValueError, KeyError) as ee:
+                __logger__.debug("Ignoring bad result catalog %s: %s", sidecar, ee)
+            else:
+                if previous.root != directory:
+                    previous = None
+
+        runs = {}
+        tables = {}
+        pending = []
+        for path in sorted(directory.glob(pattern)):
+            if not path.is_file():
+                continue
+            run = path.relative_to(directory).as_posix()
+            stat = path.stat()
+            old = None if previous is None else previous.get(run)
+            if (
+                old is not None
+                and old["size"] == stat.st_size
+                and old["mtime"] == stat.st_mtime_ns
+            ):
+                runs[run] = old
+                for key in ("isotopes", "materials"):
+                    tables[old[key]] = previous.tables[old[key]]
+            else:
+                pending.append(run)
+
+        __logger__.debug(
+            "Summarizing %d of %d result files in %s",
+            len(pending), len(pending) + len(runs), directory,
+        )
+        paths = [directory / run for run in pending]
+        for run, (summary, isotopes, materials) in zip(
+            pending, cls._map(_summarize, paths, processes)
+        ):
+            for key, table in (("isotopes", isotopes), ("materials", materials)):
+                tkey = _tableKey(table)
+                tables.setdefault(tkey, table)
+                summary[key] = tkey
+            runs[run] = summary
+
+        catalog = cls(directory, dict(sorted(runs.items())), tables)
+        catalog.save(sidecar)
+        return catalog
+
+    @classmethod
+    def load(cls, sidecar):
+        """Read a catalog previously written with :meth:`save`
+
+        Parameters
+        ----------
+        sidecar : str or pathlib.Path
+            Catalog file
+
+        Returns
+        -------
+        ResultCatalog
+
+        """
+        with open(sidecar, "r") as stream:
+            data = json.load(stream)
+        if data.get("version") != cls._VERSION:
+            raise ValueError(
+                f"Found catalog version {data.get('version')} in {sidecar}, "
+                f"expected {cls._VERSION}"
+            )
+        return cls(data["root"], data["runs"], data["tables"])
+
+    def save(self, sidecar=None):
+        """Atomically write the catalog to a JSON file
+
+        Parameters
+        ----------
+        sidecar : str or pathlib.Path, optional
+            Destination. Defaults to :attr:`SIDECAR` in :attr:`root`
+
+        """
+        sidecar = self.root / self.SIDECAR if sidecar is None else pathlib.Path(sidecar)
+        data = {
+            "version": self._VERSION,
+            "root": str(self.root),
+            "runs": self._runs,
+            "tables": self.tables,
+        }
+        with tempfile.NamedTemporaryFile(
+            "w", dir=sidecar.parent, suffix=".tmp", delete=False
+        ) as stream:
+            json.dump(data, stream)
+        os.replace(stream.name, sidecar)
+
+    @staticmethod
+    def _map(func, items, processes):
+        items = list(items)
+        if not items:
+            return []
+        if processes == 1 or len(items) == 1:
+            return [func(item) for item in items]
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            return list(pool.map(func, items))
+
+    def getKeff(self, runs=None, hfOnly=True):
+        """Multiplication factor histories from the catalog
+
+        No result files are read
+
+        Parameters
+        ----------
+        runs : iterable of str, optional
+            Runs of interest. Defaults to all runs
+        hfOnly : bool, optional
+            Only return values from high-fidelity solutions
+
+        Returns
+        -------
+        dict of str to (numpy.ndarray, numpy.ndarray)
+            Map of run to days and ``(N, 2)`` multiplication factors
+            and uncertainties
+
+        """
+        out = {}
+        for run in self._runs if runs is None else runs:
+            summary = self._runs[run]
+            days = numpy.array(summary["days"])
+            keff = numpy.array(summary["keff"]).reshape(-1, 2)
+            if hfOnly:
+                flags = numpy.array(summary["highFidelity"], dtype=bool)
+                days, keff = days[flags], keff[flags]
+            out[run] = days, keff
+        return out
+
+    def map(self, func, runs=None, processes=None):
+        """Apply a function to the :class:`hydep.hdf.Processor` of each run
+
+        Parameters
+        ----------
+        func : callable
+            Function with signature ``func(processor)``. Must be
+            picklable, e.g. defined at module level, when using
+            multiple processes
+        runs : iterable of str, optional
+            Runs of interest. Defaults to all runs
+        processes : int, optional
+            Number of worker processes. Passing ``1`` reads files in
+            this process. Defaults to the number of processors
+
+        Returns
+        -------
+        dict of str to object
+            Return value of ``func`` for each run
+
+        """
+        runs = list(self._runs if runs is None else runs)
+        results = self._map(
+            functools.partial(_applyToRun, func),
+            [self.path(run) for run in runs],
+            processes,
+        )
+        return dict(zip(runs, results))
+
+    def getDensities(
+        self, names=None, zais=None, days=None, materials=None, runs=None,
+        processes=None,
+    ):
+        """Read atom densities from many runs in parallel
+
+        Days and isotopes are checked against the catalog before any
+        result files are opened. Only the requested values are read
+        from each file, see :meth:`hydep.hdf.Processor.getDensities`
+
+        Parameters
+        ----------
+        names : str or iterable of str, optional
+            Isotope name(s) e.g. ``"U235"``
+        zais : int or iterable of int, optional
+            Isotope ZAI identifier(s), e.g. ``922350``
+        days : float or iterable of float, optional
+            Retrieve densities for these points in time
+        materials : int or iterable of int, optional
+            Positions of burnable materials
+        runs : iterable of str, optional
+            Runs of interest. Defaults to all runs
+        processes : int, optional
+            Number of worker processes. Passing ``1`` reads files in
+            this process. Defaults to the number of processors
+
+        Returns
+        -------
+        dict of str to numpy.ndarray
+            Densities for each run
+
+        Raises
+        ------
+        IndexError
+            If a requested day is not found in a run
+        ValueError
+            If a requested isotope is not found in a run
+
+        """
+        runs = list(self._runs if runs is None else runs)
+        for run in runs:
+            self._check(run, names, zais, days)
+        func = functools.partial(
+            _getDensities, names=names, zais=zais, days=days, materials=materials
+        )
+        return self.map(func, runs=runs, processes=processes)
+
+    def _check(self, run, names, zais, days):
+        summary = self._runs[run]
+        if days is not None:
+            known = set(summary["days"])
+            for day in numpy.atleast_1d(days).tolist():
+                if day not in known:
+                    raise IndexError(f"Day {day} not found in {run}")
+        isotopes = self.isotopes(run)
+        for key, requested in (("names", names), ("zais", zais)):
+            if requested is None:
+                continue
+            known = set(isotopes[key])
+            for item in numpy.atleast_1d(requested).tolist():
+                if item not in known:
+                    raise ValueError(f"Isotope {item} not found in {run}")
@@ -19,7 +19,7 @@ import numbers
 import math
 
 import numpy
-from scipy.sparse import dok_matrix
+from scipy.sparse import dok_matrix, coo_matrix
 
 from hydep.internal import (
     getZaiFromName,
@@ -29,6 +29,7 @@ from hydep.internal import (
     getIsotope,
     Isotope,
     FissionYieldDistribution,
+    BankedYields,
     XsIndex,
 )
 from hydep.constants import FISSION_REACTIONS, REACTION_MT_MAP
@@ -158,6 +159,9 @@ class DepletionChain(tuple):
 
             if decayModes:
                 isotope.decayConstant = ln2 / float(child.get("half_life"))
+                decayEnergy = child.get("decay_energy")
+                if decayEnergy:
+                    isotope.decayEnergy = float(decayEnergy)
 
                 for mode in child.iter("decay"):
                     decType = mode.get("type")
@@ -249,9 +253,11 @@ class DepletionChain(tuple):
             to be indexed according to :attr:`reactionIndex`, e.g.
             ``reactionRates[ix]`` corresponds to the isotope and
             reaction located at ``self.reactionIndex[ix]``
-        fissionYields : hydep.internal.FissionYield
+        fissionYields : mapping or hydep.internal.BankedYields
             Fission yields mapping of the form
-            ``{parentZAI: {productZAI: yield}}``
+            ``{parentZAI: {productZAI: yield}}``. Yields taken
+            from a :class:`hydep.internal.FissionYieldBank` will
+            be added to the matrix without iterating over products
         ordering : dict of int to int, optional
             Map describing row and column indices for isotopes. If not
             provided, will sort by increasing ZAI
@@ -267,6 +273,15 @@ class DepletionChain(tuple):
         if ordering is None:
             ordering = indices
 
+        banked = isinstance(fissionYields, BankedYields)
+        if banked:
+            productRows = fissionYields.bank.productRows(ordering)
+            keepProducts = productRows >= 0
+            productRows = productRows[keepProducts]
+            fissionRows = []
+            fissionCols = []
+            fissionData = []
+
         for zai, columnIndex in ordering.items():
 
             myIndex = indices.get(zai)
@@ -284,7 +299,16 @@ class DepletionChain(tuple):
                     continue
                 mtx[columnIndex, columnIndex] -= rate * reaction.branch
 
-                if reaction.mt in FISSION_REACTIONS:
+                if reaction.mt in FISSION_REACTIONS and banked:
+                    yields = fissionYields.getYields(isotope.zai)
+                    if yields is None:
+                        continue
+                    fissionRows.append(productRows)
+                    fissionCols.append(
+                        numpy.full(productRows.size, columnIndex, dtype=int))
+                    fissionData.append(rate * yields[keepProducts])
+
+                elif reaction.mt in FISSION_REACTIONS:
                     yields = fissionYields.get(isotope.zai, {})
                     for product, fyield in yields.items():
                         rowIndex = ordering.get(product)
@@ -313,7 +337,19 @@ class DepletionChain(tuple):
 
         dok = dok_matrix((len(ordering), ) * 2, dtype=reactionRates.data.dtype)
         dict.update(dok, mtx)
-        return dok.tocsr()
+
+        if not banked or not fissionData:
+            return dok.tocsr()
+
+        # Duplicate entries are summed when converting from COO
+        fission = coo_matrix(
+            (
+                numpy.concatenate(fissionData),
+                (numpy.concatenate(fissionRows), numpy.concatenate(fissionCols)),
+            ),
+            shape=dok.shape,
+        )
+        return (dok.tocoo() + fission).tocsr()
 
     @property
     def zaiOrder(self):
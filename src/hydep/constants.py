@@ -35,6 +35,9 @@ Constants
 .. autodata: EV_PER_JOULE
     :annotation:
 
+.. autodata: AVOGADRO
+    :annotation:
+
 """
 
 import enum
@@ -44,6 +47,7 @@ CM2_PER_BARN = 1e-24  # Doc: Number of squared centimeters per barn
 BARN_PER_CM2 = 1 / CM2_PER_BARN  # Doc: Number of barns per squared cm
 JOULES_PER_EV = 1.602176634e-19  # Doc: Joules per EV
 EV_PER_JOULE = 1 / JOULES_PER_EV  # Doc: electron volts per Joule
+AVOGADRO = 6.02214076e23  # Doc: Atoms per mole
 
 
 class REACTION_MTS(enum.IntEnum):
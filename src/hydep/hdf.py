@@ -6,8 +6,9 @@ For the full format, see :ref:`hdf-format`.
 import numbers
 import typing
 import pathlib
+from collections import OrderedDict
 from collections.abc import Mapping
-import bisect
+import time
 from enum import Enum
 
 import numpy
@@ -15,8 +16,11 @@ import h5py
 from scipy.sparse import csr_matrix
 
 import hydep
-from hydep.constants import SECONDS_PER_DAY
+from hydep.constants import (
+    SECONDS_PER_DAY, BARN_PER_CM2, JOULES_PER_EV, AVOGADRO, REACTION_MTS,
+)
 from .store import BaseStore
+from .internal.timing import timed
 
 
 class HdfEnumKeys(Enum):
@@ -62,6 +66,16 @@ class HdfStrings(HdfEnumKeys):
         Key to fission matrix group
     CALENDAR : enum member
         Key to time step group
+    PARTICLES : enum member
+        Key to particles per cycle dataset
+    FLUX_UNCERTAINTY : enum member
+        Key to relative flux uncertainty dataset
+    DERIVED : enum member
+        Key to group of quantities derived from compositions
+    TIMING : enum member
+        Key to group of time spent in each phase of the simulation
+    MEMORY : enum member
+        Key to group of peak memory in each phase of the simulation
 
     """
 
@@ -73,6 +87,11 @@ class HdfStrings(HdfEnumKeys):
     MATERIALS = "materials"
     FISSION_MATRIX = "fissionMatrix"
     CALENDAR = "time"
+    PARTICLES = "particles"
+    FLUX_UNCERTAINTY = "fluxUncertainty"
+    DERIVED = "derived"
+    TIMING = "timing"
+    MEMORY = "memory"
 
     def __truediv__(self, other) -> str:
         """Access subgroups with / separator
@@ -153,6 +172,8 @@ class HdfSubStrings(HdfEnumKeys):
         Key to simulated time dataset
     CALENDAR_HF : enum member
         Key to high fidelity simulation flag dataset
+    CALENDAR_COMPOSITIONS : enum member
+        Key to dataset of time steps with compositions
     ISO_ZAI : enum member
         Key to isotope zai dataset
     ISO_NAMES : enum member
@@ -165,6 +186,7 @@ class HdfSubStrings(HdfEnumKeys):
     MAT_VOLS = "volumes"
     CALENDAR_TIME = "time"
     CALENDAR_HF = "highFidelity"
+    CALENDAR_COMPOSITIONS = "compositionSteps"
     ISO_ZAI = "zais"
     ISO_NAMES = "names"
 
@@ -188,6 +210,11 @@ class HdfAttrs(HdfEnumKeys):
         Key to output file format number
     V_HYDEP : enum member
         Key to hydep version
+    LAST_STEP : enum member
+        Key to index of the most recent time step written to the
+        file. Attached to the calendar time dataset, rather than the
+        root group, so readers in single-writer / multiple-reader
+        mode can refresh it
 
     """
 
@@ -198,6 +225,7 @@ class HdfAttrs(HdfEnumKeys):
     N_ENE_GROUPS = "energyGroups"
     V_FORMAT = "fileVersion"
     V_HYDEP = "hydepVersion"
+    LAST_STEP = "lastWrittenStep"
 
 
 class Store(BaseStore):
@@ -205,6 +233,13 @@ class Store(BaseStore):
 
     Format is described in :`hdf-format`
 
+    The file is opened once in :meth:`beforeMain` and held open until
+    :meth:`close` or :meth:`finalize`. Results passed to
+    :meth:`postTransport` and :meth:`writeCompositions` are buffered
+    in memory and written in batches according to ``flushSteps``
+    and ``flushSeconds``. Data will not be visible to other readers
+    until it is flushed.
+
     Parameters
     ----------
     filename : str, optional
@@ -217,6 +252,46 @@ class Store(BaseStore):
     existOkay : bool, optional
         Raise an error if ``filename`` already exists. Otherwise
         silently overwrite an existing file
+    flushSteps : int, optional
+        Write buffered data once this many time steps have been
+        received. Passing ``1`` writes after every call. Default: 10
+    flushSeconds : float, optional
+        Write buffered data if this many seconds have passed since
+        the last write. Checked when new data are received.
+        Default: 300
+    compression : {None, "gzip", "lzf"}, optional
+        Compression filter applied to the large datasets, e.g.
+        compositions, fluxes, and fission matrices. Default is to
+        not compress
+    compressionOpts : int, optional
+        Compression level for ``"gzip"``, between 0 and 9.
+        Not allowed for other filters
+    shuffle : bool, optional
+        Apply the byte shuffle filter prior to compression, which
+        typically improves compression of floating point data
+    singlePrecision : bool, optional
+        Store compositions, fluxes, flux uncertainties, and fission
+        matrices as 32-bit floats, rather than 64-bit
+    chunkSteps : int, optional
+        Number of time steps per chunk for compositions, fluxes, and
+        flux uncertainties. Larger values speed up time-series reads
+        at the cost of touching more data per write. Defaults to
+        ``flushSteps`` so each flush writes whole chunks
+    chunkIsotopes : int, optional
+        Number of isotopes per chunk for compositions. Smaller values
+        speed up reading the history of a few isotopes. Default: 64
+    swmr : bool, optional
+        Write the file in HDF5 single-writer / multiple-reader mode,
+        allowing other processes to safely read results, e.g. with
+        ``Processor(filename, swmr=True)``, while the simulation is
+        running. All optional datasets are created in
+        :meth:`beforeMain`. Requires ``libver="latest"``
+    append : bool, optional
+        If ``filename`` exists, keep the existing results and continue
+        writing into the file, e.g. when resuming a simulation from a
+        checkpoint. The layout passed to :meth:`beforeMain` must match
+        the existing file. Otherwise an existing file is overwritten,
+        subject to ``existOkay``
 
     Attributes
     ----------
@@ -230,6 +305,29 @@ class Store(BaseStore):
     fp : pathlib.Path
         Read-only attribute with the absolute path of the intended result
         result file
+    flushSteps : int
+        Number of buffered time steps that triggers a write
+    flushSeconds : float
+        Seconds since the previous write that triggers a write
+    compression : str or None
+        Compression filter applied to large datasets
+    compressionOpts : int or None
+        Options passed to the compression filter
+    shuffle : bool
+        Apply the byte shuffle filter to large datasets
+    singlePrecision : bool
+        Store large floating point datasets as 32-bit floats
+    chunkSteps : int or None
+        Time steps per chunk for large time-dependent datasets
+    chunkIsotopes : int
+        Isotopes per chunk for compositions
+    swmr : bool
+        File is written in single-writer / multiple-reader mode
+    append : bool
+        Results are appended to an existing file
+    lastWrittenStep : int
+        Index of the most recent time step written to the file, or
+        ``-1`` if nothing has been written
 
     Raises
     ------
@@ -238,16 +336,31 @@ class Store(BaseStore):
     FileExistsError
         If ``filename`` exists, is a file, and ``existOkay``
         evaluates to ``False``.
+    ValueError
+        If the compression, flushing, or chunking options are
+        not supported, or if appending to a file with an
+        incompatible version
 
     """
 
-    _VERSION = (0, 1)
+    _VERSION = (1, 1)
+    _COMPRESSION = {None, "gzip", "lzf"}
 
     def __init__(
         self,
         filename: typing.Optional[str] = None,
         libver: typing.Optional[str] = None,
         existOkay: typing.Optional[bool] = True,
+        flushSteps: typing.Optional[int] = 10,
+        flushSeconds: typing.Optional[float] = 300,
+        compression: typing.Optional[str] = None,
+        compressionOpts: typing.Optional[int] = None,
+        shuffle: typing.Optional[bool] = False,
+        singlePrecision: typing.Optional[bool] = False,
+        chunkSteps: typing.Optional[int] = None,
+        chunkIsotopes: typing.Optional[int] = 64,
+        swmr: typing.Optional[bool] = False,
+        append: typing.Optional[bool] = False,
     ):
 
         if libver is None:
@@ -256,22 +369,76 @@ class Store(BaseStore):
         if filename is None:
             filename = "hydep-results.h5"
 
+        if not isinstance(flushSteps, numbers.Integral) or flushSteps < 1:
+            raise ValueError(f"flushSteps must be positive integer, not {flushSteps}")
+        if not isinstance(flushSeconds, numbers.Real) or flushSeconds < 0:
+            raise ValueError(
+                f"flushSeconds must be non-negative real, not {flushSeconds}"
+            )
+        if swmr and libver != "latest":
+            raise ValueError(f"SWMR mode requires libver='latest', not {libver}")
+        if compression not in self._COMPRESSION:
+            raise ValueError(
+                f"Compression must be one of {self._COMPRESSION}, not {compression}"
+            )
+        if compressionOpts is not None and compression != "gzip":
+            raise ValueError(
+                f"Compression options only supported for gzip, not {compression}"
+            )
+        for name, value in (
+            ("chunkSteps", chunkSteps), ("chunkIsotopes", chunkIsotopes)
+        ):
+            if value is None and name == "chunkSteps":
+                continue
+            if not isinstance(value, numbers.Integral) or value < 1:
+                raise ValueError(f"{name} must be positive integer, not {value}")
+
         fp = pathlib.Path(filename).resolve()
 
+        append = bool(append) and fp.exists()
         if fp.exists():
             if not fp.is_file():
                 raise OSError(f"Result file {fp} exists but is not a file")
-            if not existOkay:
+            if not existOkay and not append:
                 raise FileExistsError(
                     f"Refusing to overwrite result file {fp} since existOkay is True"
                 )
 
-        with h5py.File(fp, mode="w", libver=libver) as h5f:
-            h5f.attrs[HdfAttrs.V_FORMAT] = self.VERSION
-            h5f.attrs[HdfAttrs.V_HYDEP] = tuple(
-                int(x) for x in hydep.__version__.split(".")[:3]
-            )
+        if append:
+            with h5py.File(fp, mode="r") as h5f:
+                version = h5f.attrs.get(HdfAttrs.V_FORMAT.value)
+            if version is None or tuple(version) != self.VERSION:
+                raise ValueError(
+                    f"Cannot append to {fp} with file version {version}, "
+                    f"expected {self.VERSION}"
+                )
+        else:
+            with h5py.File(fp, mode="w", libver=libver) as h5f:
+                h5f.attrs[HdfAttrs.V_FORMAT] = self.VERSION
+                h5f.attrs[HdfAttrs.V_HYDEP] = tuple(
+                    int(x) for x in hydep.__version__.split(".")[:3]
+                )
         self._fp = fp
+        self._libver = libver
+        self.flushSteps = flushSteps
+        self.flushSeconds = flushSeconds
+        self.compression = compression
+        self.compressionOpts = compressionOpts
+        self.shuffle = bool(shuffle)
+        self.singlePrecision = bool(singlePrecision)
+        self.chunkSteps = chunkSteps
+        self.chunkIsotopes = chunkIsotopes
+        self.swmr = bool(swmr)
+        self.append = append
+        self.lastWrittenStep = -1
+        self._h5f = None
+        self._pending = {}
+        self._pendingFmtx = {}
+        self._pendingSteps = set()
+        self._timings = None
+        self._memory = None
+        self._compositionRows = None
+        self._lastFlush = time.monotonic()
 
     @property
     def fp(self):
@@ -281,9 +448,45 @@ class Store(BaseStore):
     def VERSION(self):
         return self._VERSION
 
-    def beforeMain(self, nhf, ntransport, ngroups, isotopes, burnableIndexes):
+    def _open(self) -> h5py.File:
+        if self._h5f is None:
+            self._h5f = h5py.File(self._fp, mode="a", libver=self._libver)
+            if self.swmr and HdfAttrs.N_TOTAL.value in self._h5f.attrs:
+                self._h5f.swmr_mode = True
+        return self._h5f
+
+    @property
+    def _floatType(self):
+        return numpy.float32 if self.singlePrecision else numpy.float64
+
+    def _filterKwargs(self) -> dict:
+        return {
+            "compression": self.compression,
+            "compression_opts": self.compressionOpts,
+            "shuffle": self.shuffle,
+        }
+
+    def _createLarge(self, h5f, key, shape, **kwargs):
+        """Create a chunked and filtered time-dependent dataset"""
+        chunkSteps = self.chunkSteps or self.flushSteps
+        chunks = (min(chunkSteps, shape[0]), ) + tuple(
+            max(x, 1) for x in shape[1:])
+        if key == HdfStrings.COMPOSITIONS.value:
+            chunks = chunks[:2] + (min(self.chunkIsotopes, chunks[2]), )
+        kwargs.setdefault("dtype", self._floatType)
+        return h5f.create_dataset(
+            key, shape, chunks=chunks, **self._filterKwargs(), **kwargs
+        )
+
+    def beforeMain(
+        self, nhf, ntransport, ngroups, isotopes, burnableIndexes,
+        compositionSteps=None,
+    ):
         """Called before main simulation sequence
 
+        Opens the result file, which will remain open until
+        :meth:`close` or :meth:`finalize`
+
         Parameters
         ----------
         isotopes : tuple of hydep.internal.Isotope
@@ -292,61 +495,129 @@ class Store(BaseStore):
             Each item is a 3-tuple of material id, name, and volume.
             Entries are ordered consistent to how the material are ordered
             are used across the sequence
+        compositionSteps : sequence of int, optional
+            Time steps where compositions will be written. The
+            compositions dataset is sized to only hold these steps.
+            Defaults to all ``ntransport`` steps
 
         """
-        with h5py.File(self._fp, "a") as h5f:
-            for src, dest in (
-                (nhf, HdfAttrs.N_COARSE),
-                (ntransport, HdfAttrs.N_TOTAL),
-                (len(isotopes), HdfAttrs.N_ISOTOPES),
-                (len(burnableIndexes), HdfAttrs.N_BMATS),
-                (ngroups, HdfAttrs.N_ENE_GROUPS),
-            ):
-                h5f.attrs[dest] = src
-
-            tgroup = h5f.create_group(HdfStrings.CALENDAR)
-            tgroup.create_dataset(HdfSubStrings.CALENDAR_TIME, (ntransport,))
-            tgroup.create_dataset(HdfSubStrings.CALENDAR_HF, (ntransport,), dtype=bool)
-
-            h5f.create_dataset(HdfStrings.KEFF, (ntransport, 2))
-
-            h5f.create_dataset(HdfStrings.CPU_TIMES, (ntransport,))
-
-            h5f.create_dataset(
-                HdfStrings.FLUXES, (ntransport, len(burnableIndexes), ngroups)
+        if compositionSteps is None:
+            compositionSteps = range(ntransport)
+            self._compositionRows = None
+        else:
+            compositionSteps = sorted(compositionSteps)
+            self._compositionRows = {
+                step: row for row, step in enumerate(compositionSteps)
+            }
+
+        h5f = self._open()
+        if HdfAttrs.N_TOTAL.value in h5f.attrs:
+            self._checkExisting(
+                h5f, nhf, ntransport, ngroups, isotopes, burnableIndexes,
+                compositionSteps,
             )
+            return
+
+        for src, dest in (
+            (nhf, HdfAttrs.N_COARSE),
+            (ntransport, HdfAttrs.N_TOTAL),
+            (len(isotopes), HdfAttrs.N_ISOTOPES),
+            (len(burnableIndexes), HdfAttrs.N_BMATS),
+            (ngroups, HdfAttrs.N_ENE_GROUPS),
+        ):
+            h5f.attrs[dest] = src
+
+        tgroup = h5f.create_group(HdfStrings.CALENDAR)
+        timeDS = tgroup.create_dataset(
+            HdfSubStrings.CALENDAR_TIME, (ntransport,), dtype=numpy.float64
+        )
+        timeDS.attrs[HdfAttrs.LAST_STEP] = self.lastWrittenStep
+        tgroup.create_dataset(HdfSubStrings.CALENDAR_HF, (ntransport,), dtype=bool)
+        tgroup.create_dataset(
+            HdfSubStrings.CALENDAR_COMPOSITIONS,
+            data=numpy.asarray(compositionSteps, dtype=int),
+        )
 
-            h5f.create_dataset(
-                HdfStrings.COMPOSITIONS,
-                (ntransport, len(burnableIndexes), len(isotopes)),
-            )
+        h5f.create_dataset(HdfStrings.KEFF, (ntransport, 2), dtype=numpy.float64)
 
-            isogroup = h5f.create_group(HdfStrings.ISOTOPES)
-            zai = numpy.empty(len(isotopes), dtype=int)
-            names = numpy.empty_like(zai, dtype=object)
+        h5f.create_dataset(HdfStrings.CPU_TIMES, (ntransport,), dtype=numpy.float64)
 
-            for ix, iso in enumerate(isotopes):
-                zai[ix] = iso.zai
-                names[ix] = iso.name
+        self._createLarge(
+            h5f, HdfStrings.FLUXES.value, (ntransport, len(burnableIndexes), ngroups)
+        )
 
-            isogroup[HdfSubStrings.ISO_ZAI] = zai
-            isogroup[HdfSubStrings.ISO_NAMES] = names.astype("S")
+        self._createLarge(
+            h5f,
+            HdfStrings.COMPOSITIONS.value,
+            (len(compositionSteps), len(burnableIndexes), len(isotopes)),
+        )
 
-            materialgroup = h5f.create_group(HdfStrings.MATERIALS)
-            mids = materialgroup.create_dataset(
-                HdfSubStrings.MAT_IDS, (len(burnableIndexes),), dtype=int
-            )
-            names = numpy.empty_like(mids, dtype=object)
-            volumes = materialgroup.create_dataset_like(
-                HdfSubStrings.MAT_VOLS, mids, dtype=numpy.float64
-            )
+        isogroup = h5f.create_group(HdfStrings.ISOTOPES)
+        zai = numpy.empty(len(isotopes), dtype=int)
+        names = numpy.empty_like(zai, dtype=object)
+
+        for ix, iso in enumerate(isotopes):
+            zai[ix] = iso.zai
+            names[ix] = iso.name
+
+        isogroup[HdfSubStrings.ISO_ZAI] = zai
+        isogroup[HdfSubStrings.ISO_NAMES] = names.astype("S")
+
+        materialgroup = h5f.create_group(HdfStrings.MATERIALS)
+        mids = numpy.empty(len(burnableIndexes), dtype=int)
+        names = numpy.empty_like(mids, dtype=object)
+        volumes = numpy.empty_like(mids, dtype=numpy.float64)
+
+        for ix, (matid, name, volume) in enumerate(burnableIndexes):
+            mids[ix] = matid
+            names[ix] = name
+            volumes[ix] = volume
+
+        materialgroup[HdfSubStrings.MAT_IDS] = mids
+        materialgroup[HdfSubStrings.MAT_VOLS] = volumes
+        materialgroup[HdfSubStrings.MAT_NAMES] = names.astype("S")
+
+        if self.swmr:
+            # Objects cannot be created once readers may be attached
+            for key in (HdfStrings.PARTICLES, HdfStrings.FLUX_UNCERTAINTY):
+                self._createLazyDataset(
+                    h5f, key.value, (len(burnableIndexes), ngroups)
+                )
+            self._createFissionMatrixGroup(h5f, (len(burnableIndexes), ) * 2)
+            h5f.swmr_mode = True
 
-            for ix, (matid, name, volume) in enumerate(burnableIndexes):
-                mids[ix] = matid
-                names[ix] = name
-                volumes[ix] = volume
+        h5f.flush()
+        self._lastFlush = time.monotonic()
 
-            materialgroup[HdfSubStrings.MAT_NAMES] = names.astype("S")
+    def _checkExisting(
+        self, h5f, nhf, ntransport, ngroups, isotopes, burnableIndexes,
+        compositionSteps,
+    ):
+        # Continue writing to a file from a previous simulation
+        for src, key in (
+            (nhf, HdfAttrs.N_COARSE),
+            (ntransport, HdfAttrs.N_TOTAL),
+            (len(isotopes), HdfAttrs.N_ISOTOPES),
+            (len(burnableIndexes), HdfAttrs.N_BMATS),
+            (ngroups, HdfAttrs.N_ENE_GROUPS),
+        ):
+            if h5f.attrs[key] != src:
+                raise ValueError(
+                    f"Cannot append to {self._fp}: expected {src} {key.value}, "
+                    f"found {h5f.attrs[key]}"
+                )
+        zais = h5f[HdfStrings.ISOTOPES / HdfSubStrings.ISO_ZAI][:]
+        existing = h5f[HdfStrings.CALENDAR / HdfSubStrings.CALENDAR_COMPOSITIONS][:]
+        if zais.tolist() != [iso.zai for iso in isotopes]:
+            raise ValueError(f"Cannot append to {self._fp}: isotopes differ")
+        if existing.tolist() != list(compositionSteps):
+            raise ValueError(f"Cannot append to {self._fp}: composition steps differ")
+        timeDS = h5f[HdfStrings.CALENDAR / HdfSubStrings.CALENDAR_TIME]
+        self.lastWrittenStep = int(timeDS.attrs[HdfAttrs.LAST_STEP])
+        self._lastFlush = time.monotonic()
+
+    def _buffer(self, key, index, value):
+        self._pending.setdefault(key, {})[index] = value
 
     def postTransport(self, timeStep, transportResult) -> None:
         """Store transport results
@@ -365,32 +636,42 @@ class Store(BaseStore):
             ``None``
 
         """
-        with h5py.File(self._fp, mode="a") as h5f:
-            timeindex = timeStep.total
-            tgroup = h5f[HdfStrings.CALENDAR]
-            tgroup[HdfSubStrings.CALENDAR_TIME][timeindex] = timeStep.currentTime
-            tgroup[HdfSubStrings.CALENDAR_HF][timeindex] = not bool(timeStep.substep)
-
-            h5f[HdfStrings.KEFF][timeindex] = transportResult.keff
-
-            h5f[HdfStrings.FLUXES][timeindex] = transportResult.flux
-
-            cputime = transportResult.runTime
-            if cputime is None:
-                cputime = numpy.nan
-            h5f[HdfStrings.CPU_TIMES][timeindex] = cputime
-
-            fmtx = transportResult.fmtx
-            if fmtx is not None:
-                fGroup = h5f.get(HdfStrings.FISSION_MATRIX)
-                if fGroup is None:
-                    fGroup = h5f.create_group(HdfStrings.FISSION_MATRIX)
-                    fGroup.attrs["structure"] = "csr"
-                    fGroup.attrs["shape"] = fmtx.shape
-                thisG = fGroup.create_group(str(timeindex))
-                thisG.attrs["nnz"] = fmtx.nnz
-                for attr in {"data", "indices", "indptr"}:
-                    thisG[attr] = getattr(fmtx, attr)
+        timeindex = timeStep.total
+        self._buffer(
+            HdfStrings.CALENDAR / HdfSubStrings.CALENDAR_TIME,
+            timeindex,
+            timeStep.currentTime,
+        )
+        self._buffer(
+            HdfStrings.CALENDAR / HdfSubStrings.CALENDAR_HF,
+            timeindex,
+            not bool(timeStep.substep),
+        )
+        self._buffer(HdfStrings.KEFF.value, timeindex, transportResult.keff)
+        self._buffer(HdfStrings.FLUXES.value, timeindex, transportResult.flux)
+
+        cputime = transportResult.runTime
+        if cputime is None:
+            cputime = numpy.nan
+        self._buffer(HdfStrings.CPU_TIMES.value, timeindex, cputime)
+
+        if transportResult.particles is not None:
+            self._buffer(
+                HdfStrings.PARTICLES.value, timeindex, transportResult.particles
+            )
+
+        if transportResult.fluxUncertainty is not None:
+            self._buffer(
+                HdfStrings.FLUX_UNCERTAINTY.value,
+                timeindex,
+                transportResult.fluxUncertainty,
+            )
+
+        if transportResult.fmtx is not None:
+            self._pendingFmtx[timeindex] = transportResult.fmtx
+
+        self._pendingSteps.add(timeindex)
+        self._maybeFlush()
 
     def writeCompositions(self, timeStep, compBundle) -> None:
         """Write (potentially) new compositions
@@ -407,9 +688,264 @@ class Store(BaseStore):
             of the sequence and corresponding argument to
             :meth:`beforeMain`
 
+        Raises
+        ------
+        ValueError
+            If compositions are not expected at ``timeStep``, as
+            determined by ``compositionSteps`` in :meth:`beforeMain`
+
+        """
+        row = timeStep.total
+        if self._compositionRows is not None:
+            row = self._compositionRows.get(row)
+            if row is None:
+                raise ValueError(f"Compositions not expected at {timeStep}")
+        self._buffer(HdfStrings.COMPOSITIONS.value, row, compBundle.densities)
+        self._pendingSteps.add(timeStep.total)
+        self._maybeFlush()
+
+    def _maybeFlush(self):
+        if (
+            len(self._pendingSteps) >= self.flushSteps
+            or time.monotonic() - self._lastFlush >= self.flushSeconds
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all buffered data to the result file"""
+        with timed("store.flush"):
+            self._flush()
+
+    def _flush(self):
+        if self._pending or self._pendingFmtx:
+            h5f = self._open()
+            for key, rows in self._pending.items():
+                ds = h5f.get(key)
+                if ds is None:
+                    ds = self._createLazyDataset(
+                        h5f, key, numpy.shape(next(iter(rows.values())))
+                    )
+                self._writeRows(ds, rows)
+
+            if self._pendingFmtx:
+                self._writeFissionMatrices(h5f, self._pendingFmtx)
+
+            self._pending = {}
+            self._pendingFmtx = {}
+
+        if self._pendingSteps:
+            self.lastWrittenStep = max(self.lastWrittenStep, max(self._pendingSteps))
+            timeDS = self._open()[HdfStrings.CALENDAR / HdfSubStrings.CALENDAR_TIME]
+            timeDS.attrs[HdfAttrs.LAST_STEP] = self.lastWrittenStep
+        self._pendingSteps.clear()
+        if self._h5f is not None:
+            self._h5f.flush()
+        self._lastFlush = time.monotonic()
+
+    def _createLazyDataset(self, h5f, key, shape):
+        # Datasets that are only written if solvers provide the data.
+        # shape is the shape of the data for a single time step
+        ntotal = h5f.attrs[HdfAttrs.N_TOTAL]
+        if key == HdfStrings.PARTICLES.value:
+            return h5f.create_dataset(key, (ntotal,), dtype=int, fillvalue=0)
+        if key == HdfStrings.FLUX_UNCERTAINTY.value:
+            return self._createLarge(
+                h5f, key, (ntotal,) + shape, fillvalue=numpy.nan
+            )
+        raise KeyError(f"Dataset {key} does not exist in {h5f}")
+
+    @staticmethod
+    def _writeRows(ds, rows):
+        # Write contiguous runs of time steps with a single call
+        indices = sorted(rows)
+        start = 0
+        for stop in range(1, len(indices) + 1):
+            if stop < len(indices) and indices[stop] == indices[stop - 1] + 1:
+                continue
+            run = indices[start:stop]
+            ds[run[0]:run[-1] + 1] = numpy.asarray([rows[ix] for ix in run])
+            start = stop
+
+    def _createFissionMatrixGroup(self, h5f, shape):
+        fGroup = h5f.create_group(HdfStrings.FISSION_MATRIX)
+        fGroup.attrs["structure"] = "csr"
+        fGroup.attrs["shape"] = shape
+        filters = self._filterKwargs()
+        for name, dtype in (("steps", int), ("offsets", int), ("nnz", int)):
+            fGroup.create_dataset(name, (0,), maxshape=(None,), dtype=dtype)
+        fGroup.create_dataset(
+            "indptr",
+            (0, shape[0] + 1),
+            maxshape=(None, shape[0] + 1),
+            chunks=(min(self.chunkSteps or self.flushSteps, 64), shape[0] + 1),
+            dtype=int,
+            **filters,
+        )
+        for name, dtype in (("indices", int), ("data", self._floatType)):
+            fGroup.create_dataset(
+                name, (0,), maxshape=(None,), chunks=(4096,), dtype=dtype,
+                **filters,
+            )
+        return fGroup
+
+    def _writeFissionMatrices(self, h5f, matrices):
+        # Matrices are concatenated into extendable datasets, with
+        # an index of time steps and offsets into data and indices
+        fGroup = h5f.get(HdfStrings.FISSION_MATRIX)
+        if fGroup is None:
+            fGroup = self._createFissionMatrixGroup(
+                h5f, next(iter(matrices.values())).shape
+            )
+
+        steps = fGroup["steps"]
+        nnz = fGroup["nnz"]
+        offsets = fGroup["offsets"]
+        indptr = fGroup["indptr"]
+        data = fGroup["data"]
+        indices = fGroup["indices"]
+
+        nstored = steps.shape[0]
+        start = data.shape[0]
+        ordered = sorted(matrices.items())
+        nnew = len(ordered)
+
+        for ds in (steps, nnz, offsets, indptr):
+            ds.resize(nstored + nnew, axis=0)
+
+        newNnz = [fmtx.nnz for _ix, fmtx in ordered]
+        steps[nstored:] = [ix for ix, _fmtx in ordered]
+        nnz[nstored:] = newNnz
+        offsets[nstored:] = start + numpy.cumsum([0] + newNnz[:-1])
+        indptr[nstored:] = numpy.stack([fmtx.indptr for _ix, fmtx in ordered])
+
+        total = start + sum(newNnz)
+        for ds in (data, indices):
+            ds.resize(total, axis=0)
+        if total > start:
+            data[start:] = numpy.concatenate([fmtx.data for _ix, fmtx in ordered])
+            indices[start:] = numpy.concatenate(
+                [fmtx.indices for _ix, fmtx in ordered])
+
+    def close(self) -> None:
+        """Write buffered data and close the result file
+
+        Subsequent writes will re-open the file as needed
+        """
+        try:
+            self.flush()
+        finally:
+            if self._h5f is not None:
+                self._h5f.close()
+                self._h5f = None
+        if self._timings is not None:
+            self._writeTimings(self._timings)
+            self._timings = None
+        if self._memory is not None:
+            self._writeMemory(*self._memory)
+            self._memory = None
+
+    def writeTimings(self, timings) -> None:
+        """Store the time spent in each phase of the simulation
+
+        Timings are written to the ``/timing`` group when the file is
+        closed, outside of single-writer / multiple-reader mode
+        so new datasets can be created. Rows for time steps not
+        recorded in ``timings`` are preserved when appending to an
+        existing file.
+
+        Parameters
+        ----------
+        timings : dict of str to numpy.ndarray
+            Times for each phase from
+            :meth:`hydep.internal.PhaseTimer.toArrays`
+
+        """
+        self._timings = {name: numpy.asarray(t) for name, t in timings.items()}
+
+    def _writeTimings(self, timings):
+        with h5py.File(self._fp, mode="a", libver=self._libver) as h5f:
+            ntotal = h5f.attrs.get(HdfAttrs.N_TOTAL.value)
+            if ntotal is None:
+                return
+            group = h5f.require_group(HdfStrings.TIMING.value)
+            group.attrs["columns"] = numpy.array(["wall", "cpu", "calls"], dtype="S")
+            for name, rows in timings.items():
+                if not len(rows):
+                    continue
+                ds = group.get(name)
+                if ds is None:
+                    ds = group.create_dataset(
+                        name, data=numpy.zeros((ntotal, 3), dtype=numpy.float64)
+                    )
+                steps = rows[:, 0].astype(int)
+                valid = (steps >= 0) & (steps < ntotal)
+                data = ds[()]
+                data[steps[valid]] = rows[valid, 1:]
+                ds[...] = data
+
+    def writeMemory(self, phases, arrays) -> None:
+        """Store the peak memory of each phase and size of large arrays
+
+        Written to the ``phases`` and ``arrays`` subgroups of
+        ``/memory`` when the file is closed, following
+        :meth:`writeTimings`. Each dataset contains the largest
+        value [bytes] at each time step, or zero if not recorded.
+
+        Parameters
+        ----------
+        phases : dict of str to numpy.ndarray
+            Peak memory from
+            :meth:`hydep.internal.PhaseTimer.peakMemory`
+        arrays : dict of str to numpy.ndarray
+            Array sizes from
+            :meth:`hydep.internal.PhaseTimer.largestArrays`
+
+        """
+        self._memory = tuple(
+            {name: numpy.asarray(v) for name, v in values.items()}
+            for values in (phases, arrays)
+        )
+
+    def _writeMemory(self, phases, arrays):
+        with h5py.File(self._fp, mode="a", libver=self._libver) as h5f:
+            ntotal = h5f.attrs.get(HdfAttrs.N_TOTAL.value)
+            if ntotal is None:
+                return
+            root = h5f.require_group(HdfStrings.MEMORY.value)
+            for key, records in (("phases", phases), ("arrays", arrays)):
+                group = root.require_group(key)
+                for name, rows in records.items():
+                    if not len(rows):
+                        continue
+                    ds = group.get(name)
+                    if ds is None:
+                        ds = group.create_dataset(
+                            name, data=numpy.zeros(ntotal, dtype=numpy.int64)
+                        )
+                    steps = rows[:, 0]
+                    valid = (steps >= 0) & (steps < ntotal)
+                    data = ds[()]
+                    data[steps[valid]] = rows[valid, 1]
+                    ds[...] = data
+
+    def finalize(self, success) -> None:
+        """Write buffered data and close the result file
+
+        Parameters
+        ----------
+        success : bool
+            ``True`` if the simulation completed without error.
+            Buffered data are written regardless to aid in diagnosing
+            failures
+
         """
-        with h5py.File(self._fp, mode="a") as h5f:
-            h5f[HdfStrings.COMPOSITIONS][timeStep.total] = compBundle.densities
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
 
 
 class Processor(Mapping):
@@ -420,11 +956,24 @@ class Processor(Mapping):
     fpOrGroup : str or pathlib.Path or h5py.File or h5py.Group
         Either the name of the result file, an already opened
         HDF file or a group inside an opened HDF file
+    cacheSize : int, optional
+        Number of recent query results, e.g. from :meth:`getDensities`
+        or :meth:`getFissionMatrix`, to keep in memory. Passing zero
+        disables caching. Default: 32
+    swmr : bool, optional
+        Open ``fpOrGroup`` as a reader in HDF5 single-writer /
+        multiple-reader mode, for monitoring a file written by
+        ``Store(swmr=True)``. Use :meth:`refresh` to load new steps
 
     Attributes
     ----------
     days : numpy.ndarray
         Points in calendar time for all provided values
+    cacheSize : int
+        Number of recent query results kept in memory
+    lastWrittenStep : int
+        Index of the most recent time step written to the file, as of
+        the last :meth:`refresh`
     names : tuple of str
         Isotope names ordered consistent with :attr:`zai`.
     zais : h5py.Dataset
@@ -437,20 +986,40 @@ class Processor(Mapping):
     fluxes : h5py.Dataset
         NxMxG dataset with fluxes in each burnable region
     compositions : h5py.Dataset
-        NxMxI dataset with isotopic compositions for all time steps
-        and all materials
+        CxMxI dataset with isotopic compositions for all materials at
+        the time steps in :attr:`compositionSteps`
+    compositionSteps : numpy.ndarray
+        Time step index of each entry in :attr:`compositions`
+    compositionDays : numpy.ndarray
+        Points in calendar time [d] of each entry in
+        :attr:`compositions`
     volumes : h5py.Dataset
         Volumes for each material
+    particles : h5py.Dataset or None
+        Particles per cycle used in each transport solution, zero for
+        non-stochastic solutions. ``None`` if not written
+    fluxUncertainty : h5py.Dataset or None
+        NxMxG dataset of relative uncertainties on :attr:`fluxes`.
+        ``None`` if not written
 
     """
 
-    _EXPECTS = (0, 1)
+    _EXPECTS = (1, 1)
+    # Major versions that can be read. Version 0 files differ only
+    # in the layout of the fission matrix group
+    _SUPPORTS = {0, 1}
 
     def __init__(
-        self, fpOrGroup: typing.Union[str, pathlib.Path, h5py.File, h5py.Group]
+        self,
+        fpOrGroup: typing.Union[str, pathlib.Path, h5py.File, h5py.Group],
+        cacheSize: typing.Optional[int] = 32,
+        swmr: typing.Optional[bool] = False,
     ):
         if isinstance(fpOrGroup, (str, pathlib.Path)):
-            self._root = h5py.File(fpOrGroup, mode="r")
+            if swmr:
+                self._root = h5py.File(fpOrGroup, mode="r", libver="latest", swmr=True)
+            else:
+                self._root = h5py.File(fpOrGroup, mode="r")
         elif isinstance(fpOrGroup, (h5py.File, h5py.Group)):
             self._root = fpOrGroup
         else:
@@ -459,7 +1028,8 @@ class Processor(Mapping):
         version = self._root.attrs.get("fileVersion")
         if version is None:
             raise KeyError(f"Could not find file version in {self._root}")
-        elif tuple(version[:]) != self._EXPECTS:
+        elif version[0] not in self._SUPPORTS:
+            # Minor versions only add data
             raise ValueError(
                 f"Found {version[:]} in {self._root}, expected {self._EXPECTS}"
             )
@@ -468,7 +1038,59 @@ class Processor(Mapping):
             self._root[HdfStrings.CALENDAR / HdfSubStrings.CALENDAR_TIME],
             SECONDS_PER_DAY
         )
+        self.cacheSize = cacheSize
+        self._cache = OrderedDict()
         self._names = None
+        self._nameIndex = None
+        self._zaiIndex = None
+        self._dayIndex = None
+        self._compositionIndex = None
+        self._compositionSteps = None
+        self._fmtxInfo = None
+        self._swmr = bool(swmr) or getattr(self._root.file, "swmr_mode", False)
+        self.lastWrittenStep = self._readLastStep()
+
+    def _readLastStep(self) -> int:
+        timeDS = self._root[HdfStrings.CALENDAR / HdfSubStrings.CALENDAR_TIME]
+        last = timeDS.attrs.get(HdfAttrs.LAST_STEP.value)
+        # Files without the attribute are assumed to be complete
+        return len(timeDS) - 1 if last is None else int(last)
+
+    def refresh(self) -> slice:
+        """Load time steps written since the previous refresh
+
+        Intended for monitoring a file as it is being written by
+        ``Store(swmr=True)``. Updates :attr:`days`,
+        :attr:`lastWrittenStep`, and clears cached queries if new
+        steps were found
+
+        Returns
+        -------
+        slice
+            Time step indices written since the previous refresh.
+            Can be used to fetch only new values, e.g.
+            ``processor.keff[processor.refresh()]``
+
+        """
+        if self._swmr:
+            for item in self._root.values():
+                datasets = item.values() if isinstance(item, h5py.Group) else [item]
+                for ds in datasets:
+                    if isinstance(ds, h5py.Dataset):
+                        ds.refresh()
+
+        previous = self.lastWrittenStep
+        current = self._readLastStep()
+        new = slice(previous + 1, current + 1)
+        if current > previous:
+            timeDS = self._root[HdfStrings.CALENDAR / HdfSubStrings.CALENDAR_TIME]
+            self.days[new] = numpy.divide(timeDS[new], SECONDS_PER_DAY)
+            self.lastWrittenStep = current
+            self._dayIndex = None
+            self._compositionIndex = None
+            self._fmtxInfo = None
+            self.clearCache()
+        return new
 
     def __len__(self) -> int:
         return len(self._root)
@@ -580,10 +1202,34 @@ class Processor(Mapping):
     def compositions(self) -> h5py.Dataset:
         return self._root[HdfStrings.COMPOSITIONS]
 
+    @property
+    def compositionSteps(self) -> numpy.ndarray:
+        if self._compositionSteps is None:
+            ds = self._root.get(
+                HdfStrings.CALENDAR / HdfSubStrings.CALENDAR_COMPOSITIONS)
+            # Files prior to 1.1 contain compositions at every step
+            if ds is None:
+                self._compositionSteps = numpy.arange(len(self.days))
+            else:
+                self._compositionSteps = ds[:]
+        return self._compositionSteps
+
+    @property
+    def compositionDays(self) -> numpy.ndarray:
+        return self.days[self.compositionSteps]
+
     @property
     def volumes(self) -> h5py.Dataset:
         return self._root[HdfStrings.MATERIALS / HdfSubStrings.MAT_VOLS]
 
+    @property
+    def particles(self) -> typing.Optional[h5py.Dataset]:
+        return self._root.get(HdfStrings.PARTICLES)
+
+    @property
+    def fluxUncertainty(self) -> typing.Optional[h5py.Dataset]:
+        return self._root.get(HdfStrings.FLUX_UNCERTAINTY)
+
     def getKeff(
         self, hfOnly: typing.Optional[bool] = True
     ) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
@@ -608,16 +1254,142 @@ class Processor(Mapping):
         slicer = self.hfFlags[:] if hfOnly else slice(None)
         return self.days[slicer], self.keff[slicer, :]
 
+    def getTimings(self) -> typing.Dict[str, numpy.ndarray]:
+        """Fetch the time spent in each phase of the simulation
+
+        Returns
+        -------
+        dict of str to numpy.ndarray
+            Arrays of shape ``(N_total, 3)`` for each recorded phase,
+            with columns of wall time [s], CPU time [s], and number
+            of times the phase was recorded at each time step. Empty
+            if the file does not contain timing information
+
+        """
+        group = self._root.get(HdfStrings.TIMING)
+        if group is None:
+            return {}
+        return {name: ds[()] for name, ds in group.items()}
+
+    def getMemory(self):
+        """Fetch the peak memory of each phase and size of large arrays
+
+        Returns
+        -------
+        phases : dict of str to numpy.ndarray
+            Peak memory [bytes] in each phase at each time step,
+            arrays of shape ``(N_total, )``
+        arrays : dict of str to numpy.ndarray
+            Largest size [bytes] of each tracked array at each time
+            step, arrays of shape ``(N_total, )``
+
+        Both are empty if the file does not contain memory information
+
+        """
+        group = self._root.get(HdfStrings.MEMORY)
+        if group is None:
+            return {}, {}
+        return tuple(
+            {name: ds[()] for name, ds in group.get(key, {}).items()}
+            for key in ("phases", "arrays")
+        )
+
+    def clearCache(self):
+        """Remove all cached query results"""
+        self._cache.clear()
+
+    def _cached(self, key, func):
+        """Return ``func()``, reusing results of recent calls"""
+        if not self.cacheSize:
+            return func()
+        value = self._cache.get(key)
+        if value is None:
+            value = func()
+            self._cache[key] = value
+            while len(self._cache) > self.cacheSize:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return value
+
+    @staticmethod
+    def _selectionKey(selection):
+        # Slices and arrays are not hashable
+        if isinstance(selection, slice):
+            return ("slice", selection.start, selection.stop, selection.step)
+        if isinstance(selection, numpy.ndarray):
+            return tuple(selection.tolist())
+        return selection
+
+    @classmethod
+    def _readSelection(cls, ds: h5py.Dataset, selection: tuple) -> numpy.ndarray:
+        """Read only the requested cells from ``ds``
+
+        Each item in ``selection`` is an integer, slice, or 1D array of
+        integers. Arrays can be in any order and contain repeated
+        values. HDF supports one list-like selection per read, so
+        additional arrays are read by iterating over the first
+        """
+        arrayAxes = [
+            ax for ax, sel in enumerate(selection) if isinstance(sel, numpy.ndarray)
+        ]
+        if not arrayAxes:
+            return ds[selection]
+
+        axis = arrayAxes[0]
+        unique, inverse = numpy.unique(selection[axis], return_inverse=True)
+        # Integer selections before this axis remove a dimension
+        outAxis = axis - sum(
+            isinstance(sel, numbers.Integral) for sel in selection[:axis]
+        )
+        if len(arrayAxes) == 1:
+            data = ds[selection[:axis] + (unique.tolist(), ) + selection[axis + 1:]]
+        else:
+            before, after = selection[:axis], selection[axis + 1:]
+            data = numpy.concatenate(
+                [
+                    cls._readSelection(ds, before + (slice(ix, ix + 1), ) + after)
+                    for ix in unique
+                ],
+                axis=outAxis,
+            )
+        if unique.size == inverse.size and (unique == selection[axis]).all():
+            return data
+        return numpy.take(data, inverse, axis=outAxis)
+
+    def _query(self, ds: h5py.Dataset, selection: tuple) -> numpy.ndarray:
+        # Reading everything is not cached to avoid holding entire datasets
+        if all(
+            isinstance(sel, slice) and sel == slice(None) for sel in selection
+        ):
+            return ds[()]
+        key = (ds.name, ) + tuple(self._selectionKey(sel) for sel in selection)
+        return self._cached(key, lambda: self._readSelection(ds, selection)).copy()
+
+    @staticmethod
+    def _getMaterialSlice(materials):
+        if materials is None:
+            return slice(None)
+        if isinstance(materials, numbers.Integral):
+            return int(materials)
+        return numpy.asarray(materials, dtype=int).reshape(-1)
+
     def getFluxes(
-        self, days: typing.Optional[typing.Union[float, typing.Iterable[float]]] = None
+        self,
+        days: typing.Optional[typing.Union[float, typing.Iterable[float]]] = None,
+        materials: typing.Optional[typing.Union[int, typing.Iterable[int]]] = None,
     ) -> numpy.ndarray:
         """Retrieve the flux at some or all time points
 
+        Only the requested values are read from the file
+
         Parameters
         ----------
         days : float or iterable of float, optional
-            Specific day or days to obtain the flux. If multiple days
-            are given, they must be in an increasing order
+            Specific day or days to obtain the flux
+        materials : int or iterable of int, optional
+            Positions of burnable materials, consistent with
+            :attr:`volumes`. Defaults to all materials
 
         Returns
         -------
@@ -633,30 +1405,49 @@ class Processor(Mapping):
             :attr:`days`
 
         """
-        # TODO Add group, material slicing
         if days is None:
             dayslice = slice(None)
         else:
             dayslice = self._getDaySlice(days)
-        return self.fluxes[dayslice]
+        return self._query(
+            self.fluxes, (dayslice, self._getMaterialSlice(materials), slice(None))
+        )
 
     def _getDaySlice(self, days: typing.Union[float, typing.Iterable[float]]):
+        if self._dayIndex is None:
+            self._dayIndex = self._indexDays(self.days)
+        return self._findDays(self._dayIndex, days)
+
+    def _getCompositionSlice(self, days: typing.Union[float, typing.Iterable[float]]):
+        if self._compositionIndex is None:
+            self._compositionIndex = self._indexDays(self.compositionDays)
+        return self._findDays(self._compositionIndex, days)
+
+    @staticmethod
+    def _indexDays(days):
+        # First occurrence, in case steps have not been written
+        index = {}
+        for ix, d in enumerate(days.tolist()):
+            index.setdefault(d, ix)
+        return index
+
+    @staticmethod
+    def _findDays(index, days):
         if isinstance(days, numbers.Real):
-            dayslice = bisect.bisect_left(self.days, days)
-            if dayslice == len(self.days) or days != self.days[dayslice]:
+            ix = index.get(days)
+            if ix is None:
                 raise IndexError(f"Day {days} not found")
-            return dayslice
+            return ix
 
-        # Let numpy handle to searching
         reqs = numpy.asarray(days)
         if len(reqs.shape) != 1:
             raise ValueError("Days can only be 1D")
-        if (reqs[:-1] - reqs[1:] > 0).any():
-            raise ValueError("Days must be in increasing order, for now")
-        dayslice = numpy.searchsorted(self.days, reqs)
-        for ix, d in zip(dayslice, reqs):
-            if ix == len(self.days) or self.days[ix] != d:
+        dayslice = numpy.empty(reqs.size, dtype=int)
+        for pos, d in enumerate(reqs.tolist()):
+            ix = index.get(d)
+            if ix is None:
                 raise IndexError(f"Day {d} not found")
+            dayslice[pos] = ix
         return dayslice
 
     def getIsotopeIndexes(
@@ -693,43 +1484,42 @@ class Processor(Mapping):
         if names is not None:
             if zais is not None:
                 raise ValueError("Need either names or zai, not both")
+            if self._nameIndex is None:
+                self._nameIndex = {n: ix for ix, n in enumerate(self.names)}
             if isinstance(names, str):
-                try:
-                    return self.names.index(names)
-                except ValueError:
-                    raise ValueError(f"Isotope {names} not found")
-            return self._searchNames(names)
+                return self._lookup(self._nameIndex, names, "Isotope")
+            return numpy.array(
+                [self._lookup(self._nameIndex, n, "Isotope") for n in names],
+                dtype=int,
+            )
 
         if zais is not None:
+            if self._zaiIndex is None:
+                self._zaiIndex = {z: ix for ix, z in enumerate(self.zais[:].tolist())}
             if isinstance(zais, numbers.Integral):
-                ix = bisect.bisect_left(self.zais, zais)
-                if ix == len(self.zais) or self.zais[ix] != zais:
-                    raise ValueError(f"ZAI {zais} not found")
-                return ix
-
-            indices = numpy.searchsorted(self.zais, zais)
-            for ix, z in zip(indices, zais):
-                if ix == len(self.zais) or self.zais[ix] != z:
-                    raise ValueError(f"ZAI {z} not found")
-            return indices
+                return self._lookup(self._zaiIndex, zais, "ZAI")
+            return numpy.array(
+                [self._lookup(self._zaiIndex, z, "ZAI") for z in zais], dtype=int
+            )
 
         raise ValueError("Need either names or zai, not both")
 
-    def _searchNames(self, names):
-        indices = numpy.empty_like(names, dtype=int)
+    @staticmethod
+    def _lookup(index, key, kind):
+        try:
+            return index[key]
+        except KeyError:
+            raise ValueError(f"{kind} {key} not found")
 
-        for outindex, name in enumerate(names):
-            try:
-                ix = self.names.index(name)
-            except ValueError:
-                raise ValueError(f"Isotope {name} not found")
-            indices[outindex] = ix
-
-        return indices
-
-    def getDensities(self, names=None, zais=None, days=None) -> numpy.ndarray:
+    def getDensities(
+        self, names=None, zais=None, days=None, materials=None
+    ) -> numpy.ndarray:
         """Return atom densities for specific isotopes at specific times
 
+        Only the requested values are read from the file, so
+        requesting a few isotopes does not read the entire
+        :attr:`compositions` dataset. Recent requests are cached
+
         Parameters
         ----------
         names : str or iterable of str, optional
@@ -737,25 +1527,39 @@ class Processor(Mapping):
         zais : int or iterable of int, optional
             Isotope ZAI identifier(s), e.g. ``922350``
         days : float or iterable of float, optional
-            Retrieve densities for these points in time
+            Retrieve densities for these points in time. Must be
+            found in :attr:`compositionDays`
+        materials : int or iterable of int, optional
+            Positions of burnable materials, consistent with
+            :attr:`volumes`. Defaults to all materials
 
         Returns
         -------
         numpy.ndarray
-            Density in all materials at the requested times for the requested
-            isotopes
+            Density in the requested materials at the requested times
+            for the requested isotopes
+
+        Raises
+        ------
+        IndexError
+            If ``days`` or an element of ``days`` was not found in
+            :attr:`compositionDays`
 
         """
         if days is None:
             dayslice = slice(None)
         else:
-            dayslice = self._getDaySlice(days)
+            dayslice = self._getCompositionSlice(days)
 
         if names is None and zais is None:
-            return self.compositions[dayslice]
+            isoIndex = slice(None)
+        else:
+            isoIndex = self.getIsotopeIndexes(names, zais)
 
-        isoIndex = self.getIsotopeIndexes(names, zais)
-        return self.compositions[dayslice][..., isoIndex]
+        return self._query(
+            self.compositions,
+            (dayslice, self._getMaterialSlice(materials), isoIndex),
+        )
 
     def getFissionMatrix(self, day: float) -> csr_matrix:
         """Retrieve the fission matrix for a given day
@@ -776,9 +1580,21 @@ class Processor(Mapping):
         KeyError
             If the fission matrix group is not defined
         IndexError
-            If ``day`` was not found in :attr:`days`
+            If ``day`` was not found in :attr:`days`, or no fission
+            matrix was stored for ``day``
 
         """
+        self._getFissionMatrixInfo()
+        ix = self._getDaySlice(float(day))
+        return self._cached(
+            (HdfStrings.FISSION_MATRIX.value, ix),
+            lambda: self._readFissionMatrix(ix, day),
+        ).copy()
+
+    def _getFissionMatrixInfo(self):
+        if self._fmtxInfo is not None:
+            return self._fmtxInfo
+
         fmtxGroup = self.get(HdfStrings.FISSION_MATRIX)
         if fmtxGroup is None:
             raise KeyError(
@@ -791,13 +1607,305 @@ class Processor(Mapping):
         if shape is None:
             shape = (self.nBurnableMats, ) * 2
 
-        ix = bisect.bisect_left(self.days, day)
-        if ix == len(self.days) or self.days[ix] != day:
-            raise IndexError(f"Day {day} not found")
+        if "steps" in fmtxGroup:
+            # Map time steps to position in concatenated datasets,
+            # using the most recent matrix if written multiple times
+            positions = {
+                step: pos for pos, step in enumerate(fmtxGroup["steps"][:].tolist())
+            }
+        else:
+            positions = None
+        self._fmtxInfo = fmtxGroup, tuple(shape), positions
+        return self._fmtxInfo
+
+    def _readFissionMatrix(self, ix, day):
+        fmtxGroup, shape, positions = self._getFissionMatrixInfo()
+
+        if positions is None:
+            # Version 0 layout with one group per time step
+            group = fmtxGroup[str(ix)]
+            return csr_matrix(
+                (group["data"][:], group["indices"][:], group["indptr"][:]),
+                shape=shape,
+            )
 
-        group = fmtxGroup[str(ix)]
+        position = positions.get(ix)
+        if position is None:
+            raise IndexError(f"Fission matrix not stored for day {day}")
+        start = fmtxGroup["offsets"][position]
+        stop = start + fmtxGroup["nnz"][position]
 
         return csr_matrix(
-            (group["data"], group["indices"], group["indptr"]),
+            (
+                fmtxGroup["data"][start:stop],
+                fmtxGroup["indices"][start:stop],
+                fmtxGroup["indptr"][position],
+            ),
             shape=shape,
         )
+
+
+class DerivedQuantities:
+    """Compute quantities from stored compositions in bounded memory
+
+    The compositions dataset is read in blocks of time steps, or
+    materials if a single time step is too large, so that no more
+    than roughly ``maxBytes`` of compositions are in memory at once.
+    All quantities are linear in the isotopic inventory, and are
+    computed with a single matrix product per block.
+
+    Supported quantities, per burnable material, are
+
+    * ``"activity"`` - Activity [Bq]
+    * ``"decayHeat"`` - Decay heat [W]
+    * ``"mass"`` - Mass of all isotopes [g]
+    * ``"heavyMetalMass"`` - Mass of isotopes with ``Z >= 90`` [g]
+    * ``"burnup"`` - Burnup [MWd/kgHM], estimated from the loss of
+      heavy metal atoms relative to the first time step
+
+    Masses are approximated using the mass number of each isotope
+    as the atomic mass [g/mol].
+
+    Parameters
+    ----------
+    processor : Processor
+        Result file with compositions and material volumes
+    chain : hydep.DepletionChain
+        Chain with decay constants, decay energies, and fission
+        Q-values. Isotopes in the result file not found in the
+        chain only contribute to masses
+    fissionEnergy : float, optional
+        Energy released per fission [eV] used for burnup. Defaults
+        to the average fission Q-value in ``chain`` weighted by the
+        initial heavy metal inventory, or 200 MeV if no fission
+        Q-values are found
+    maxBytes : int, optional
+        Approximate upper bound on the size of compositions held
+        in memory. Default: 64 MiB
+
+    Attributes
+    ----------
+    QUANTITIES : tuple of str
+        Names of all supported quantities
+    UNITS : dict of str to str
+        Units of each quantity
+    processor : Processor
+        Result file with compositions
+    fissionEnergy : float
+        Energy released per fission [eV] used for burnup
+    maxBytes : int
+        Approximate upper bound on the size of compositions held
+        in memory
+
+    Examples
+    --------
+    >>> derived = DerivedQuantities(processor, chain)  # doctest: +SKIP
+    >>> heat = derived.compute("decayHeat")["decayHeat"]  # doctest: +SKIP
+    >>> heat.shape == processor.compositions.shape[:2]  # doctest: +SKIP
+    True
+
+    """
+
+    QUANTITIES = ("activity", "decayHeat", "mass", "heavyMetalMass", "burnup")
+    UNITS = {
+        "activity": "Bq",
+        "decayHeat": "W",
+        "mass": "g",
+        "heavyMetalMass": "g",
+        "burnup": "MWd/kgHM",
+    }
+    _DEFAULT_FISSION_ENERGY = 200e6
+    # Columns of the per-isotope coefficient matrix
+    _COLUMNS = ("activity", "decayHeat", "mass", "heavyMetalMass", "heavyMetal")
+
+    def __init__(self, processor, chain, fissionEnergy=None, maxBytes=64 * 2**20):
+        self.processor = processor
+        self.maxBytes = int(maxBytes)
+        if self.maxBytes < 1:
+            raise ValueError(f"maxBytes must be positive, not {maxBytes}")
+
+        byZai = {iso.zai: iso for iso in chain}
+        zais = processor.zais[:].tolist()
+        coeffs = numpy.zeros((len(zais), len(self._COLUMNS)))
+        fissionQ = numpy.zeros(len(zais))
+
+        for ix, zai in enumerate(zais):
+            z, a = divmod(zai // 10, 1000)
+            coeffs[ix, 2] = a / AVOGADRO
+            if z >= 90:
+                coeffs[ix, 3] = coeffs[ix, 2]
+                coeffs[ix, 4] = 1.0
+            iso = byZai.get(zai)
+            if iso is None:
+                continue
+            if iso.decayConstant:
+                coeffs[ix, 0] = iso.decayConstant
+                if iso.decayEnergy:
+                    coeffs[ix, 1] = iso.decayConstant * iso.decayEnergy * JOULES_PER_EV
+            for rxn in iso.reactions:
+                if rxn.mt == REACTION_MTS.TOTAL_FISSION and rxn.Q:
+                    fissionQ[ix] = rxn.Q
+
+        self._coeffs = coeffs
+        # Convert atoms/b-cm to atoms in each material
+        self._atomsPerDensity = BARN_PER_CM2 * processor.volumes[:]
+        hmAtoms, hmMass, isotopeAtoms = self._initialHeavyMetal()
+        self._initialHM = hmAtoms, hmMass
+
+        if fissionEnergy is None:
+            weights = isotopeAtoms * (fissionQ > 0)
+            fissionEnergy = self._DEFAULT_FISSION_ENERGY
+            if weights.any():
+                fissionEnergy = weights.dot(fissionQ) / weights.sum()
+        self.fissionEnergy = float(fissionEnergy)
+
+    def _initialHeavyMetal(self):
+        # Initial heavy metal atoms and mass [g] in each material, and
+        # heavy metal atoms of each isotope summed over all materials.
+        # Computed one block of materials at a time to respect maxBytes
+        nMats = self.processor.nBurnableMats
+        isHM = self._coeffs[:, 4] > 0
+        hmAtoms = numpy.zeros(nMats)
+        hmMass = numpy.zeros(nMats)
+        isotopeAtoms = numpy.zeros(len(isHM))
+        for matslice in self._blocks(len(isHM), nMats):
+            dens = self.processor.compositions[0, matslice]
+            atoms = dens * isHM * self._atomsPerDensity[matslice, None]
+            hmAtoms[matslice] = atoms.sum(axis=1)
+            hmMass[matslice] = atoms.dot(self._coeffs[:, 2])
+            isotopeAtoms += atoms.sum(axis=0)
+        return hmAtoms, hmMass, isotopeAtoms
+
+    def _blocks(self, nItems, total):
+        """Slices of ``total`` items, each of size ``nItems`` doubles"""
+        perBlock = max(1, self.maxBytes // max(1, 8 * nItems))
+        for start in range(0, total, perBlock):
+            yield slice(start, min(start + perBlock, total))
+
+    def _checkQuantities(self, quantities):
+        if quantities is None:
+            return self.QUANTITIES
+        if isinstance(quantities, str):
+            quantities = (quantities, )
+        for q in quantities:
+            if q not in self.QUANTITIES:
+                raise ValueError(f"Quantity {q} not supported. Use {self.QUANTITIES}")
+        return tuple(quantities)
+
+    def iterChunks(self, quantities=None):
+        """Lazily compute quantities one block of compositions at a time
+
+        Parameters
+        ----------
+        quantities : str or iterable of str, optional
+            Quantities to compute. Defaults to all of :attr:`QUANTITIES`
+
+        Yields
+        ------
+        timeslice : slice
+            Entries in :attr:`Processor.compositions`, and
+            :attr:`Processor.compositionDays`, in this block
+        matslice : slice
+            Burnable materials in this block
+        values : dict of str to numpy.ndarray
+            Requested quantities with shape ``(nSteps, nMaterials)``
+            for the steps and materials in this block
+
+        """
+        quantities = self._checkQuantities(quantities)
+        comps = self.processor.compositions
+        nSteps, nMats, nIsos = comps.shape
+        hmAtoms0, hmMass0 = self._initialHM
+        hmJoules0 = self.fissionEnergy * JOULES_PER_EV
+
+        stepsPerBlock = self.maxBytes // max(1, 8 * nMats * nIsos)
+        if stepsPerBlock:
+            blocks = (
+                (tslice, slice(0, nMats))
+                for tslice in self._blocks(nMats * nIsos, nSteps)
+            )
+        else:
+            blocks = (
+                (slice(t, t + 1), mslice)
+                for t in range(nSteps)
+                for mslice in self._blocks(nIsos, nMats)
+            )
+
+        for tslice, mslice in blocks:
+            dens = comps[tslice, mslice]
+            # (steps, materials, columns) per atom -> per material
+            values = dens.dot(self._coeffs) * self._atomsPerDensity[mslice, None]
+            out = {}
+            for q in quantities:
+                if q == "burnup":
+                    fissions = hmAtoms0[mslice] - values[..., 4]
+                    with numpy.errstate(divide="ignore", invalid="ignore"):
+                        # J per kg -> MWd per kg
+                        out[q] = (
+                            fissions * hmJoules0 / (hmMass0[mslice] * 1e-3)
+                            / (1e6 * SECONDS_PER_DAY)
+                        )
+                else:
+                    out[q] = values[..., self._COLUMNS.index(q)]
+            yield tslice, mslice, out
+
+    def compute(self, quantities=None) -> typing.Dict[str, numpy.ndarray]:
+        """Compute quantities for all time steps and materials
+
+        Parameters
+        ----------
+        quantities : str or iterable of str, optional
+            Quantities to compute. Defaults to all of :attr:`QUANTITIES`
+
+        Returns
+        -------
+        dict of str to numpy.ndarray
+            Each value has shape ``(nCompositions, nBurnableMats)``,
+            ordered consistent with :attr:`Processor.compositionDays`
+
+        """
+        quantities = self._checkQuantities(quantities)
+        shape = self.processor.compositions.shape[:2]
+        out = {q: numpy.empty(shape) for q in quantities}
+        for tslice, mslice, values in self.iterChunks(quantities):
+            for q, v in values.items():
+                out[q][tslice, mslice] = v
+        return out
+
+    def write(self, dest=None, quantities=None) -> h5py.Group:
+        """Stream quantities into datasets in a writable HDF group
+
+        Datasets will be written into a ``derived`` group, see
+        :attr:`HdfStrings.DERIVED`, with a ``units`` attribute.
+        Existing datasets are overwritten
+
+        Parameters
+        ----------
+        dest : h5py.File or h5py.Group, optional
+            Writable location to place the ``derived`` group. Defaults
+            to the root of :attr:`processor`, which must then have been
+            created from a file opened in a writable mode
+        quantities : str or iterable of str, optional
+            Quantities to compute. Defaults to all of :attr:`QUANTITIES`
+
+        Returns
+        -------
+        h5py.Group
+            Group containing the new datasets
+
+        """
+        quantities = self._checkQuantities(quantities)
+        if dest is None:
+            dest = self.processor._root
+        group = dest.require_group(HdfStrings.DERIVED.value)
+        shape = self.processor.compositions.shape[:2]
+        datasets = {}
+        for q in quantities:
+            if q in group:
+                del group[q]
+            datasets[q] = group.create_dataset(q, shape, dtype=numpy.float64)
+            datasets[q].attrs["units"] = self.UNITS[q]
+        for tslice, mslice, values in self.iterChunks(quantities):
+            for q, v in values.items():
+                datasets[q][tslice, mslice] = v
+        return group
@@ -11,12 +11,20 @@ from .isotope import (
 from .timestep import TimeStep
 from .results import TransportResult
 from .timetravel import TimeTraveler
+from .timing import PhaseTimer
+from .memory import MemoryTracker
+from .hooks import HookDispatcher, HookEvent
 from .utils import (
     Boundaries,
     CompBundle,
     FakeSequence,
     compBundleFromMaterials,
 )
-from .fissionyields import FissionYieldDistribution, FissionYield
+from .fissionyields import (
+    FissionYieldDistribution,
+    FissionYield,
+    FissionYieldBank,
+    BankedYields,
+)
 from .cram import Cram16Solver, Cram48Solver
 from .xs import XsIndex, MaterialDataArray, DataBank, MaterialData
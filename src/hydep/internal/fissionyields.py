@@ -22,15 +22,21 @@ Changes made:
 """
 
 import bisect
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
 from numbers import Real, Integral
 
+import numpy
 from numpy import empty
 
 from hydep.internal import getIsotope
 
 
-__all__ = ["FissionYield", "FissionYieldDistribution"]
+__all__ = [
+    "FissionYield",
+    "FissionYieldDistribution",
+    "FissionYieldBank",
+    "BankedYields",
+]
 
 
 class FissionYieldDistribution(Mapping):
@@ -323,3 +329,219 @@ class FissionYield(Mapping):
         return "<{} containing {} products and yields>".format(
             self.__class__.__name__, len(self)
         )
+
+
+class FissionYieldBank(Sequence):
+    """Array-backed fission yields for all burnable materials
+
+    Acts like a sequence of mappings ``{parent: FissionYield}``,
+    one per burnable material, so it can be used anywhere a
+    ``list`` of fission yield dictionaries is expected. Yields
+    are stored in a single array that can be consumed directly
+    by :meth:`hydep.DepletionChain.formMatrix`.
+
+    Parameters
+    ----------
+    parents : iterable of int
+        ZAI of isotopes with fission yields. Will be sorted.
+    products : iterable of int
+        ZAI of all fission products produced by any parent. Will
+        be sorted.
+    yields : numpy.ndarray
+        Either an array of shape ``(nmats, nparents, nproducts)``
+        with yields for each material, or ``(nparents, nproducts)``
+        if the yields are shared across all materials. Entries
+        must be ordered consistent with the sorted ``parents``
+        and ``products``
+    nmats : int, optional
+        Number of burnable materials. Required if ``yields`` is
+        two dimensional, otherwise taken from the shape of ``yields``
+
+    Attributes
+    ----------
+    parents : tuple of int
+        Sorted ZAI of parent isotopes
+    products : tuple of int
+        Sorted ZAI of fission products
+    yields : numpy.ndarray
+        Read-only array of shape ``(nmats, nparents, nproducts)``.
+        If the yields are shared, this is a view of a single
+        ``(nparents, nproducts)`` array
+    shared : bool
+        If the same yields are used in every material
+
+    """
+
+    __slots__ = (
+        "parents", "products", "yields", "shared", "_parentIndex",
+        "_lastOrdering", "_lastRows",
+    )
+
+    def __init__(self, parents, products, yields, nmats=None):
+        parents = tuple(parents)
+        products = tuple(products)
+        yields = numpy.asarray(yields, dtype=float)
+
+        if yields.ndim == 2:
+            if nmats is None:
+                raise ValueError(
+                    "Number of materials required for shared fission yields"
+                )
+            self.shared = True
+            yields = numpy.broadcast_to(yields, (nmats,) + yields.shape)
+        elif yields.ndim == 3:
+            if nmats is not None and nmats != yields.shape[0]:
+                raise ValueError(
+                    f"Yields for {yields.shape[0]} materials inconsistent "
+                    f"with {nmats} materials"
+                )
+            self.shared = False
+            # View so the caller's array remains writeable
+            yields = yields.view()
+            yields.flags.writeable = False
+        else:
+            raise ValueError(
+                f"Fission yields must be 2D or 3D, not {yields.shape}"
+            )
+
+        if yields.shape[1:] != (len(parents), len(products)):
+            raise ValueError(
+                f"Shape of yields {yields.shape} inconsistent with {len(parents)} "
+                f"parents and {len(products)} products"
+            )
+
+        self.parents = parents
+        self.products = products
+        self.yields = yields
+        self._parentIndex = {p: ix for ix, p in enumerate(parents)}
+        self._lastOrdering = None
+        self._lastRows = None
+
+    @classmethod
+    def fromMapping(cls, yields, nmats):
+        """Build a shared bank from a single mapping of yields
+
+        Parameters
+        ----------
+        yields : mapping of int to FissionYield
+            Fission yields for each parent isotope
+        nmats : int
+            Number of burnable materials that share these yields
+
+        Returns
+        -------
+        FissionYieldBank
+
+        """
+        parents = sorted(yields)
+        products = sorted(set().union(*(fy.products for fy in yields.values())))
+        matrix = numpy.zeros((len(parents), len(products)))
+        for ix, parent in enumerate(parents):
+            fy = yields[parent]
+            cols = numpy.searchsorted(products, fy.products)
+            matrix[ix, cols] = fy.yields
+        return cls(parents, products, matrix, nmats=nmats)
+
+    def __len__(self):
+        return self.yields.shape[0]
+
+    def __getitem__(self, index):
+        if not isinstance(index, Integral):
+            raise TypeError(
+                f"{self.__class__.__name__} indices must be integers, not "
+                f"{type(index)}"
+            )
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return BankedYields(self, index)
+
+    def __repr__(self):
+        return "<{} with {} parents, {} products in {} materials>".format(
+            self.__class__.__name__, len(self.parents), len(self.products), len(self)
+        )
+
+    def parentIndex(self, parent):
+        """Position of ``parent`` in :attr:`parents`, or ``None``"""
+        return self._parentIndex.get(parent)
+
+    def productRows(self, ordering):
+        """Map each product to a row in a depletion matrix
+
+        The most recent ordering and result are cached, so repeated
+        calls with the same mapping, e.g. for each burnable material,
+        are cheap.
+
+        Parameters
+        ----------
+        ordering : dict of int to int
+            Map of isotope ZAI to row index
+
+        Returns
+        -------
+        numpy.ndarray
+            Array of length ``len(products)`` with the row for each
+            product, or ``-1`` if the product is not in ``ordering``
+
+        """
+        if ordering is not self._lastOrdering:
+            self._lastRows = numpy.fromiter(
+                (ordering.get(p, -1) for p in self.products),
+                dtype=int,
+                count=len(self.products),
+            )
+            self._lastOrdering = ordering
+        return self._lastRows
+
+
+class BankedYields(Mapping):
+    """Fission yields for a single material inside a :class:`FissionYieldBank`
+
+    Maps parent ZAI to :class:`FissionYield`, with views into
+    the underlying array rather than copies.
+
+    Parameters
+    ----------
+    bank : FissionYieldBank
+        Bank containing yields for all materials
+    index : int
+        Position of this material in the bank
+
+    Attributes
+    ----------
+    bank : FissionYieldBank
+        Bank containing yields for all materials
+    index : int
+        Position of this material in the bank
+    matrix : numpy.ndarray
+        Read-only yields of shape ``(nparents, nproducts)``
+        for this material
+
+    """
+
+    __slots__ = ("bank", "index", "matrix")
+
+    def __init__(self, bank, index):
+        self.bank = bank
+        self.index = index
+        self.matrix = bank.yields[index]
+
+    def __len__(self):
+        return len(self.bank.parents)
+
+    def __iter__(self):
+        return iter(self.bank.parents)
+
+    def __getitem__(self, parent):
+        row = self.getYields(parent)
+        if row is None:
+            raise KeyError(parent)
+        return FissionYield(self.bank.products, row)
+
+    def getYields(self, parent):
+        """Return the array of yields for ``parent`` or ``None``"""
+        ix = self.bank.parentIndex(parent)
+        if ix is None:
+            return None
+        return self.matrix[ix]
@@ -0,0 +1,305 @@
+"""Dispatch events from the integrator to user-provided callbacks
+
+Payloads share memory with the simulation rather than copying it.
+Arrays are exposed through read-only views, so callbacks can inspect
+every step without slowing the main sequence. Callbacks that are
+slow, e.g. those sending data over a network, can be dispatched from
+a background thread.
+
+>>> from hydep.internal import TimeStep, TransportResult
+>>> hooks = HookDispatcher()
+>>> seen = []
+>>> hooks.add("after_transport", lambda e: seen.append(e.result.flux.sum()))
+>>> hooks.emit("after_transport", TimeStep(), result=TransportResult([1, 2], [1, 0]))
+>>> seen
+[3.0]
+>>> hooks.emit("step_complete", TimeStep())
+>>> hooks.emit("after_flux", TimeStep())
+Traceback (most recent call last):
+...
+ValueError: Unknown event after_flux. Expected one of before_hf_solve, \
+after_transport, after_deplete, after_store, step_complete
+
+"""
+
+import copy
+import queue
+import threading
+from collections import namedtuple
+
+import numpy
+
+from .timestep import TimeStep
+from .utils import CompBundle
+
+__all__ = ["HookDispatcher", "HookEvent", "EVENTS"]
+
+EVENTS = (
+    "before_hf_solve",
+    "after_transport",
+    "after_deplete",
+    "after_store",
+    "step_complete",
+)
+
+HookEvent = namedtuple("HookEvent", "name timestep result compositions")
+HookEvent.__doc__ = """Payload passed to each hook
+
+Parameters
+----------
+name : str
+    Name of the event, one of :data:`EVENTS`
+timestep : hydep.internal.TimeStep
+    Snapshot of the time step at which the event occurred
+result : hydep.internal.TransportResult or None
+    Read-only view of the most recent transport result, if relevant
+compositions : hydep.internal.CompBundle or None
+    Read-only view of the most recent compositions, if relevant
+"""
+
+
+def _readOnly(array):
+    if array is None:
+        return None
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def readOnlyResult(result):
+    """Shallow copy of a transport result with read-only arrays
+
+    The flux, flux uncertainty, and microscopic cross sections are
+    views of the original arrays, and cannot be modified. Remaining
+    attributes, e.g. fission yields, are shared with ``result``
+
+    Parameters
+    ----------
+    result : hydep.internal.TransportResult or None
+        Result to be viewed
+
+    Returns
+    -------
+    hydep.internal.TransportResult or None
+        View of ``result``, or ``None`` if ``result`` is ``None``
+
+    """
+    if result is None:
+        return None
+    view = copy.copy(result)
+    view._flux = _readOnly(result.flux)
+    view._fluxUncertainty = _readOnly(result.fluxUncertainty)
+    if result.microXS is not None:
+        view._microXS = copy.copy(result.microXS)
+        view._microXS.data = _readOnly(result.microXS.data)
+    return view
+
+
+def readOnlyCompositions(compositions):
+    """Compositions sharing read-only densities
+
+    Parameters
+    ----------
+    compositions : hydep.internal.CompBundle or None
+        Compositions to be viewed
+
+    Returns
+    -------
+    hydep.internal.CompBundle or None
+        View of ``compositions``, or ``None`` if ``compositions``
+        is ``None``
+
+    """
+    if compositions is None:
+        return None
+    return CompBundle(
+        compositions.isotopes,
+        _readOnly(numpy.asarray(compositions.densities)),
+    )
+
+
+class HookDispatcher:
+    """Registry of callbacks for events in the integration sequence
+
+    Callbacks are passed a single :class:`HookEvent`. Synchronous
+    callbacks are called in the order they were added, and any
+    exception they raise propagates to the caller of :meth:`emit`,
+    e.g. to stop :meth:`hydep.lib.Integrator.integrate` early.
+    Asynchronous callbacks are called, in order, from a single
+    background thread. Exceptions they raise are re-raised by the
+    next call to :meth:`emit` or :meth:`close`. If the queue of
+    pending asynchronous events is full, :meth:`emit` blocks until
+    the background thread catches up.
+
+    If no callbacks are registered for an event, :meth:`emit` returns
+    without creating a payload.
+
+    Parameters
+    ----------
+    maxPending : int, optional
+        Maximum number of events queued for asynchronous callbacks
+
+    Attributes
+    ----------
+    maxPending : int
+        Maximum number of events queued for asynchronous callbacks
+
+    """
+
+    def __init__(self, maxPending=16):
+        if int(maxPending) < 1:
+            raise ValueError(f"maxPending must be positive, not {maxPending}")
+        self.maxPending = int(maxPending)
+        self._hooks = {}
+        self._queue = None
+        self._thread = None
+        self._error = None
+
+    @staticmethod
+    def _checkEvent(event):
+        if event not in EVENTS:
+            raise ValueError(
+                f"Unknown event {event}. Expected one of {', '.join(EVENTS)}"
+            )
+
+    def add(self, event, func, asynchronous=False):
+        """Call ``func`` with a :class:`HookEvent` each time ``event`` occurs
+
+        Parameters
+        ----------
+        event : str
+            Name of the event, one of :data:`EVENTS`
+        func : callable
+            Function to be called with a single :class:`HookEvent`
+        asynchronous : bool, optional
+            Call ``func`` from a background thread rather than
+            blocking the simulation
+
+        """
+        self._checkEvent(event)
+        if not callable(func):
+            raise TypeError(f"Hook for {event} must be callable, not {type(func)}")
+        self._hooks.setdefault(event, []).append((func, bool(asynchronous)))
+
+    def remove(self, event, func):
+        """Stop calling ``func`` when ``event`` occurs
+
+        Parameters
+        ----------
+        event : str
+            Name of the event, one of :data:`EVENTS`
+        func : callable
+            Function previously passed to :meth:`add`
+
+        Raises
+        ------
+        ValueError
+            If ``func`` was not added for ``event``
+
+        """
+        self._checkEvent(event)
+        hooks = self._hooks.get(event, [])
+        for index, (hook, _asynchronous) in enumerate(hooks):
+            if hook is func:
+                del hooks[index]
+                break
+        else:
+            raise ValueError(f"{func} is not a hook for {event}")
+        if not hooks:
+            del self._hooks[event]
+
+    def emit(self, event, timestep, result=None, compositions=None):
+        """Call all hooks registered for ``event``
+
+        Parameters
+        ----------
+        event : str
+            Name of the event, one of :data:`EVENTS`
+        timestep : hydep.internal.TimeStep
+            Current time step. Hooks are passed a snapshot, so
+            later changes to ``timestep`` are not reflected
+        result : hydep.internal.TransportResult, optional
+            Transport result passed as a read-only view
+        compositions : hydep.internal.CompBundle, optional
+            Compositions passed as a read-only view
+
+        Raises
+        ------
+        Exception
+            Any error raised by a synchronous hook, or by an
+            asynchronous hook for a previous event
+
+        """
+        hooks = self._hooks.get(event)
+        if not hooks:
+            self._checkEvent(event)
+            return
+        self._raiseError()
+        payload = HookEvent(
+            event,
+            TimeStep(
+                timestep.coarse, timestep.substep, timestep.total,
+                timestep.currentTime,
+            ),
+            readOnlyResult(result),
+            readOnlyCompositions(compositions),
+        )
+        deferred = []
+        # Hooks may remove themselves
+        for func, asynchronous in tuple(hooks):
+            if asynchronous:
+                deferred.append(func)
+            else:
+                func(payload)
+        if deferred:
+            self._submit(deferred, payload)
+
+    def _submit(self, funcs, payload):
+        if self._thread is None:
+            self._queue = queue.Queue(maxsize=self.maxPending)
+            self._thread = threading.Thread(
+                target=self._work, name="hydep-hooks", daemon=True
+            )
+            self._thread.start()
+        self._queue.put((funcs, payload))
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if self._error is not None:
+                    continue
+                funcs, payload = item
+                for func in funcs:
+                    func(payload)
+            except BaseException as ee:
+                self._error = ee
+            finally:
+                self._queue.task_done()
+
+    def _raiseError(self):
+        error = self._error
+        if error is not None:
+            self._error = None
+            raise error
+
+    def close(self):
+        """Wait for all asynchronous hooks to complete
+
+        Hooks remain registered, and a new background thread is
+        started by the next asynchronous event
+
+        Raises
+        ------
+        Exception
+            Any error raised by an asynchronous hook
+
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            self._queue = None
+        self._raiseError()
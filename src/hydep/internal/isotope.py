@@ -72,6 +72,9 @@ class Isotope:
     decayConstant : Union[float, None]
         If this isotope decays, this quantity describes the decay
         constant, or :math:`ln(2)/t_{1/2}``
+    decayEnergy : Union[float, None]
+        If this isotope decays, the average energy [eV] released
+        per decay
     reactions : set of ReactionTuple
         Iterable describing the various neutron-induced
         transmutation reactions this isotope can experience
@@ -86,7 +89,7 @@ class Isotope:
     # TODO Find existing isotopes with __new__?
     # TODO Make this a dataclass? Python >= 3.7
     __slots__ = ("_name", "_zai", "decayModes", "reactions",
-                 "decayConstant", "fissionYields")
+                 "decayConstant", "decayEnergy", "fissionYields")
 
     def __init__(self, name, z, a=None, i=None):
         self._name = name
@@ -110,6 +113,7 @@ class Isotope:
             self._zai = ZaiTuple(z, a, i)
 
         self.decayConstant = None
+        self.decayEnergy = None
         self.decayModes = set()
         self.reactions = set()
         self.fissionYields = None
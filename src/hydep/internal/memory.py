@@ -0,0 +1,184 @@
+"""Track the resident memory of this process and its children
+
+On Linux, the resident set size of this process and all descendant
+processes, e.g. the depletion worker pool and Serpent, is read from
+``/proc``. Elsewhere the operating system's peak resident size is
+used, which cannot decrease and so only resolves the first phase to
+reach a new peak.
+"""
+
+import os
+import sys
+import pathlib
+import threading
+
+__all__ = ["MemoryTracker", "residentMemory"]
+
+_PROC = pathlib.Path("/proc")
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def _rss(pid) -> int:
+    try:
+        with open(_PROC / str(pid) / "statm") as stream:
+            return int(stream.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        # Process may have exited
+        return 0
+
+
+def _children(pid):
+    children = []
+    try:
+        tasks = list((_PROC / str(pid) / "task").iterdir())
+    except OSError:
+        return children
+    for task in tasks:
+        try:
+            children.extend(int(c) for c in (task / "children").read_text().split())
+        except (OSError, ValueError):
+            continue
+    return children
+
+
+def _peakRusage() -> int:
+    if resource is None:
+        return 0
+    # Kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return scale * (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    )
+
+
+def residentMemory() -> int:
+    """Resident memory [bytes] of this process and all descendants
+
+    Returns
+    -------
+    int
+        Current resident memory if ``/proc`` is available, otherwise
+        the peak resident memory of this process and its children
+
+    """
+    if not (_PROC / "self" / "statm").is_file():
+        return _peakRusage()
+    pid = os.getpid()
+    total = 0
+    pending = [pid]
+    seen = set()
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        total += _rss(current)
+        pending.extend(_children(current))
+    return total
+
+
+class MemoryTracker:
+    """Sample resident memory to find the peak within overlapping intervals
+
+    Intervals are started with :meth:`begin` and completed with
+    :meth:`end`. A background thread, started with :meth:`start`,
+    samples :func:`residentMemory` every ``interval`` seconds and
+    updates the peak of all open intervals. Memory is also sampled
+    at the start and end of each interval, so short intervals are
+    still measured without the background thread
+
+    Parameters
+    ----------
+    interval : float, optional
+        Seconds between samples from the background thread
+
+    Attributes
+    ----------
+    interval : float
+        Seconds between samples from the background thread
+    peak : int
+        Largest resident memory [bytes] sampled so far
+
+    """
+
+    def __init__(self, interval=0.05):
+        if interval <= 0:
+            raise ValueError(f"Sampling interval must be positive, not {interval}")
+        self.interval = interval
+        self.peak = 0
+        self._lock = threading.Lock()
+        self._open = {}
+        self._counter = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self) -> int:
+        """Sample the resident memory and update all open intervals
+
+        Returns
+        -------
+        int
+            Resident memory [bytes]
+
+        """
+        current = residentMemory()
+        with self._lock:
+            self.peak = max(self.peak, current)
+            for token, value in self._open.items():
+                if current > value:
+                    self._open[token] = current
+        return current
+
+    def begin(self) -> int:
+        """Open a new interval
+
+        Returns
+        -------
+        int
+            Token to be passed to :meth:`end`
+
+        """
+        with self._lock:
+            self._counter += 1
+            token = self._counter
+            self._open[token] = 0
+        self.sample()
+        return token
+
+    def end(self, token) -> int:
+        """Close an interval and return the peak memory [bytes] within it"""
+        self.sample()
+        with self._lock:
+            return self._open.pop(token)
+
+    def _work(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        """Start sampling from a background thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._work, name="hydep-memory", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling from the background thread"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
@@ -38,6 +38,12 @@ class TransportResult:
         If given, pass to :attr:`fmtx`
     microXS : Optional[Sequence]
         If given, pass to :attr:microXS`
+    fissionYields : Optional[Sequence]
+        If given, pass to :attr:`fissionYields`
+    particles : Optional[int]
+        If given, pass to :attr:`particles`
+    fluxUncertainty : Optional[Iterable[Iterable[float]]]
+        If given, pass to :attr:`fluxUncertainty`
 
     Attributes
     ----------
@@ -62,6 +68,12 @@ class TransportResult:
         ``i``
     microXS : hydep.internal.MaterialDataArray or None
         Microscopic cross sections in each burnable region.
+    particles : int or None
+        Number of particles simulated per cycle, if this solution
+        used a stochastic method
+    fluxUncertainty : numpy.ndarray or None
+        Relative uncertainty on :attr:`flux` with an identical
+        shape, if computed
 
     """
 
@@ -73,6 +85,8 @@ class TransportResult:
         "_fmtx",
         "_microXS",
         "_fissionYields",
+        "_particles",
+        "_fluxUncertainty",
     )
 
     def __init__(
@@ -84,6 +98,8 @@ class TransportResult:
         fmtx=None,
         microXS=None,
         fissionYields=None,
+        particles=None,
+        fluxUncertainty=None,
     ):
         self.flux = flux
         self.keff = keff
@@ -92,6 +108,8 @@ class TransportResult:
         self.fmtx = fmtx
         self.microXS = microXS
         self.fissionYields = fissionYields
+        self.particles = particles
+        self.fluxUncertainty = fluxUncertainty
 
     @property
     def flux(self):
@@ -215,3 +233,37 @@ class TransportResult:
                     )
                 )
         self._fissionYields = value
+
+    @property
+    def particles(self):
+        return self._particles
+
+    @particles.setter
+    def particles(self, value):
+        if value is None:
+            self._particles = None
+            return
+        if not isinstance(value, numbers.Integral):
+            raise TypeError(f"Particles must be integer, not {type(value)}")
+        if value <= 0:
+            raise ValueError(f"Particles must be positive, not {value}")
+        self._particles = value
+
+    @property
+    def fluxUncertainty(self):
+        return self._fluxUncertainty
+
+    @fluxUncertainty.setter
+    def fluxUncertainty(self, value):
+        if value is None:
+            self._fluxUncertainty = None
+            return
+        unc = numpy.ascontiguousarray(value, dtype=float)
+        if len(unc.shape) == 1:
+            unc = unc.reshape(unc.size, 1)
+        if unc.shape != self._flux.shape:
+            raise ValueError(
+                f"Flux uncertainty shape {unc.shape} does not match flux "
+                f"shape {self._flux.shape}"
+            )
+        self._fluxUncertainty = unc
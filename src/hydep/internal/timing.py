@@ -0,0 +1,325 @@
+"""Accumulate time spent in distinct phases of a simulation
+
+A single :class:`PhaseTimer`, :data:`TIMER`, is shared across the
+framework so solvers, the depletion manager, and result stores can
+record time without passing a timer through every interface. Phases
+are identified by dotted names, e.g. ``"deplete.cram"``, and are
+attributed to the current :attr:`PhaseTimer.step`, updated by
+:class:`hydep.lib.Integrator` to track
+:attr:`hydep.internal.TimeStep.total`.
+
+>>> timer = PhaseTimer()
+>>> with timer.phase("demo"):
+...     pass
+>>> timer.step = 2
+>>> with timer.phase("demo"):
+...     pass
+>>> timer.totals()["demo"][2]
+2
+>>> timer.toArrays()["demo"][:, 0].tolist()
+[0.0, 2.0]
+
+"""
+
+import time
+import threading
+import contextlib
+
+import numpy
+
+__all__ = ["PhaseTimer", "TIMER", "timed", "noteArray"]
+
+
+class PhaseTimer:
+    """Record wall and CPU time spent in named phases at each step
+
+    CPU time is measured with :func:`time.process_time`, and so
+    includes all threads in this process, e.g. those parsing output
+    files concurrently, but not child processes like Serpent or the
+    depletion worker pool. Recording is thread safe. Repeated entries
+    into the same phase at the same step are accumulated
+
+    If :attr:`memory` is set, the peak memory within each phase, and
+    the size of arrays passed to :meth:`noteArray`, are also recorded,
+    keeping the largest value at each step
+
+    Attributes
+    ----------
+    step : int
+        Step to which new records are attributed
+    memory : hydep.internal.MemoryTracker or None
+        Tracker used to find the peak memory in each phase. Memory
+        is not recorded if ``None`` [default]
+    phases : tuple of str
+        Names of all recorded phases, in the order they were
+        first recorded
+
+    """
+
+    def __init__(self):
+        self.step = 0
+        self.memory = None
+        self._lock = threading.Lock()
+        self._records = {}
+        self._peaks = {}
+        self._arrays = {}
+
+    def reset(self):
+        """Remove all records and return to the first step"""
+        with self._lock:
+            self._records = {}
+            self._peaks = {}
+            self._arrays = {}
+        self.step = 0
+
+    @property
+    def phases(self):
+        return tuple(self._records)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Time the body of a ``with`` block as phase ``name``
+
+        Time is recorded even if the block raises an exception
+
+        Parameters
+        ----------
+        name : str
+            Name of the phase
+
+        """
+        step = self.step
+        memory = self.memory
+        token = None if memory is None else memory.begin()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            self.record(
+                name,
+                time.perf_counter() - wall,
+                time.process_time() - cpu,
+                step=step,
+            )
+            if token is not None:
+                self._keepLargest(self._peaks, name, step, memory.end(token))
+
+    def _keepLargest(self, records, name, step, value):
+        with self._lock:
+            steps = records.setdefault(name, {})
+            if value > steps.get(step, -1):
+                steps[step] = value
+
+    def noteArray(self, name, array):
+        """Record the size of an array if :attr:`memory` is set
+
+        Parameters
+        ----------
+        name : str
+            Name of the array, e.g. ``"compositions"``
+        array : numpy.ndarray
+            Array whose size is recorded
+
+        """
+        if self.memory is not None:
+            self._keepLargest(self._arrays, name, self.step, array.nbytes)
+
+    def record(self, name, wall, cpu, step=None):
+        """Add time spent in a phase
+
+        Parameters
+        ----------
+        name : str
+            Name of the phase
+        wall : float
+            Elapsed wall time [s]
+        cpu : float
+            Elapsed CPU time [s]
+        step : int, optional
+            Step to attribute the time to. Defaults to :attr:`step`
+
+        """
+        if step is None:
+            step = self.step
+        with self._lock:
+            steps = self._records.setdefault(name, {})
+            entry = steps.get(step)
+            if entry is None:
+                steps[step] = [wall, cpu, 1]
+            else:
+                entry[0] += wall
+                entry[1] += cpu
+                entry[2] += 1
+
+    def toArrays(self):
+        """Recorded times for all phases
+
+        Returns
+        -------
+        dict of str to numpy.ndarray
+            Each value is a two dimensional array with one row per
+            step that recorded this phase, sorted by step. Columns
+            are the step, wall time [s], CPU time [s], and number of
+            times the phase was recorded at that step
+
+        """
+        with self._lock:
+            return {
+                name: numpy.array(
+                    [(step, ) + tuple(entry) for step, entry in sorted(steps.items())],
+                    dtype=numpy.float64,
+                )
+                for name, steps in self._records.items()
+            }
+
+    @staticmethod
+    def _largestToArrays(records):
+        return {
+            name: numpy.array(sorted(steps.items()), dtype=numpy.int64)
+            for name, steps in records.items()
+        }
+
+    def peakMemory(self):
+        """Peak memory recorded in each phase
+
+        Returns
+        -------
+        dict of str to numpy.ndarray
+            Each value is a two dimensional integer array with one row
+            per step that recorded this phase, sorted by step. Columns
+            are the step and the peak memory [bytes]. Empty unless
+            :attr:`memory` was set
+
+        """
+        with self._lock:
+            return self._largestToArrays(self._peaks)
+
+    def largestArrays(self):
+        """Largest size of each array passed to :meth:`noteArray`
+
+        Returns
+        -------
+        dict of str to numpy.ndarray
+            Each value is a two dimensional integer array with one row
+            per step where the array was noted, sorted by step.
+            Columns are the step and the size [bytes]
+
+        """
+        with self._lock:
+            return self._largestToArrays(self._arrays)
+
+    def memorySummary(self):
+        """Table of the largest memory recorded for each phase and array
+
+        Returns
+        -------
+        str
+            Table with the peak memory and step of the peak for each
+            phase, followed by each array
+
+        """
+        rows = []
+        for kind, records in (
+            ("Phase", self.peakMemory()),
+            ("Array", self.largestArrays()),
+        ):
+            for name in sorted(records):
+                steps = records[name]
+                ix = steps[:, 1].argmax()
+                rows.append((kind, name, steps[ix, 0], steps[ix, 1] / 2**20))
+        width = max([len(r[1]) for r in rows] + [len("Name")])
+        header = f"{'Kind':<5} {'Name':<{width}} {'Step':>6} {'Peak [MiB]':>11}"
+        lines = [header, "-" * len(header)]
+        for kind, name, step, mib in rows:
+            lines.append(f"{kind:<5} {name:<{width}} {step:>6d} {mib:>11.2f}")
+        return "\n".join(lines)
+
+    def totals(self):
+        """Total time spent in each phase
+
+        Returns
+        -------
+        dict of str to (float, float, int)
+            Wall time [s], CPU time [s], and number of times each
+            phase was recorded, summed across all steps
+
+        """
+        out = {}
+        with self._lock:
+            for name, steps in self._records.items():
+                wall = cpu = calls = 0
+                for stepWall, stepCPU, stepCalls in steps.values():
+                    wall += stepWall
+                    cpu += stepCPU
+                    calls += stepCalls
+                out[name] = (wall, cpu, calls)
+        return out
+
+    def summary(self, total=None):
+        """Table of the total time spent in each phase
+
+        Parameters
+        ----------
+        total : float, optional
+            Wall time [s] used to compute the fraction spent in each
+            phase. If not given, fractions are not reported
+
+        Returns
+        -------
+        str
+            Table with one row per phase, sorted by name so nested
+            phases follow their parent
+
+        """
+        totals = self.totals()
+        width = max((len(name) for name in totals), default=5)
+        width = max(width, len("Phase"))
+        header = f"{'Phase':<{width}} {'Calls':>7} {'Wall [s]':>11} {'CPU [s]':>11}"
+        if total:
+            header += f" {'Wall [%]':>8}"
+        lines = [header, "-" * len(header)]
+        for name in sorted(totals):
+            wall, cpu, calls = totals[name]
+            line = f"{name:<{width}} {calls:>7d} {wall:>11.4E} {cpu:>11.4E}"
+            if total:
+                line += f" {100 * wall / total:>8.2f}"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+TIMER = PhaseTimer()
+
+
+def noteArray(name, array):
+    """Record the size of an array with the shared :data:`TIMER`
+
+    Only recorded if memory is being tracked, so this is inexpensive
+    to call otherwise
+
+    Parameters
+    ----------
+    name : str
+        Name of the array
+    array : numpy.ndarray
+        Array whose size is recorded
+
+    """
+    TIMER.noteArray(name, array)
+
+
+def timed(name):
+    """Time a phase with the shared :data:`TIMER`
+
+    Parameters
+    ----------
+    name : str
+        Name of the phase
+
+    Returns
+    -------
+    contextlib.AbstractContextManager
+        Records the time spent inside the ``with`` block
+
+    """
+    return TIMER.phase(name)
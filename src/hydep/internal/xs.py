@@ -10,6 +10,7 @@ import numbers
 import numpy
 
 from hydep.internal.timetravel import TimeTraveler
+from hydep.internal.timing import timed, noteArray
 
 
 class XsIndex:
@@ -467,12 +468,32 @@ class DataBank(TimeTraveler):
             subsequent calls to :meth:`at` and :meth:`getReactionRatesAt`
         materialData : MaterialDataArray
             Cross section data for all materials at this point in time.
-            Must have a consistent index with :attr:`reactionIndex`
+            Must have a consistent index with :attr:`reactionIndex`.
+            Entries that are ``numpy.nan``, e.g. reactions that were
+            not requested from the transport solver, are filled with
+            the most recently pushed values
+
+        Raises
+        ------
+        ValueError
+            If any entries are ``numpy.nan`` and no data have been
+            pushed, as there are no values to reuse
 
         """
         if materialData.index != self._reactionIndex:
             raise ValueError("Reaction indices do not conform")
-        super().push(t, materialData.data)
+        data = materialData.data
+        missing = numpy.isnan(data)
+        if missing.any():
+            if not self._timeIndex:
+                raise ValueError(
+                    f"{missing.sum()} reactions are missing and no previous "
+                    "data are available to replace them"
+                )
+            data = data.copy()
+            data[missing] = self._data[self._timeIndex[-1]][missing]
+        super().push(t, data)
+        noteArray("xs.bank", self._data)
 
     def at(
         self, t: float, atol: typing.Optional[float] = 1e-12
@@ -509,7 +530,8 @@ class DataBank(TimeTraveler):
             there is no data to be projected
 
         """
-        data = super().at(t, atol=atol)
+        with timed("xs.extrapolate"):
+            data = super().at(t, atol=atol)
         return MaterialDataArray(self._reactionIndex, data)
 
     def getReactionRatesAt(
@@ -2,5 +2,5 @@
 # flake8: noqa
 from .solvers import TransportSolver, HighFidelitySolver, ReducedOrderSolver
 from .universe import Universe
-from .store import BaseStore
+from .store import BaseStore, AsyncStore
 from ._integrator import Integrator
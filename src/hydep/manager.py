@@ -20,6 +20,7 @@ from hydep.typed import TypedAttr, IterableOf
 from hydep.internal import Cram16Solver, Cram48Solver, CompBundle
 from hydep.internal.features import FeatureCollection, MICRO_REACTION_XS, FISSION_YIELDS
 from hydep.internal.utils import FakeSequence
+from hydep.internal.timing import timed
 
 
 __all__ = ["Manager"]
@@ -424,15 +425,24 @@ class Manager:
 
         zaiOrder = {iso.zai: ix for ix, iso in enumerate(concentrations.isotopes)}
 
-        matrices = starmap(
-            self.chain.formMatrix,
-            zip(reactionRates, fissionYields, repeat(zaiOrder, nm)),
-        )
+        with timed("deplete.matrix"):
+            matrices = list(starmap(
+                self.chain.formMatrix,
+                zip(reactionRates, fissionYields, repeat(zaiOrder, nm)),
+            ))
 
         inputs = zip(matrices, concentrations.densities, repeat(dtSeconds, nm))
 
-        with multiprocessing.Pool() as p:
-            out = p.starmap(self._depsolver, inputs)
+        # Separate the cost of starting and stopping worker processes
+        # from the depletion solutions
+        with timed("deplete.pool"):
+            pool = multiprocessing.Pool()
+        try:
+            with timed("deplete.cram"):
+                out = pool.starmap(self._depsolver, inputs)
+        finally:
+            with timed("deplete.pool"):
+                pool.terminate()
 
         densities = numpy.asarray(out)
 
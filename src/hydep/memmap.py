@@ -0,0 +1,793 @@
+"""
+Store results in a directory of memory-mapped NumPy arrays
+
+Alternative to :mod:`hydep.hdf` that avoids the HDF library while the
+simulation is running. Results can be converted to the HDF format with
+:func:`toHdf`.
+"""
+import os
+import json
+import pathlib
+import numbers
+import tempfile
+import typing
+
+import numpy
+from numpy.lib.format import open_memmap
+import scipy.sparse
+
+import hydep
+from hydep.constants import SECONDS_PER_DAY
+from .store import BaseStore
+
+__all__ = ["MemmapStore", "MemmapProcessor", "toHdf"]
+
+MANIFEST = "manifest.json"
+FMTX_DIR = "fissionMatrix"
+
+
+def _writeManifest(directory, manifest):
+    with tempfile.NamedTemporaryFile(
+        "w", dir=directory, suffix=".tmp", delete=False
+    ) as stream:
+        json.dump(manifest, stream)
+    os.replace(stream.name, directory / MANIFEST)
+
+
+class MemmapStore(BaseStore):
+    """Write results to preallocated memory-mapped ``.npy`` files
+
+    Arrays for all time steps are allocated in :meth:`beforeMain`, and
+    results are written directly into them. A ``manifest.json`` file
+    describes the problem, the isotopes and materials, and the most
+    recent time step written. Fission matrices are written as
+    compressed sparse row ``.npz`` files, one per time step.
+
+    The following arrays are written, using the same names and
+    layout as the HDF format (see :ref:`hdf-format`):
+
+    * ``time.npy`` - points in calendar time [s]
+    * ``highFidelity.npy`` - flags for high fidelity solutions
+    * ``multiplicationFactor.npy`` - multiplication factor and
+      uncertainty
+    * ``cpuTimes.npy`` - cpu time of each transport solution [s]
+    * ``fluxes.npy`` - fluxes in each burnable material
+    * ``compositions.npy`` - atom densities [#/b-cm]
+    * ``compositionSteps.npy`` - time step index of each entry in
+      ``compositions.npy``
+    * ``particles.npy`` - particles per cycle, zero if not reported
+    * ``fluxUncertainty.npy`` - relative flux uncertainties, only
+      written if reported by a transport solution
+
+    Parameters
+    ----------
+    directory : str or pathlib.Path, optional
+        Directory for the arrays. Will be created if it does not
+        exist. Default: ``"hydep-results"``
+    existOkay : bool, optional
+        If ``False``, raise an error if ``directory`` already contains
+        a manifest. Otherwise silently overwrite existing results
+    append : bool, optional
+        If ``directory`` contains results, keep them and continue
+        writing into the existing arrays, e.g. when resuming a
+        simulation from a checkpoint. The layout passed to
+        :meth:`beforeMain` must match the existing results
+
+    Attributes
+    ----------
+    VERSION : Tuple[int, int]
+        Major and minor version of the stored data
+    directory : pathlib.Path
+        Absolute path to the result directory
+    lastWrittenStep : int
+        Index of the most recent time step written, or ``-1``
+
+    Raises
+    ------
+    OSError
+        If ``directory`` exists and is not a directory
+    FileExistsError
+        If ``directory`` contains results and ``existOkay``
+        evaluates to ``False``
+
+    """
+
+    _VERSION = (1, 0)
+
+    def __init__(
+        self,
+        directory: typing.Optional[str] = None,
+        existOkay: typing.Optional[bool] = True,
+        append: typing.Optional[bool] = False,
+    ):
+        if directory is None:
+            directory = "hydep-results"
+        directory = pathlib.Path(directory).resolve()
+        append = bool(append) and (directory / MANIFEST).is_file()
+
+        if directory.exists():
+            if not directory.is_dir():
+                raise OSError(f"Result directory {directory} is not a directory")
+            if not existOkay and not append and (directory / MANIFEST).exists():
+                raise FileExistsError(
+                    f"Refusing to overwrite results in {directory} since "
+                    "existOkay is False"
+                )
+        else:
+            directory.mkdir(parents=True)
+
+        self._directory = directory
+        self._arrays = {}
+        self._manifest = None
+        self._compositionRows = None
+        self.append = append
+        self.lastWrittenStep = -1
+
+    @property
+    def directory(self):
+        return self._directory
+
+    @property
+    def VERSION(self):
+        return self._VERSION
+
+    def _allocate(self, name, shape, dtype, fill=None):
+        array = open_memmap(
+            self._directory / f"{name}.npy", mode="w+", dtype=dtype, shape=shape
+        )
+        if fill is not None:
+            array[:] = fill
+        self._arrays[name] = array
+        return array
+
+    def beforeMain(
+        self, nhf, ntransport, ngroups, isotopes, burnableIndexes,
+        compositionSteps=None,
+    ):
+        """Allocate arrays and write the manifest
+
+        Parameters
+        ----------
+        nhf : int
+            Number of high-fidelity transport solutions
+        ntransport : int
+            Number of total transport solutions
+        ngroups : int
+            Number of energy groups
+        isotopes : tuple of hydep.internal.Isotope
+            Isotopes used in the depletion chain
+        burnableIndexes : iterable of [int, str, float]
+            Each item is a 3-tuple of material id, name, and volume.
+        compositionSteps : sequence of int, optional
+            Time steps where compositions will be written. Defaults
+            to all ``ntransport`` steps
+
+        """
+        if compositionSteps is None:
+            compositionSteps = range(ntransport)
+            self._compositionRows = None
+        else:
+            compositionSteps = sorted(compositionSteps)
+            self._compositionRows = {
+                step: row for row, step in enumerate(compositionSteps)
+            }
+        burnableIndexes = [tuple(b) for b in burnableIndexes]
+        nmats = len(burnableIndexes)
+        self._manifest = {
+            "fileVersion": list(self.VERSION),
+            "hydepVersion": [int(x) for x in hydep.__version__.split(".")[:3]],
+            "coarseSteps": nhf,
+            "totalSteps": ntransport,
+            "isotopes": len(isotopes),
+            "burnableMaterials": nmats,
+            "energyGroups": ngroups,
+            "lastWrittenStep": self.lastWrittenStep,
+            "isotopeTable": {
+                "zais": [iso.zai for iso in isotopes],
+                "names": [iso.name for iso in isotopes],
+            },
+            "materialTable": {
+                "ids": [b[0] for b in burnableIndexes],
+                "names": [b[1] for b in burnableIndexes],
+                "volumes": [float(b[2]) for b in burnableIndexes],
+            },
+            "arrays": [],
+        }
+
+        if self.append:
+            self._openExisting(compositionSteps)
+            return
+
+        self._allocate("time", (ntransport, ), numpy.float64)
+        self._allocate("highFidelity", (ntransport, ), bool)
+        self._allocate("multiplicationFactor", (ntransport, 2), numpy.float64)
+        self._allocate("cpuTimes", (ntransport, ), numpy.float64)
+        self._allocate("fluxes", (ntransport, nmats, ngroups), numpy.float64)
+        self._allocate(
+            "compositions", (len(compositionSteps), nmats, len(isotopes)),
+            numpy.float64,
+        )
+        self._allocate(
+            "compositionSteps", (len(compositionSteps), ), numpy.int64,
+            fill=compositionSteps,
+        )
+        self._allocate("particles", (ntransport, ), numpy.int64)
+        self.flush()
+
+    def _openExisting(self, compositionSteps):
+        # Continue writing into arrays from a previous simulation
+        with (self._directory / MANIFEST).open("r") as stream:
+            existing = json.load(stream)
+        for key, value in self._manifest.items():
+            if key in {"hydepVersion", "lastWrittenStep", "arrays"}:
+                continue
+            if existing.get(key) != value:
+                raise ValueError(
+                    f"Cannot append to {self._directory}: {key} differs"
+                )
+        self._arrays = {
+            name: open_memmap(self._directory / f"{name}.npy", mode="r+")
+            for name in existing["arrays"]
+        }
+        if self._arrays["compositionSteps"].tolist() != list(compositionSteps):
+            raise ValueError(
+                f"Cannot append to {self._directory}: composition steps differ"
+            )
+        self.lastWrittenStep = existing["lastWrittenStep"]
+
+    def postTransport(self, timeStep, transportResult) -> None:
+        """Write transport results
+
+        Parameters
+        ----------
+        timeStep : hydep.internal.TimeStep
+            Point in calendar time from where these results were
+            generated
+        transportResult : hydep.internal.TransportResult
+            Collection of data
+
+        """
+        ix = timeStep.total
+        arrays = self._arrays
+        arrays["time"][ix] = timeStep.currentTime
+        arrays["highFidelity"][ix] = not bool(timeStep.substep)
+        arrays["multiplicationFactor"][ix] = transportResult.keff
+        arrays["fluxes"][ix] = transportResult.flux
+        cputime = transportResult.runTime
+        arrays["cpuTimes"][ix] = numpy.nan if cputime is None else cputime
+
+        if transportResult.particles is not None:
+            arrays["particles"][ix] = transportResult.particles
+
+        fluxUnc = transportResult.fluxUncertainty
+        if fluxUnc is not None:
+            dest = arrays.get("fluxUncertainty")
+            if dest is None:
+                dest = self._allocate(
+                    "fluxUncertainty",
+                    arrays["fluxes"].shape,
+                    numpy.float64,
+                    fill=numpy.nan,
+                )
+            dest[ix] = fluxUnc
+
+        if transportResult.fmtx is not None:
+            fmtxDir = self._directory / FMTX_DIR
+            fmtxDir.mkdir(exist_ok=True)
+            scipy.sparse.save_npz(
+                fmtxDir / f"{ix}.npz", scipy.sparse.csr_matrix(transportResult.fmtx)
+            )
+
+        self.lastWrittenStep = max(self.lastWrittenStep, ix)
+
+    def writeCompositions(self, timeStep, compBundle) -> None:
+        """Write compositions for a given point in time
+
+        Parameters
+        ----------
+        timeStep : hydep.internal.TimeStep
+            Point in calendar time that corresponds to the
+            compositions
+        compBundle : hydep.internal.CompBundle
+            New compositions
+
+        Raises
+        ------
+        ValueError
+            If compositions are not expected at ``timeStep``
+
+        """
+        row = timeStep.total
+        if self._compositionRows is not None:
+            row = self._compositionRows.get(row)
+            if row is None:
+                raise ValueError(f"Compositions not expected at {timeStep}")
+        self._arrays["compositions"][row] = compBundle.densities
+        self.lastWrittenStep = max(self.lastWrittenStep, timeStep.total)
+
+    def flush(self) -> None:
+        """Flush arrays to disk and update the manifest"""
+        for array in self._arrays.values():
+            array.flush()
+        if self._manifest is not None:
+            self._manifest["lastWrittenStep"] = self.lastWrittenStep
+            self._manifest["arrays"] = sorted(self._arrays)
+            _writeManifest(self._directory, self._manifest)
+
+    def finalize(self, success) -> None:
+        """Flush arrays to disk and release the memory maps
+
+        Parameters
+        ----------
+        success : bool
+            ``True`` if the simulation completed without error
+
+        """
+        self.flush()
+        self._arrays = {}
+
+
+class MemmapProcessor:
+    """Read results written by :class:`MemmapStore`
+
+    Provides the same query methods as :class:`hydep.hdf.Processor`.
+    Arrays are opened as read-only memory maps, so only the requested
+    values are read from disk.
+
+    Parameters
+    ----------
+    directory : str or pathlib.Path
+        Directory written by :class:`MemmapStore`
+
+    Attributes
+    ----------
+    directory : pathlib.Path
+        Result directory
+    days : numpy.ndarray
+        Points in calendar time for all provided values
+    names : tuple of str
+        Isotope names ordered consistent with :attr:`zais`
+    zais : numpy.ndarray
+        Ordered isotopic ZAI identifiers
+    keff : numpy.ndarray
+        Nx2 array with multiplication factor and absolute uncertainty
+    hfFlags : numpy.ndarray
+        Boolean vector indicating high fidelity (True) or reduced
+        order solutions
+    fluxes : numpy.ndarray
+        NxMxG array with fluxes in each burnable region
+    compositions : numpy.ndarray
+        CxMxI array with isotopic compositions at the time steps in
+        :attr:`compositionSteps`
+    compositionSteps : numpy.ndarray
+        Time step index of each entry in :attr:`compositions`
+    compositionDays : numpy.ndarray
+        Points in calendar time [d] of each entry in :attr:`compositions`
+    volumes : numpy.ndarray
+        Volumes for each material
+    particles : numpy.ndarray
+        Particles per cycle used in each transport solution
+    fluxUncertainty : numpy.ndarray or None
+        NxMxG array of relative uncertainties on :attr:`fluxes`,
+        ``None`` if not written
+    lastWrittenStep : int
+        Index of the most recent time step written
+
+    """
+
+    def __init__(self, directory):
+        self.directory = pathlib.Path(directory)
+        with (self.directory / MANIFEST).open("r") as stream:
+            self._manifest = json.load(stream)
+
+        self._arrays = {
+            name: numpy.load(self.directory / f"{name}.npy", mmap_mode="r")
+            for name in self._manifest["arrays"]
+        }
+        self.days = self._arrays["time"] / SECONDS_PER_DAY
+        self.names = tuple(self._manifest["isotopeTable"]["names"])
+        self.zais = numpy.array(self._manifest["isotopeTable"]["zais"], dtype=int)
+        self.volumes = numpy.array(self._manifest["materialTable"]["volumes"])
+        self._nameIndex = None
+        self._zaiIndex = None
+        self._dayIndex = None
+        self._compositionIndex = None
+
+    def __getitem__(self, key: str) -> numpy.ndarray:
+        """Fetch an array by name, e.g. ``"compositions"``"""
+        return self._arrays[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._arrays
+
+    def keys(self):
+        return self._arrays.keys()
+
+    @property
+    def nCoarseSteps(self) -> int:
+        """Number of coarse transport steps"""
+        return self._manifest["coarseSteps"]
+
+    @property
+    def nTotalSteps(self) -> int:
+        """Number of transport steps, high-fidelity and reduced-order"""
+        return self._manifest["totalSteps"]
+
+    @property
+    def nIsotopes(self) -> int:
+        """Number of isotopes tracked and stored in :attr:`compositions`"""
+        return self._manifest["isotopes"]
+
+    @property
+    def nBurnableMats(self) -> int:
+        """Number of burnable materials"""
+        return self._manifest["burnableMaterials"]
+
+    @property
+    def nEnergyGroups(self) -> int:
+        """Number of energy groups"""
+        return self._manifest["energyGroups"]
+
+    @property
+    def lastWrittenStep(self) -> int:
+        return self._manifest["lastWrittenStep"]
+
+    @property
+    def materialIds(self) -> typing.Tuple[int, ...]:
+        return tuple(self._manifest["materialTable"]["ids"])
+
+    @property
+    def materialNames(self) -> typing.Tuple[str, ...]:
+        return tuple(self._manifest["materialTable"]["names"])
+
+    @property
+    def keff(self) -> numpy.ndarray:
+        return self._arrays["multiplicationFactor"]
+
+    @property
+    def hfFlags(self) -> numpy.ndarray:
+        return self._arrays["highFidelity"]
+
+    @property
+    def cpuTimes(self) -> numpy.ndarray:
+        return self._arrays["cpuTimes"]
+
+    @property
+    def fluxes(self) -> numpy.ndarray:
+        return self._arrays["fluxes"]
+
+    @property
+    def compositions(self) -> numpy.ndarray:
+        return self._arrays["compositions"]
+
+    @property
+    def compositionSteps(self) -> numpy.ndarray:
+        return self._arrays["compositionSteps"]
+
+    @property
+    def compositionDays(self) -> numpy.ndarray:
+        return self.days[self.compositionSteps]
+
+    @property
+    def particles(self) -> numpy.ndarray:
+        return self._arrays["particles"]
+
+    @property
+    def fluxUncertainty(self) -> typing.Optional[numpy.ndarray]:
+        return self._arrays.get("fluxUncertainty")
+
+    def getKeff(
+        self, hfOnly: typing.Optional[bool] = True
+    ) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+        """Fetch the multiplication factor paired with the time in days
+
+        Parameters
+        ----------
+        hfOnly : bool, optional
+            Return the days and :math:`k` from high-fidelity solutions
+            only [default]
+
+        Returns
+        -------
+        days : numpy.ndarray
+            Points in time [d] where :math:`k` has been evaluated
+        keff : numpy.ndarray
+            2D array with multiplication factor in the first column,
+            absolute uncertainties in the second column
+
+        """
+        slicer = self.hfFlags[:] if hfOnly else slice(None)
+        return self.days[slicer], numpy.array(self.keff[slicer, :])
+
+    def _getDaySlice(self, days):
+        if self._dayIndex is None:
+            self._dayIndex = self._indexDays(self.days)
+        return self._findDays(self._dayIndex, days)
+
+    def _getCompositionSlice(self, days):
+        if self._compositionIndex is None:
+            self._compositionIndex = self._indexDays(self.compositionDays)
+        return self._findDays(self._compositionIndex, days)
+
+    @staticmethod
+    def _indexDays(days):
+        index = {}
+        for ix, d in enumerate(days.tolist()):
+            index.setdefault(d, ix)
+        return index
+
+    @staticmethod
+    def _findDays(index, days):
+        if isinstance(days, numbers.Real):
+            ix = index.get(days)
+            if ix is None:
+                raise IndexError(f"Day {days} not found")
+            return ix
+
+        reqs = numpy.asarray(days)
+        if len(reqs.shape) != 1:
+            raise ValueError("Days can only be 1D")
+        dayslice = numpy.empty(reqs.size, dtype=int)
+        for pos, d in enumerate(reqs.tolist()):
+            ix = index.get(d)
+            if ix is None:
+                raise IndexError(f"Day {d} not found")
+            dayslice[pos] = ix
+        return dayslice
+
+    @staticmethod
+    def _select(array, selection):
+        # Outer indexing, like HDF hyperslabs, reading only the
+        # requested values from the memory map
+        arrays = [
+            ax for ax, sel in enumerate(selection) if isinstance(sel, numpy.ndarray)
+        ]
+        if len(arrays) > 1:
+            expanded = []
+            for ax, sel in enumerate(selection):
+                if isinstance(sel, numpy.ndarray):
+                    expanded.append(sel)
+                elif isinstance(sel, slice):
+                    expanded.append(numpy.arange(array.shape[ax])[sel])
+                else:
+                    expanded.append(numpy.array([sel]))
+            out = array[numpy.ix_(*expanded)]
+            drop = tuple(
+                ax for ax, sel in enumerate(selection)
+                if isinstance(sel, numbers.Integral)
+            )
+            return out.squeeze(axis=drop) if drop else out
+        return numpy.array(array[selection])
+
+    @staticmethod
+    def _getMaterialSlice(materials):
+        if materials is None:
+            return slice(None)
+        if isinstance(materials, numbers.Integral):
+            return int(materials)
+        return numpy.asarray(materials, dtype=int).reshape(-1)
+
+    def getFluxes(self, days=None, materials=None) -> numpy.ndarray:
+        """Retrieve the flux at some or all time points
+
+        Parameters
+        ----------
+        days : float or iterable of float, optional
+            Specific day or days to obtain the flux
+        materials : int or iterable of int, optional
+            Positions of burnable materials. Defaults to all materials
+
+        Returns
+        -------
+        numpy.ndarray
+            Fluxes at specified days
+
+        Raises
+        ------
+        IndexError
+            If ``days`` or an element of ``days`` was not found in
+            :attr:`days`
+
+        """
+        dayslice = slice(None) if days is None else self._getDaySlice(days)
+        return self._select(
+            self.fluxes, (dayslice, self._getMaterialSlice(materials), slice(None))
+        )
+
+    def getIsotopeIndexes(self, names=None, zais=None):
+        """Return indices for specific isotopes
+
+        Parameters
+        ----------
+        names : str or iterable of str, optional
+            Name or names to find in :attr:`names`
+        zais : int or iterable of int, optional
+            ZAI identifier(s) to find in :attr:`zais`
+
+        Returns
+        -------
+        int or numpy.ndarray of int
+            Indexes in :attr:`names` or :attr:`zais` that correspond
+            to the input isotopes
+
+        Raises
+        ------
+        ValueError
+            If both ``names`` and ``zais`` are passed, or neither.
+            Also raised in a name or zai not found
+
+        """
+        if names is not None:
+            if zais is not None:
+                raise ValueError("Need either names or zai, not both")
+            if self._nameIndex is None:
+                self._nameIndex = {n: ix for ix, n in enumerate(self.names)}
+            index, requested, kind = self._nameIndex, names, "Isotope"
+            single = isinstance(names, str)
+        elif zais is not None:
+            if self._zaiIndex is None:
+                self._zaiIndex = {z: ix for ix, z in enumerate(self.zais.tolist())}
+            index, requested, kind = self._zaiIndex, zais, "ZAI"
+            single = isinstance(zais, numbers.Integral)
+        else:
+            raise ValueError("Need either names or zai, not both")
+
+        if single:
+            requested = [requested]
+        found = numpy.empty(len(requested), dtype=int)
+        for pos, key in enumerate(requested):
+            try:
+                found[pos] = index[key]
+            except KeyError:
+                raise ValueError(f"{kind} {key} not found")
+        return int(found[0]) if single else found
+
+    def getDensities(self, names=None, zais=None, days=None, materials=None):
+        """Return atom densities for specific isotopes at specific times
+
+        Parameters
+        ----------
+        names : str or iterable of str, optional
+            Isotope name(s) e.g. ``"U235"``
+        zais : int or iterable of int, optional
+            Isotope ZAI identifier(s), e.g. ``922350``
+        days : float or iterable of float, optional
+            Retrieve densities for these points in time. Must be
+            found in :attr:`compositionDays`
+        materials : int or iterable of int, optional
+            Positions of burnable materials. Defaults to all materials
+
+        Returns
+        -------
+        numpy.ndarray
+            Density in the requested materials at the requested times
+            for the requested isotopes
+
+        """
+        dayslice = slice(None) if days is None else self._getCompositionSlice(days)
+        if names is None and zais is None:
+            isoIndex = slice(None)
+        else:
+            isoIndex = self.getIsotopeIndexes(names, zais)
+        return self._select(
+            self.compositions,
+            (dayslice, self._getMaterialSlice(materials), isoIndex),
+        )
+
+    def getFissionMatrix(self, day: float) -> scipy.sparse.csr_matrix:
+        """Retrieve the fission matrix for a given day
+
+        Parameters
+        ----------
+        day : float
+            Time in days that the matrix is requested
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            Fission matrix at time ``day``
+
+        Raises
+        ------
+        KeyError
+            If no fission matrices were written
+        IndexError
+            If ``day`` was not found in :attr:`days`, or no fission
+            matrix was stored for ``day``
+
+        """
+        fmtxDir = self.directory / FMTX_DIR
+        if not fmtxDir.is_dir():
+            raise KeyError(
+                "fissionMatrix not found. Likely not included in simulation"
+            )
+        ix = self._getDaySlice(float(day))
+        path = fmtxDir / f"{ix}.npz"
+        if not path.is_file():
+            raise IndexError(f"Fission matrix not stored for day {day}")
+        return scipy.sparse.load_npz(path).tocsr()
+
+
+def toHdf(source, filename=None, **kwargs):
+    """Convert results from :class:`MemmapStore` to an HDF file
+
+    Time steps are replayed through :class:`hydep.hdf.Store`, so
+    memory usage is bounded by the buffering options of the store.
+    Requires :mod:`h5py`
+
+    Parameters
+    ----------
+    source : str or pathlib.Path or MemmapProcessor
+        Directory written by :class:`MemmapStore`, or a reader
+        for that directory
+    filename : str or pathlib.Path, optional
+        HDF file to be written. Defaults to ``"hydep-results.h5"``
+        inside the source directory
+    kwargs
+        Additional arguments passed to :class:`hydep.hdf.Store`,
+        e.g. ``compression="gzip"``
+
+    Returns
+    -------
+    pathlib.Path
+        Absolute path of the HDF file
+
+    """
+    from hydep.hdf import Store
+    from hydep.internal import TimeStep, TransportResult, CompBundle, getIsotope
+
+    if not isinstance(source, MemmapProcessor):
+        source = MemmapProcessor(source)
+    if filename is None:
+        filename = source.directory / "hydep-results.h5"
+
+    isotopes = tuple(getIsotope(zai=int(z)) for z in source.zais)
+    compositionRows = {
+        step: row for row, step in enumerate(source.compositionSteps.tolist())
+    }
+    store = Store(filename=filename, **kwargs)
+    store.beforeMain(
+        source.nCoarseSteps,
+        source.nTotalSteps,
+        source.nEnergyGroups,
+        isotopes,
+        list(zip(source.materialIds, source.materialNames, source.volumes.tolist())),
+        compositionSteps=sorted(compositionRows),
+    )
+
+    fmtxDir = source.directory / FMTX_DIR
+    fluxUnc = source.fluxUncertainty
+    coarse = 0
+    try:
+        for ix in range(source.lastWrittenStep + 1):
+            isHF = bool(source.hfFlags[ix])
+            if isHF and ix:
+                coarse += 1
+            step = TimeStep(
+                coarse, None if isHF else 1, ix, source["time"][ix]
+            )
+            fmtxFile = fmtxDir / f"{ix}.npz"
+            unc = None if fluxUnc is None else fluxUnc[ix]
+            cputime = source.cpuTimes[ix]
+            result = TransportResult(
+                numpy.array(source.fluxes[ix]),
+                numpy.array(source.keff[ix]),
+                runTime=None if numpy.isnan(cputime) else float(cputime),
+                fmtx=scipy.sparse.load_npz(fmtxFile).tocsr()
+                if fmtxFile.is_file() else None,
+                particles=int(source.particles[ix]) or None,
+                fluxUncertainty=None if unc is None or numpy.isnan(unc).all() else unc,
+            )
+            store.postTransport(step, result)
+            row = compositionRows.get(ix)
+            if row is not None:
+                store.writeCompositions(
+                    step, CompBundle(isotopes, numpy.array(source.compositions[row]))
+                )
+        success = True
+    except Exception:
+        success = False
+        raise
+    finally:
+        store.finalize(success)
+    return store.fp
@@ -12,3 +12,4 @@ from .writer import SerpentWriter, ExtDepWriter
 from .runner import SerpentRunner, ExtDepRunner
 from .processor import SerpentProcessor
 from .solver import SerpentSolver, CoupledSerpentSolver
+from .scheduler import ParticleScheduler
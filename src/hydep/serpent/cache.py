@@ -0,0 +1,234 @@
+"""
+Content-addressed cache of Serpent transport results
+"""
+import os
+import re
+import json
+import pickle
+import hashlib
+import logging
+import pathlib
+import tempfile
+
+__all__ = ["ResultCache"]
+
+__logger__ = logging.getLogger("hydep.serpent")
+
+# Quoted files in Serpent inputs whose contents, not locations, matter
+_INCLUDE = re.compile(r'^(\s*include\s+)"([^"]+)"')
+_SOURCE = re.compile(r'^(\s*src\s+\S+\s+sf\s+)"([^"]+)"')
+# Files written by Serpent, where only the name matters
+_OUTPUT = re.compile(r'^(\s*set\s+csw\s+)"([^"]+)"')
+
+
+class ResultCache:
+    """Store transport results keyed by the inputs that produced them
+
+    Each key is a hash of a Serpent input file, with included files
+    and initial fission sources replaced by the hash of their contents.
+    Leading comment blocks are ignored. This way identical problems
+    written to different directories, or at different points in
+    time, share the same key. Results are pickled to individual files
+    in :attr:`directory`. Modification times are updated when
+    results are restored, and the least recently used results are
+    removed once the directory exceeds :attr:`maxBytes`
+
+    Parameters
+    ----------
+    directory : str or pathlib.Path
+        Directory of cached results. Will be created if it does
+        not exist
+    maxBytes : int, optional
+        Maximum total size of the cached results
+
+    Attributes
+    ----------
+    directory : pathlib.Path
+        Directory of cached results
+    maxBytes : int
+        Maximum total size of the cached results
+    hits : int
+        Number of results restored from the cache
+    misses : int
+        Number of results not found in the cache
+
+    """
+
+    VERSION = 1
+    SUFFIX = ".pkl"
+
+    def __init__(self, directory, maxBytes=2**30):
+        if maxBytes <= 0:
+            raise ValueError(f"Maximum size must be positive, not {maxBytes}")
+        self.directory = pathlib.Path(directory).resolve()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.maxBytes = int(maxBytes)
+        self.hits = 0
+        self.misses = 0
+        self._digests = {}
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} at {self.directory} "
+            f"{self.hits} hits {self.misses} misses>"
+        )
+
+    def key(self, inputFile, **options) -> str:
+        """Hash an input file and any options used in processing
+
+        Parameters
+        ----------
+        inputFile : str or pathlib.Path
+            Serpent input file to be executed
+        options
+            Additional values that modify the result without changing
+            the input file, e.g. features to be processed. Must be
+            serializable to JSON
+
+        Returns
+        -------
+        str
+            Hexadecimal digest
+
+        """
+        digest = hashlib.sha256(f"hydep-cache-{self.VERSION}\n".encode())
+        digest.update(self._digestInput(pathlib.Path(inputFile)).encode())
+        digest.update(json.dumps(options, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def _digestFile(self, path):
+        # Included files, like the base file, are reused across solutions
+        stat = path.stat()
+        memo = (path, stat.st_mtime_ns, stat.st_size)
+        found = self._digests.get(memo)
+        if found is None:
+            found = self._digests[memo] = self._digestInput(path)
+        return found
+
+    def _digestInput(self, path) -> str:
+        digest = hashlib.sha256()
+        inHeader = True
+        inComment = False
+        with path.open("r") as stream:
+            for line in stream:
+                if inHeader:
+                    stripped = line.strip()
+                    if inComment:
+                        inComment = "*/" not in stripped
+                        continue
+                    if stripped.startswith("/*"):
+                        inComment = "*/" not in stripped
+                        continue
+                    inHeader = False
+
+                for pattern in (_INCLUDE, _SOURCE):
+                    match = pattern.match(line)
+                    if match is not None:
+                        target = pathlib.Path(match.group(2))
+                        if not target.is_absolute():
+                            target = path.parent / target
+                        line = (
+                            f"{match.group(1)}<{self._digestFile(target)}>"
+                            f"{line[match.end():]}"
+                        )
+                        break
+                else:
+                    match = _OUTPUT.match(line)
+                    if match is not None:
+                        line = (
+                            f"{match.group(1)}<{pathlib.Path(match.group(2)).name}>"
+                            f"{line[match.end():]}"
+                        )
+                digest.update(line.encode())
+        return digest.hexdigest()
+
+    def _path(self, key) -> pathlib.Path:
+        return self.directory / (key + self.SUFFIX)
+
+    def get(self, key):
+        """Restore a result, or return ``None`` if not cached
+
+        Parameters
+        ----------
+        key : str
+            Value from :meth:`key`
+
+        Returns
+        -------
+        hydep.internal.TransportResult or None
+            Cached result
+        dict of str to bytes or None
+            Contents of any files stored alongside the result,
+            keyed by file name
+
+        """
+        path = self._path(key)
+        try:
+            with path.open("rb") as stream:
+                data = pickle.load(stream)
+        except FileNotFoundError:
+            self.misses += 1
+            return None, None
+        except (pickle.UnpicklingError, EOFError, AttributeError) as err:
+            __logger__.warning("Removing unreadable cached result %s: %s", path, err)
+            path.unlink()
+            self.misses += 1
+            return None, None
+        # Mark as recently used
+        os.utime(path)
+        self.hits += 1
+        __logger__.debug("Restored transport result from %s", path)
+        return data["result"], data["files"]
+
+    def put(self, key, result, files=None):
+        """Store a result and remove old results to stay within the size limit
+
+        Parameters
+        ----------
+        key : str
+            Value from :meth:`key`
+        result : hydep.internal.TransportResult
+            Result to be cached
+        files : iterable of str or pathlib.Path, optional
+            Output files to be stored alongside the result and
+            returned from :meth:`get`. Missing files are skipped
+
+        """
+        contents = {}
+        for f in files or ():
+            f = pathlib.Path(f)
+            if f.is_file():
+                contents[f.name] = f.read_bytes()
+
+        with tempfile.NamedTemporaryFile(
+            "wb", dir=self.directory, suffix=".tmp", delete=False
+        ) as stream:
+            pickle.dump(
+                {"result": result, "files": contents},
+                stream,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(stream.name, self._path(key))
+        self.evict()
+
+    @property
+    def size(self) -> int:
+        """Total size of all cached results"""
+        return sum(p.stat().st_size for p in self.directory.glob("*" + self.SUFFIX))
+
+    def evict(self):
+        """Remove the least recently used results until below :attr:`maxBytes`"""
+        entries = []
+        total = 0
+        for path in self.directory.glob("*" + self.SUFFIX):
+            stat = path.stat()
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _mtime, size, path in entries:
+            if total <= self.maxBytes:
+                break
+            __logger__.debug("Evicting cached result %s", path)
+            path.unlink()
+            total -= size
@@ -3,6 +3,8 @@ Class responsible for processing Serpent outputs
 """
 import warnings
 import copy
+import contextlib
+import threading
 from functools import wraps
 import textwrap
 import math
@@ -12,9 +14,10 @@ from abc import ABC, abstractmethod
 
 import numpy
 import serpentTools
+from serpentTools.parsers import READERS
 
 from hydep import DataWarning
-from hydep.internal import MaterialDataArray, XsIndex, FakeSequence
+from hydep.internal import MaterialDataArray, XsIndex, FissionYieldBank
 from hydep.constants import CM2_PER_BARN, REACTION_MTS
 from .fmtx import parseFmtx
 
@@ -86,6 +89,12 @@ class SerpentProcessor:
     fyHelper : None or FPYHelper
         Instance responsible for processing detector outputs and computing
         effective fission yields
+    activeIsotopes : sequence of set of int or None
+        If given, microscopic cross sections are only taken for
+        isotopes in ``activeIsotopes[i]`` for burnable universe ``i``.
+        Reactions for all other isotopes are marked with ``numpy.nan``
+        in :meth:`processMicroXS`, to be filled by
+        :class:`hydep.internal.DataBank`
 
     """
 
@@ -106,11 +115,18 @@ class SerpentProcessor:
         },
         "microxs": {"microxs.getFlx": False},
     }
+    # serpentTools settings are global and copied by each reader when
+    # created, so readers must not be created concurrently
+    _rcLock = threading.Lock()
+    # File types whose readers also inspect the global settings while
+    # parsing, e.g. the Serpent version in the results file
+    _lockedParsing = frozenset({"results"})
 
     def __init__(self, burnable=None, reactionIndex=None):
         self._burnable = burnable
         self.fyHelper = None
         self.reactionIndex = reactionIndex
+        self.activeIsotopes = None
 
     @property
     def burnable(self):
@@ -155,7 +171,13 @@ class SerpentProcessor:
         in :attr:`options` for a given file type, then nothing fancy
         is done.  The file is read and the resulting Reader is
         returned. Otherwise, the settings are passed to
-        ``serpentTools`` and reverted after the file is read.
+        ``serpentTools`` and reverted after the reader is created.
+        The ``serpentTools`` settings are shared across threads, so
+        creating readers is guarded by a lock. Readers copy their
+        settings when created, so most files are parsed outside the
+        lock and may be read concurrently. Result files are parsed
+        while holding the lock, as the Serpent version is taken from
+        the shared settings during parsing.
 
         Parameters
         ----------
@@ -184,22 +206,32 @@ class SerpentProcessor:
             regardless, but a warning will be raised
 
         """
-        opts = self.options.get(filetype)
-        if opts is None:
-            return serpentTools.read(readable, filetype)
+        loader = READERS.get(filetype)
+        if loader is None:
+            # Let serpentTools report the unsupported file type
+            with self._rcLock:
+                return serpentTools.read(readable, filetype)
 
+        opts = self.options.get(filetype)
+        lockedParsing = filetype in self._lockedParsing
         valuefails = {}
         unexpectedfails = {}
 
-        with serpentTools.settings.rc as temp:
-            for k, v in opts.items():
-                try:
-                    temp[k] = v
-                except (KeyError, TypeError):
-                    valuefails[k] = v
-                except Exception:
-                    unexpectedfails[k] = v
-            serpentFile = serpentTools.read(readable, filetype)
+        with self._rcLock, contextlib.ExitStack() as stack:
+            if opts is not None:
+                temp = stack.enter_context(serpentTools.settings.rc)
+                for k, v in opts.items():
+                    try:
+                        temp[k] = v
+                    except (KeyError, TypeError):
+                        valuefails[k] = v
+                    except Exception:
+                        unexpectedfails[k] = v
+            serpentFile = loader(readable)
+            if lockedParsing:
+                serpentFile.read()
+        if not lockedParsing:
+            serpentFile.read()
 
         if valuefails:
             self._warnOptions(valuefails, "Bad settings and/or values")
@@ -373,7 +405,7 @@ class SerpentProcessor:
             self.options["results"]["xs.getB1XS"] = True
 
     @requireBurnable
-    def processDetectorFluxes(self, detectorfile, name):
+    def processDetectorFluxes(self, detectorfile, name, errors=False):
         """Pull the universe fluxes from the detector file
 
         Does not perform any sorting on the tallies, so they must
@@ -386,17 +418,28 @@ class SerpentProcessor:
             Path to the detector file to be read
         name : str
             Name of this specific detector to be read
+        errors : bool, optional
+            If true, also return the relative uncertainties
 
         Returns
         -------
         numpy.ndarray
             Expected value of flux in each burnable universe
+        numpy.ndarray
+            Relative uncertainties with the same shape as the flux.
+            Only returned if ``errors`` evaluates to true
 
         """
         # Would like to share the reading with the processFissionYields
         # method in the future
         detector = self.read(detectorfile, "det")[name]
-        tallies = detector.tallies
+        fluxes = self._arrangeUniverseTallies(detector, detector.tallies)
+        if errors:
+            return fluxes, self._arrangeUniverseTallies(detector, detector.errors)
+        return fluxes
+
+    def _arrangeUniverseTallies(self, detector, tallies):
+        """Reshape detector data to be ``(burnable, group)``"""
 
         if not detector.indexes:
             # Not uniquely binned quantities -> must be a single tallies quantity
@@ -462,10 +505,16 @@ class SerpentProcessor:
         data = numpy.empty(
             (len(self.burnable), len(self.reactionIndex)), dtype=numpy.float64,
         )
+        active = self.activeIsotopes
 
         for uindex, univ in enumerate(self.burnable):
-            univxs = microxs[univ]
+            univxs = microxs.get(univ, {})
+            isotopes = None if active is None else active[uindex]
             for rxnIndex, (zai, rxn) in enumerate(self.reactionIndex):
+                if isotopes is not None and zai not in isotopes:
+                    # Not requested, reuse previous values
+                    data[uindex, rxnIndex] = numpy.nan
+                    continue
                 # Keys to microxs are (zai, rxn, metastable), where
                 # metastable indicates if the reaction goes to a ground
                 # or metastable state. These are handled by branching ratios
@@ -523,10 +572,10 @@ class FPYHelper(ABC):
 
         Returns
         -------
-        list of dict
+        hydep.internal.FissionYieldBank or list of dict
             The ordering of entries must correspond to the ordering
             of ``matids`` passed during construction. Each entry ``i``
-            must be a dictionary mapping ``{zai: fpy}`` for burnable
+            must be a mapping ``{zai: fpy}`` for burnable
             material ``i`` for all isotopes with fission product yields
 
         """
@@ -580,6 +629,7 @@ class WeightedFPYHelper(FPYHelper):
     FISSION_MT = REACTION_MTS.TOTAL_FISSION
 
     def __init__(self, matids, isotopes, upperEnergy=20):
+        matids = tuple(matids)
         self._constant = {}
         self._variable = {}
         self._ucards = textwrap.fill(
@@ -594,6 +644,28 @@ class WeightedFPYHelper(FPYHelper):
                 self._variable[iso.zai] = iso.fissionYields
         self.upperEnergy = upperEnergy
 
+        # Constant yields are written once into a template that
+        # is copied for every material and every collapse
+        self._nmats = len(matids)
+        self._parents = sorted(set(self._constant).union(self._variable))
+        self._products = sorted(
+            set().union(
+                *(fy.products for fy in self._constant.values()),
+                *(fy.products for fy in self._variable.values()),
+            )
+        )
+        self._template = numpy.zeros((len(self._parents), len(self._products)))
+        self._positions = {}
+        for pix, zai in enumerate(self._parents):
+            fy = self._constant.get(zai)
+            if fy is None:
+                fy = self._variable[zai]
+            cols = numpy.searchsorted(self._products, fy.products)
+            if zai in self._constant:
+                self._template[pix, cols] = fy.yields
+            else:
+                self._positions[zai] = pix, cols
+
     def makeDetectors(self) -> list:
         """Produce lines that can be used to write detector inputs
 
@@ -635,7 +707,7 @@ class WeightedFPYHelper(FPYHelper):
 
     def collapseYieldsFromDetectors(
         self, detectors
-    ) -> typing.List[typing.Dict[int, "hydep.internal.FissionYield"]]:
+    ) -> "hydep.internal.FissionYieldBank":
         """Obtain region specific, fission-rate-averaged fission yields
 
         Parameters
@@ -646,31 +718,27 @@ class WeightedFPYHelper(FPYHelper):
 
         Returns
         -------
-        list of dict
-            List of fission yield dictionaries where ``l[ix]`` maps
+        hydep.internal.FissionYieldBank
+            Fission yields for every material such that ``b[ix]`` maps
             parent ZAI to :class:`hydep.internal.FissionYield`
             for region ``ix``
 
         """
-        materialYields = []
+        yields = numpy.empty((self._nmats,) + self._template.shape)
+        yields[:] = self._template
+
         for d in detectors:
             if not d.name.startswith("fy"):
                 continue
             zai = int(d.name[2:])
             weights = self._getweights(d)
             assert len(weights.shape) == 2
-            colYields = self._collapseIsoYields(weights, self._variable[zai])
-
-            if not materialYields:
-                for slab in colYields:
-                    matweights = self._constant.copy()
-                    matweights[zai] = slab
-                    materialYields.append(matweights)
-            else:
-                for ix, slab in enumerate(colYields):
-                    materialYields[ix][zai] = slab
+            pix, cols = self._positions[zai]
+            yields[:, pix, cols] = self._collapseIsoYields(
+                weights, self._variable[zai]
+            )
 
-        return materialYields
+        return FissionYieldBank(self._parents, self._products, yields)
 
     @staticmethod
     def _getweights(d):
@@ -700,16 +768,24 @@ class WeightedFPYHelper(FPYHelper):
 
     @staticmethod
     def _collapseIsoYields(weights, eneyields):
-        matyields = []
-        # Order must be fy * weight or else we get subject to
-        # numpy dispatching and return weight of just product
-        # zais
-        for matweights in weights:
-            fy = eneyields.at(0) * matweights[0]
-            for ix, w in enumerate(matweights[1:], start=1):
-                fy += eneyields.at(ix) * w
-            matyields.append(fy)
-        return matyields
+        """Collapse energy-dependent yields for every material
+
+        Parameters
+        ----------
+        weights : numpy.ndarray
+            Normalized fission rates of shape ``(nmats, nenergy)``
+        eneyields : hydep.internal.FissionYieldDistribution
+            Energy dependent fission yields for a single parent
+
+        Returns
+        -------
+        numpy.ndarray
+            Array of shape ``(nmats, nproducts)`` where ``[i, j]``
+            is the effective fission yield of
+            ``eneyields.products[j]`` in material ``i``
+
+        """
+        return weights @ eneyields.yield_matrix
 
 
 class ConstantFPYHelper(FPYHelper):
@@ -773,7 +849,7 @@ class ConstantFPYHelper(FPYHelper):
                 DataWarning,
             )
 
-        self._fpy = FakeSequence(constants, len(matids))
+        self._fpy = FissionYieldBank.fromMapping(constants, len(matids))
 
     @staticmethod
     def _getfallback(targetEne, fpys):
@@ -802,10 +878,11 @@ class ConstantFPYHelper(FPYHelper):
 
         Returns
         -------
-        list of dict
-            Each entry ``l[i]`` is a dictionary mapping ``{int: fpy}``
-            for material ``i``. All yields are the same, but the iterable
-            is constructed to help with the depletion chain down the line
+        hydep.internal.FissionYieldBank
+            Each entry ``b[i]`` is a mapping ``{int: fpy}`` for
+            material ``i``. All yields are the same and share a single
+            array, but the iterable is constructed to help with the
+            depletion chain down the line
 
         """
 
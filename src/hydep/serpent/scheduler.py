@@ -0,0 +1,221 @@
+"""
+Adaptive scheduling of particle histories between transport solutions
+"""
+import math
+import logging
+
+import numpy
+
+__all__ = ["ParticleScheduler"]
+
+__logger__ = logging.getLogger("hydep.serpent")
+
+
+class ParticleScheduler:
+    """Choose particles per cycle to meet target uncertainties
+
+    Statistical uncertainties from Monte Carlo are assumed to scale
+    with the inverse square root of the number of histories. After
+    each transport solution, the number of particles for the next
+    solution is scaled by ``(achieved / target) ** 2`` using the
+    worse of the multiplication factor and flux uncertainties.
+
+    Targets can also depend on the position of the solution in the
+    schedule. With ``relaxation`` greater than one, targets at the
+    first of ``nsolutions`` transport solutions are multiplied by
+    ``relaxation``, decreasing geometrically to the given targets at
+    the final solution. Preliminary steps then use fewer histories,
+    and solutions near end of life use more.
+
+    Parameters
+    ----------
+    particles : int
+        Particles per cycle for the first transport solution
+    keffTarget : float, optional
+        Target absolute uncertainty on the multiplication factor
+    fluxTarget : float, optional
+        Target maximum relative uncertainty on the flux in any
+        burnable material and energy group
+    minParticles : int, optional
+        Lower bound on particles per cycle
+    maxParticles : int, optional
+        Upper bound on particles per cycle
+    relaxation : float, optional
+        Factor applied to the targets at the first solution
+    nsolutions : int, optional
+        Number of transport solutions in the schedule. Required to
+        relax targets
+
+    Attributes
+    ----------
+    particles : int
+        Particles per cycle for the next transport solution
+    keffTarget : float or None
+        Target absolute uncertainty on the multiplication factor
+    fluxTarget : float or None
+        Target maximum relative uncertainty on the flux
+    minParticles : int or None
+        Lower bound on particles per cycle
+    maxParticles : int or None
+        Upper bound on particles per cycle
+    relaxation : float
+        Factor applied to the targets at the first solution
+    nsolutions : int or None
+        Number of transport solutions in the schedule
+
+    """
+
+    def __init__(
+        self,
+        particles,
+        keffTarget=None,
+        fluxTarget=None,
+        minParticles=None,
+        maxParticles=None,
+        relaxation=1.0,
+        nsolutions=None,
+    ):
+        if keffTarget is None and fluxTarget is None:
+            raise ValueError("Need at least one target uncertainty")
+        if (
+            minParticles is not None
+            and maxParticles is not None
+            and minParticles > maxParticles
+        ):
+            raise ValueError(
+                f"Minimum particles {minParticles} exceeds maximum "
+                f"{maxParticles}"
+            )
+        if relaxation < 1:
+            raise ValueError(f"Relaxation must be at least one, not {relaxation}")
+        self.keffTarget = keffTarget
+        self.fluxTarget = fluxTarget
+        self.minParticles = minParticles
+        self.maxParticles = maxParticles
+        self.relaxation = relaxation
+        self.nsolutions = nsolutions
+        self.setParticles(math.ceil(particles / self.relaxationAt(0) ** 2))
+
+    @classmethod
+    def fromSettings(cls, serpentSettings, nsolutions=None):
+        """Create a scheduler if target uncertainties are configured
+
+        Parameters
+        ----------
+        serpentSettings : hydep.settings.SerpentSettings
+            Settings with particles and target uncertainties
+        nsolutions : int, optional
+            Number of transport solutions in the schedule, used
+            with :attr:`~hydep.settings.SerpentSettings.particleRelaxation`
+
+        Returns
+        -------
+        ParticleScheduler or None
+            ``None`` if neither
+            :attr:`~hydep.settings.SerpentSettings.keffUncertainty` nor
+            :attr:`~hydep.settings.SerpentSettings.fluxUncertainty`
+            are set
+
+        """
+        if (
+            serpentSettings.keffUncertainty is None
+            and serpentSettings.fluxUncertainty is None
+        ):
+            return None
+        return cls(
+            serpentSettings.particles,
+            keffTarget=serpentSettings.keffUncertainty,
+            fluxTarget=serpentSettings.fluxUncertainty,
+            minParticles=serpentSettings.minParticles,
+            maxParticles=serpentSettings.maxParticles,
+            relaxation=serpentSettings.particleRelaxation,
+            nsolutions=nsolutions,
+        )
+
+    def relaxationAt(self, index):
+        """Factor applied to the target uncertainties at a solution
+
+        Parameters
+        ----------
+        index : int or None
+            Position of the solution in the schedule, starting at zero
+
+        Returns
+        -------
+        float
+            :attr:`relaxation` at the first solution, decreasing
+            geometrically to one at the final solution. One if
+            ``index`` or :attr:`nsolutions` is ``None``
+
+        """
+        if index is None or self.nsolutions is None or self.nsolutions < 2:
+            return 1.0
+        remaining = min(max(self.nsolutions - 1 - index, 0), self.nsolutions - 1)
+        return self.relaxation ** (remaining / (self.nsolutions - 1))
+
+    def setParticles(self, particles):
+        """Set :attr:`particles`, respecting the bounds
+
+        Parameters
+        ----------
+        particles : int
+            Requested particles per cycle for the next solution
+
+        Returns
+        -------
+        int
+            Particles per cycle for the next solution, within
+            :attr:`minParticles` and :attr:`maxParticles`
+
+        """
+        if self.minParticles is not None:
+            particles = max(particles, self.minParticles)
+        if self.maxParticles is not None:
+            particles = min(particles, self.maxParticles)
+        self.particles = max(int(particles), 1)
+        return self.particles
+
+    def update(self, result, nextIndex=None):
+        """Update :attr:`particles` from a transport solution
+
+        Parameters
+        ----------
+        result : hydep.internal.TransportResult
+            Result from the most recent transport solution. Scaling
+            is based on
+            :attr:`~hydep.internal.TransportResult.particles` if
+            given, otherwise :attr:`particles`. Uses the uncertainty in
+            :attr:`~hydep.internal.TransportResult.keff` and
+            :attr:`~hydep.internal.TransportResult.fluxUncertainty`,
+            if present
+        nextIndex : int, optional
+            Position of the next solution in the schedule, used to
+            relax the targets. Targets are not relaxed if not given
+
+        Returns
+        -------
+        int
+            Particles per cycle for the next transport solution
+
+        """
+        scale = self.relaxationAt(nextIndex)
+        ratios = []
+        if self.keffTarget is not None:
+            unc = result.keff[1]
+            if math.isfinite(unc) and unc > 0:
+                ratios.append(unc / (scale * self.keffTarget))
+        if self.fluxTarget is not None and result.fluxUncertainty is not None:
+            unc = numpy.nanmax(result.fluxUncertainty)
+            if math.isfinite(unc) and unc > 0:
+                ratios.append(unc / (scale * self.fluxTarget))
+
+        if not ratios:
+            return self.particles
+
+        previous = self.particles
+        ran = result.particles or previous
+        self.setParticles(math.ceil(ran * max(ratios) ** 2))
+        __logger__.debug(
+            "Particles per cycle updated from %d to %d", previous, self.particles
+        )
+        return self.particles
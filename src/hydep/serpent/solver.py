@@ -4,17 +4,21 @@ The Serpent solver!
 
 from abc import abstractmethod
 import time
+from concurrent.futures import ThreadPoolExecutor
 import pathlib
 import logging
 
 import numpy
 from hydep.lib import HighFidelitySolver
 from hydep.internal import TransportResult
+from hydep.internal.timing import timed
 import hydep.internal.features as hdfeat
 
 from .writer import BaseWriter, SerpentWriter, ExtDepWriter
 from .runner import BaseRunner, SerpentRunner, ExtDepRunner
 from .processor import SerpentProcessor, WeightedFPYHelper, ConstantFPYHelper
+from .scheduler import ParticleScheduler
+from .cache import ResultCache
 from .xsavail import XS_2_1_30
 
 
@@ -31,6 +35,9 @@ _FEATURES_ATLEAST_2_1_30 = hdfeat.FeatureCollection(
     XS_2_1_30,
 )
 
+# Nothing beyond flux and multiplication factor is needed at EOL
+_EOL_HOOKS = hdfeat.FeatureCollection()
+
 
 class BaseSolver(HighFidelitySolver):
     """Base solver for interfacing with Serpent >= 2.1.30
@@ -137,35 +144,110 @@ class BaseSolver(HighFidelitySolver):
     def processor(self) -> SerpentProcessor:
         return self._processor
 
-    def _process(self, basefile, index=0):
-        fluxes = self.processor.processDetectorFluxes(
-            basefile + f"_det{index}.m",
-            "flux",
-        ) / self._volumes
-
-        if self.hooks is not None and self.hooks.macroXS:
-            resbundle = self.processor.processResult(
-                basefile + "_res.m",
-                self.hooks.macroXS,
-                index=index,
-            )
-            res = TransportResult(fluxes, resbundle.keff, macroXS=resbundle.macroXS)
-        else:
-            keff = self.processor.getKeff(basefile + "_res.m", index=index)
-            res = TransportResult(fluxes, keff)
-
-        if not self.hooks:
-            return res
-
-        for feature in self.hooks.features:
-            if feature is hdfeat.FISSION_MATRIX:
-                res.fmtx = self.processor.processFmtx(basefile + f"_fmtx{index}.m")
-            elif feature is hdfeat.MICRO_REACTION_XS:
-                res.microXS = self.processor.processMicroXS(basefile + f"_mdx{index}.m")
-            elif feature is hdfeat.FISSION_YIELDS:
-                res.fissionYields = self.processor.processFissionYields(
-                    basefile + f"_det{index}.m"
+    @staticmethod
+    def _timedParse(func, path, *args, **kwargs):
+        start = time.time()
+        out = func(path, *args, **kwargs)
+        __logger__.debug("Processed %s in %.4E s", path, time.time() - start)
+        return out
+
+    def _process(self, basefile, index=0, hooks=None, fluxErrors=False):
+        """Process all output files for a single transport solution
+
+        Each file is independent of the others, so each feature is
+        parsed in its own thread. The :class:`TransportResult` is
+        built once all parsers have completed. Parse times for
+        each file are reported through the debug logger
+
+        Parameters
+        ----------
+        basefile : str
+            Name of the input file. Output files will be
+            ``basefile + "_res.m"``, etc.
+        index : int, optional
+            Point in time from which to pull data
+        hooks : hydep.internal.features.FeatureCollection, optional
+            Features to process for this step. Defaults to
+            :attr:`hooks`. Fluxes and multiplication factor are
+            always processed
+        fluxErrors : bool, optional
+            Store the relative uncertainties on the flux in
+            :attr:`hydep.internal.TransportResult.fluxUncertainty`
+
+        Returns
+        -------
+        hydep.internal.TransportResult
+
+        """
+        with timed("serpent.parse"):
+            return self._processFiles(basefile, index, hooks, fluxErrors)
+
+    def _processFiles(self, basefile, index, hooks, fluxErrors):
+        if hooks is None:
+            hooks = self.hooks
+        detfile = basefile + f"_det{index}.m"
+        features = hooks.features if hooks else set()
+        macroXS = hooks.macroXS if hooks is not None else None
+
+        with ThreadPoolExecutor(max_workers=2 + len(features)) as pool:
+            if fluxErrors:
+                fluxes = pool.submit(
+                    self._timedParse, self.processor.processDetectorFluxes,
+                    detfile, "flux", errors=True,
+                )
+            else:
+                fluxes = pool.submit(
+                    self._timedParse, self.processor.processDetectorFluxes,
+                    detfile, "flux",
+                )
+
+            if macroXS:
+                results = pool.submit(
+                    self._timedParse, self.processor.processResult,
+                    basefile + "_res.m", macroXS, index=index,
                 )
+            else:
+                results = pool.submit(
+                    self._timedParse, self.processor.getKeff,
+                    basefile + "_res.m", index=index,
+                )
+
+            extras = {}
+            for feature in features:
+                if feature is hdfeat.FISSION_MATRIX:
+                    extras["fmtx"] = pool.submit(
+                        self._timedParse, self.processor.processFmtx,
+                        basefile + f"_fmtx{index}.m",
+                    )
+                elif feature is hdfeat.MICRO_REACTION_XS:
+                    extras["microXS"] = pool.submit(
+                        self._timedParse, self.processor.processMicroXS,
+                        basefile + f"_mdx{index}.m",
+                    )
+                elif feature is hdfeat.FISSION_YIELDS:
+                    extras["fissionYields"] = pool.submit(
+                        self._timedParse, self.processor.processFissionYields,
+                        detfile,
+                    )
+
+            if fluxErrors:
+                flux, fluxUnc = fluxes.result()
+            else:
+                flux, fluxUnc = fluxes.result(), None
+
+            if macroXS:
+                resbundle = results.result()
+                res = TransportResult(
+                    flux / self._volumes,
+                    resbundle.keff,
+                    macroXS=resbundle.macroXS,
+                )
+            else:
+                res = TransportResult(flux / self._volumes, results.result())
+            res.fluxUncertainty = fluxUnc
+
+            for attr, future in extras.items():
+                setattr(res, attr, future.result())
 
         return res
 
@@ -204,9 +286,6 @@ class BaseSolver(HighFidelitySolver):
             )
         self.writer.updateProblemIsotopes((iso.triplet for iso in manager.chain), acelib)
 
-        __logger__.info("Writing base Serpent input file")
-        mainfile = self._writeMainFile(model, manager, settings)
-
         self.processor.burnable = matids
 
         # Not super pretty, as this interacts both with the writer's roles
@@ -222,12 +301,13 @@ class BaseSolver(HighFidelitySolver):
             else:
                 raise ValueError(f"FPY mode {mode} unsupported")
 
-            detlines = fyproc.makeDetectors()
-            if detlines:
-                with mainfile.open("a") as s:
-                    s.write("\n".join(detlines))
+            self.writer.fpyDetectors = fyproc.makeDetectors()
             self.processor.fyHelper = fyproc
 
+        __logger__.info("Writing base Serpent input file")
+        with timed("serpent.write"):
+            self._writeMainFile(model, manager, settings)
+
         if hdfeat.MICRO_REACTION_XS in self.hooks.features:
             self.processor.reactionIndex = manager.chain.reactionIndex
 
@@ -256,6 +336,14 @@ class SerpentSolver(BaseSolver):
     hooks : hydep.internal.features.FeatureCollection
         Collection of physics and cross sections needed by other
         aspects of the framework
+    scheduler : hydep.serpent.ParticleScheduler or None
+        If target uncertainties are configured in
+        :class:`hydep.settings.SerpentSettings`, responsible for
+        choosing the particles per cycle for each solution
+    cache : hydep.serpent.cache.ResultCache or None
+        If :attr:`hydep.settings.SerpentSettings.cacheDir` is
+        configured, transport results are restored from this cache
+        rather than running Serpent on identical inputs
 
     """
 
@@ -267,6 +355,43 @@ class SerpentSolver(BaseSolver):
         self._curfile = None
         self._tmpdir = None
         self._tmpFile = None
+        self.scheduler = None
+        self.cache = None
+        self._cacheOptions = None
+
+    def beforeMain(self, model, manager, settings):
+        """Prepare the base input file and particle scheduling
+
+        Parameters
+        ----------
+        model : hydep.Model
+            Geometry information to be written once
+        manager : hydep.Manager
+            Depletion information
+        settings : hydep.Settings
+            Shared settings
+
+        """
+        super().beforeMain(model, manager, settings)
+        serpent = settings.serpent
+        # High-fidelity solutions at each coarse step and end of life
+        self.scheduler = ParticleScheduler.fromSettings(
+            serpent, nsolutions=len(manager.timesteps) + 1
+        )
+        if serpent.cacheDir is None:
+            self.cache = None
+        else:
+            self.cache = ResultCache(serpent.cacheDir, serpent.cacheSize * 2**20)
+            __logger__.info("Caching transport results in %s", self.cache.directory)
+        # Options that modify the processed results but are not
+        # written to the input files
+        self._cacheOptions = {
+            "executable": serpent.executable,
+            "fpyMode": serpent.fpyMode,
+            "fpySpectrum": serpent.constantFPYSpectrum,
+            "volumes": self._volumes.ravel().tolist(),
+            "burnable": self.processor.burnable,
+        }
 
     def bosSolve(self, compositions, timestep, power):
         """Create and solve the BOS problem with updated compositions
@@ -321,18 +446,94 @@ class SerpentSolver(BaseSolver):
         """
         return self._solve(compositions, timestep, power, final=True)
 
+    def checkpoint(self):
+        """Return the particle schedule and cross sections used for trimming
+
+        Returns
+        -------
+        dict
+            Particles per cycle for the next solution, if scheduled,
+            and the most recent microscopic cross sections
+
+        """
+        return {
+            "particles": None if self.scheduler is None else self.scheduler.particles,
+            "microXS": self.writer.microXS,
+        }
+
+    def restore(self, state):
+        """Restore the state from :meth:`checkpoint` after :meth:`beforeMain`
+
+        Parameters
+        ----------
+        state : dict
+            State from a previous call to :meth:`checkpoint`
+
+        """
+        if self.scheduler is not None and state["particles"] is not None:
+            self.scheduler.setParticles(state["particles"])
+        self.writer.microXS = state["microXS"]
+
     def _solve(self, compositions, timestep, power, final=False):
-        curfile = self.writer.writeSteadyStateFile(
-            f"./serpent-s{timestep.coarse}", compositions, timestep, power, final=final)
+        scheduler = self.scheduler
+        particles = None if scheduler is None else scheduler.particles
+        with timed("serpent.write"):
+            curfile = self.writer.writeSteadyStateFile(
+                f"./serpent-s{timestep.coarse}", compositions, timestep, power,
+                final=final, particles=particles,
+            )
+        if not final:
+            self.processor.activeIsotopes = self.writer.activeIsotopes
+
+        # Only flux and keff are needed at the final step
+        hooks = _EOL_HOOKS if final else self.hooks
+        fluxErrors = scheduler is not None
 
         start = time.time()
-        self.runner(curfile)
-        end = time.time()
+        key = res = None
+        if self.cache is not None:
+            with timed("serpent.cache"):
+                key = self.cache.key(
+                    curfile,
+                    features=sorted(f.name for f in hooks.features),
+                    macroXS=sorted(hooks.macroXS),
+                    fluxErrors=fluxErrors,
+                    **self._cacheOptions,
+                )
+                res, files = self.cache.get(key)
 
-        res = self._process(str(curfile), index=0)
-        res.runTime = end - start
+        if res is None:
+            with timed("serpent.run"):
+                self.runner(curfile)
+            end = time.time()
+            res = self._process(
+                str(curfile), index=0, hooks=hooks, fluxErrors=fluxErrors,
+            )
+            res.runTime = end - start
+            if key is not None:
+                with timed("serpent.cache"):
+                    self.cache.put(key, res, files=self._cachedOutputs())
+        else:
+            __logger__.info(
+                "Restored transport result for %s from %s",
+                curfile, self.cache.directory,
+            )
+            # Outputs needed by following solutions, e.g. fission sources
+            for name, contents in files.items():
+                (curfile.parent / name).write_bytes(contents)
+            res.runTime = time.time() - start
+
+        if res.microXS is not None:
+            self.writer.microXS = res.microXS
+        if scheduler is not None:
+            res.particles = particles
+            scheduler.update(res, nextIndex=timestep.coarse + 1)
         return res
 
+    def _cachedOutputs(self):
+        source = getattr(self.writer, "sourcefile", None)
+        return () if source is None else (source, )
+
     def _writeMainFile(self, model, manager, settings):
         basefile = pathlib.Path.cwd() / "serpent-base.sss"
         self.writer.writeBaseFile(basefile, settings, manager.chain)
@@ -404,13 +605,16 @@ class CoupledSerpentSolver(BaseSolver):
 
         """
         if timestep.coarse != 0:
-            self.writer.updateComps(compositions, timestep, threshold=0)
+            with timed("serpent.write"):
+                self.writer.updateComps(compositions, timestep, threshold=0)
             start = time.time()
-            self.runner.solveNext()
+            with timed("serpent.run"):
+                self.runner.solveNext()
             end = time.time()
         else:
             start = time.time()
-            self.runner.start(self._fp, self._fp.with_suffix(".log"))
+            with timed("serpent.run"):
+                self.runner.start(self._fp, self._fp.with_suffix(".log"))
             end = time.time()
             self.writer.updateFromRestart()
 
@@ -445,15 +649,32 @@ class CoupledSerpentSolver(BaseSolver):
         """
 
         self.cstep = timestep.coarse
-        self.writer.updateComps(compositions, timestep, threshold=0)
+        with timed("serpent.write"):
+            self.writer.updateComps(compositions, timestep, threshold=0)
         start = time.time()
-        self.runner.solveEOL()
+        with timed("serpent.run"):
+            self.runner.solveEOL()
         end = time.time()
 
-        res = self._process(str(self._fp), timestep.coarse)
+        res = self._process(str(self._fp), timestep.coarse, hooks=_EOL_HOOKS)
         res.runTime = end - start
         return res
 
+    def restore(self, state):
+        """Resuming is not supported with the external depletion interface
+
+        The Serpent process, and its depletion history, cannot be
+        recovered once terminated
+
+        Raises
+        ------
+        NotImplementedError
+
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} cannot resume from a checkpoint"
+        )
+
     def finalize(self, _success):
         """Close the connection to the Serpent solver
 
@@ -4,6 +4,13 @@ from collections import namedtuple
 from enum import Enum, auto
 import typing
 import re
+import json
+import hashlib
+import tempfile
+import logging
+
+
+__logger__ = logging.getLogger("hydep.serpent")
 
 
 DataLibraries = namedtuple("DataLibraries", "xs decay nfy sab")
@@ -25,6 +32,11 @@ replacements : dict
 """
 
 
+_XSDATA_REGEX = re.compile(
+    r"\s+(\d{,6})\.(\d{2}c)\s+.*\.\d{2}c\s+\d\s+(\d{4,})\s+(\d+)"
+)
+
+
 class Library(Enum):
     ACE = auto()
     DEC = auto()
@@ -148,7 +160,7 @@ def findProblemIsotopes(
         name
 
     """
-    reg = re.compile(r"\s+(\d{,6})\.\d{2}c\s+.*\.\d{2}c\s+\d\s+(\d{4,})\s+(\d+)")
+    reg = _XSDATA_REGEX
     replacements = {}
     previous = set()
     candidates = set(candidateZAIs)
@@ -161,7 +173,7 @@ def findProblemIsotopes(
             line = stream.readline()
             continue
         try:
-            serpentZA, ZA, meta = match.groups()
+            serpentZA, _suffix, ZA, meta = match.groups()
             if (ZA, meta) in previous:
                 line = stream.readline()
                 continue
@@ -184,3 +196,183 @@ def findProblemIsotopes(
         line = stream.readline()
 
     return ProblematicIsotopes(missing=candidates, replacements=replacements)
+
+
+class XsdataIndex:
+    """Isotopes available in a Serpent cross section directory file
+
+    Rather than create directly, use :meth:`fromStream` or
+    :func:`getXsdataIndex` to take advantage of the on-disk cache
+
+    Parameters
+    ----------
+    zais : dict of (int, int, int) to (int, int)
+        Map of isotope ZAI triplet to the Z, A under which the
+        isotope is stored in the library, e.g.
+        ``{(95, 242, 1): (95, 342)}``
+    suffixes : dict of (int, int, int) to tuple of str
+        Map of isotope ZAI triplet to the temperature-specific
+        library suffixes, e.g. ``("03c", "06c", "09c")``
+
+    Attributes
+    ----------
+    zais : dict of (int, int, int) to (int, int)
+        Map of isotope ZAI triplet to the Z, A under which the
+        isotope is stored in the library
+    suffixes : dict of (int, int, int) to tuple of str
+        Map of isotope ZAI triplet to the temperature-specific
+        library suffixes
+
+    """
+
+    __slots__ = ("zais", "suffixes")
+
+    def __init__(self, zais, suffixes):
+        self.zais = zais
+        self.suffixes = suffixes
+
+    @classmethod
+    def fromStream(cls, stream):
+        """Index all isotopes in a cross section directory file
+
+        Parameters
+        ----------
+        stream : readable
+            Stream containing file data, like from opening the file
+
+        Returns
+        -------
+        XsdataIndex
+
+        """
+        zais = {}
+        suffixes = {}
+        for line in stream:
+            match = _XSDATA_REGEX.match(line)
+            if match is None:
+                continue
+            try:
+                serpentZA, suffix, ZA, meta = match.groups()
+                z, a = divmod(int(ZA), 1000)
+                zai = (z, a, int(meta))
+            except Exception as ee:
+                raise RuntimeError(f"Failed to process line\n{line}") from ee
+            # Follow the convention in findProblemIsotopes of using
+            # the first instance of an isotope
+            if zai not in zais:
+                zais[zai] = divmod(int(serpentZA), 1000)
+                suffixes[zai] = []
+            if suffix not in suffixes[zai]:
+                suffixes[zai].append(suffix)
+
+        return cls(zais, {k: tuple(v) for k, v in suffixes.items()})
+
+    def toDict(self) -> dict:
+        """Serializable representation, used for the on-disk cache"""
+        return {
+            "zais": [[*zai, *za] for zai, za in self.zais.items()],
+            "suffixes": [[*zai, *suf] for zai, suf in self.suffixes.items()],
+        }
+
+    @classmethod
+    def fromDict(cls, data):
+        """Inverse of :meth:`toDict`"""
+        zais = {tuple(row[:3]): tuple(row[3:]) for row in data["zais"]}
+        suffixes = {tuple(row[:3]): tuple(row[3:]) for row in data["suffixes"]}
+        return cls(zais, suffixes)
+
+    def findProblemIsotopes(
+        self, candidateZAIs: typing.Iterable[typing.Tuple[int, int, int]],
+    ) -> ProblematicIsotopes:
+        """Find isotopes that don't exist, or exist under new names
+
+        Equivalent to :func:`findProblemIsotopes`, but relying on the
+        index rather than scanning the file
+
+        Parameters
+        ----------
+        candidateZAIs : iterable of (int, int, int)
+            Isotopes ZAI identifiers that are likely to be used in the
+            simulation
+
+        Returns
+        -------
+        ProblematicIsotopes
+
+        """
+        missing = set()
+        replacements = {}
+        for zai in candidateZAIs:
+            zai = tuple(zai)
+            za = self.zais.get(zai)
+            if za is None:
+                missing.add(zai)
+            elif za != zai[:2]:
+                replacements[zai] = za
+        return ProblematicIsotopes(missing=missing, replacements=replacements)
+
+
+def _getCacheDir():
+    cachedir = os.environ.get("HYDEP_CACHE_DIR")
+    if cachedir:
+        return pathlib.Path(cachedir)
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    if xdg:
+        return pathlib.Path(xdg) / "hydep"
+    return pathlib.Path.home() / ".cache" / "hydep"
+
+
+def getXsdataIndex(xsfile, cachedir=None) -> XsdataIndex:
+    """Index a cross section directory file, using an on-disk cache
+
+    The cache is keyed by the resolved path, size, and modification
+    time of ``xsfile``, so modifying the file will invalidate the
+    cache. Cache files are written atomically, and can be shared
+    across runs and processes.
+
+    Parameters
+    ----------
+    xsfile : str or pathlib.Path
+        Path to cross section look up table, usually ending in
+        ``.xsdata``.
+    cachedir : str or pathlib.Path, optional
+        Directory for storing cached indexes. If not given, use
+        the ``HYDEP_CACHE_DIR`` environment variable, otherwise
+        ``$XDG_CACHE_HOME/hydep`` or ``~/.cache/hydep``
+
+    Returns
+    -------
+    XsdataIndex
+
+    """
+    xsfile = pathlib.Path(xsfile).resolve()
+    stat = xsfile.stat()
+    key = {"path": str(xsfile), "size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+    cachedir = _getCacheDir() if cachedir is None else pathlib.Path(cachedir)
+    digest = hashlib.sha1(str(xsfile).encode()).hexdigest()
+    cachefile = cachedir / f"xsdata-{digest}.json"
+
+    if cachefile.is_file():
+        try:
+            with cachefile.open("r") as stream:
+                cached = json.load(stream)
+            if cached.get("key") == key:
+                return XsdataIndex.fromDict(cached["index"])
+        except (OSError, ValueError, KeyError) as ee:
+            __logger__.debug("Ignoring bad xsdata cache %s: %s", cachefile, ee)
+
+    with xsfile.open("r") as stream:
+        index = XsdataIndex.fromStream(stream)
+
+    try:
+        cachedir.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=cachedir, suffix=".tmp", delete=False
+        ) as stream:
+            json.dump({"key": key, "index": index.toDict()}, stream)
+        os.replace(stream.name, cachefile)
+    except OSError as ee:
+        __logger__.debug("Could not write xsdata cache %s: %s", cachefile, ee)
+
+    return index
@@ -7,10 +7,10 @@ import pathlib
 import warnings
 import re
 from textwrap import TextWrapper
-import struct
 from collections import OrderedDict
 from collections.abc import Sequence
 import numbers
+import logging
 
 import numpy
 
@@ -21,10 +21,15 @@ from hydep.internal import getIsotope
 from hydep.typed import TypedAttr, IterableOf
 import hydep.internal.features as hdfeat
 
-from .utils import findLibraries, findProblemIsotopes, ProblematicIsotopes
+from .utils import findLibraries, getXsdataIndex, ProblematicIsotopes
+
+__logger__ = logging.getLogger("hydep.serpent")
 
 
 _ROOT_UNIVERSE_ID = 0
+# Fission and neutron disappearance, e.g. (n,gamma), (n,p), (n,alpha).
+# Excludes reactions that produce neutrons, like (n,2n)
+_ABSORPTION_MTS = frozenset({18, *range(102, 118)})
 
 
 class BaseWriter:
@@ -42,6 +47,10 @@ class BaseWriter:
         discouraged. Required before :meth:`writeMainFile`
     burnable : sequence of hydep.BurnableMaterial or None
         Ordering of burnable materials. Required before :meth:`writeMainFile`
+    fpyDetectors : sequence of str
+        Lines defining detectors needed to compute fission product
+        yields. Only written if fission yields are requested in
+        :attr:`hooks`
 
     """
 
@@ -56,8 +65,10 @@ class BaseWriter:
         self.burnable = None
         self.hooks = hdfeat.FeatureCollection()
         self.datafiles = None
+        self.fpyDetectors = ()
         self._buleads = {}
         self._problemIsotopes = ProblematicIsotopes(missing=set(), replacements={})
+        self._isoDefCache = {}
         self._textwrapper = TextWrapper(width=75)
         self._commenter = TextWrapper(
             width=75, initial_indent=" * ", subsequent_indent=" * ",
@@ -166,6 +177,10 @@ class BaseWriter:
         found under a different ZA number. Am242_m1 can sometimes
         be found at 95342 rather than 95242.
 
+        The library is indexed with :func:`hydep.serpent.utils.getXsdataIndex`,
+        so the file is only scanned if it has changed since the
+        cached index was created.
+
         Parameters
         ----------
         zais : iterable of [int, int, int]
@@ -182,11 +197,11 @@ class BaseWriter:
             the library, or found under a different ZA number
 
         """
-        with xsfile.open("r") as s:
-            p = findProblemIsotopes(s, zais)
+        p = getXsdataIndex(xsfile).findProblemIsotopes(zais)
 
         self._problemIsotopes.missing.update(p.missing)
         self._problemIsotopes.replacements.update(p.replacements)
+        self._isoDefCache.clear()
 
         return p
 
@@ -317,22 +332,97 @@ set nfg {self._eneGridName}
           cross section library used
 
         """
-        missing = 0
-        lines = []
-        for (z, a, i), adens in pairs:
-            if adens < threshold:
-                missing += adens
-                continue
-            # Check missing
-            if (z, a, i) in self._problemIsotopes.missing:
-                missing += adens
-                continue
+        zais = []
+        densities = []
+        for zai, adens in pairs:
+            zais.append(tuple(zai))
+            densities.append(adens)
+        return self._writeIsoBlock(stream, tuple(zais), densities, tlib, threshold)
+
+    def _getIsoNames(self, zais, tlib):
+        """Serpent isotope names and mask of isotopes in the library
+
+        Results are cached for each ordering of isotopes and library,
+        and reset when the problematic isotopes are updated
+
+        Parameters
+        ----------
+        zais : tuple of (int, int, int)
+            Isotope ZAI triplets
+        tlib : str
+            Temperature-specific cross section library, e.g. ``"09c"``
+
+        Returns
+        -------
+        numpy.ndarray of str
+            Isotope names, e.g. ``"92235.09c"``, for all isotopes
+        numpy.ndarray of bool
+            Flag indicating if the isotope exists in the library
+
+        """
+        key = (zais, tlib)
+        cached = self._isoDefCache.get(key)
+        if cached is not None:
+            return cached
+
+        names = []
+        allowed = numpy.ones(len(zais), dtype=bool)
+        missing = self._problemIsotopes.missing
+        replacements = self._problemIsotopes.replacements
+
+        for ix, (z, a, i) in enumerate(zais):
+            if (z, a, i) in missing:
+                allowed[ix] = False
             # Get Z, A for isotope that may be listed under a different
             # name, e.g. metastable isotopes
-            z, a = self._problemIsotopes.replacements.get((z, a, i), (z, a))
-            lines.append(f"{z}{a:03}.{tlib} {adens:13.9E}")
-        stream.write("\n".join(lines))
-        return missing
+            z, a = replacements.get((z, a, i), (z, a))
+            names.append(f"{z}{a:03}.{tlib}")
+
+        cached = self._isoDefCache[key] = numpy.array(names), allowed
+        return cached
+
+    def _writeIsoBlock(
+        self, stream, zais, densities, tlib, threshold=1e-20, keep=None
+    ):
+        """Write a block of isotopes and densities with bulk formatting
+
+        Parameters
+        ----------
+        stream : writeable
+            Destination of the isotope block
+        zais : tuple of (int, int, int)
+            Isotope ZAI triplets
+        densities : sequence of float
+            Atom density [#/b/cm] for each isotope in ``zais``
+        tlib : str
+            Temperature-specific cross section library
+        threshold : float, optional
+            Threshold for writing atom densities
+        keep : numpy.ndarray of bool, optional
+            If given, only write isotopes where ``keep`` is true
+
+        Returns
+        -------
+        float
+            Sum of atom density for missing isotopes not written
+
+        """
+        names, allowed = self._getIsoNames(zais, tlib)
+        densities = numpy.asarray(densities, dtype=float)
+        if keep is None:
+            keep = allowed & (densities >= threshold)
+        else:
+            keep = keep & allowed & (densities >= threshold)
+
+        kept = densities[keep]
+        if kept.size:
+            fmt = "\n".join(["%s %13.9E"] * kept.size)
+            values = [None] * (2 * kept.size)
+            values[::2] = names[keep].tolist()
+            values[1::2] = kept.tolist()
+            stream.write(fmt % tuple(values))
+
+        return float(densities[~keep].sum())
 
     def _getmatlib(self, mat):
         """Return the continuous energy library, "03c", given material"""
@@ -613,12 +703,18 @@ cell {writeas} {writeas} {infmat.material.id} -{writeas}
     def _writehooks(self, stream, chain):
         self.commentblock(stream, "BEGIN HOOKS")
         self._writeFluxDetectors(stream)
+        self._writeFeatureHooks(stream, chain.reactionIndex)
+
+    def _writeFeatureHooks(self, stream, reactionIndex, active=None):
+        """Write the outputs needed for features in :attr:`hooks`"""
         if hdfeat.FISSION_MATRIX in self.hooks:
             self._writefmtx(stream)
         if hdfeat.HOMOG_LOCAL in self.hooks:
             self._writelocalgcu(stream)
         if hdfeat.MICRO_REACTION_XS in self.hooks:
-            self._writeMdep(stream, chain.reactionIndex)
+            self._writeMdep(stream, reactionIndex, active)
+        if hdfeat.FISSION_YIELDS in self.hooks and self.fpyDetectors:
+            stream.write("\n".join(self.fpyDetectors) + "\n")
 
     def _writefmtx(self, stream):
         stream.write("set fmtx 2 ")
@@ -636,11 +732,33 @@ cell {writeas} {writeas} {infmat.material.id} -{writeas}
         lines = map("du {}".format, (m.id for m in self.burnable))
         stream.write(self._textwrapper.fill("\n".join(lines)) + "\n")
 
-    def _writeMdep(self, stream, reactions):
+    def _writeMdep(self, stream, reactions, active=None):
+        """Request microscopic cross sections for each burnable material
+
+        Parameters
+        ----------
+        stream : writable
+            Destination for the ``set mdep`` cards
+        reactions : iterable of (int, int)
+            Isotope ZAI and reaction MT pairs
+        active : sequence of set of int, optional
+            If given, only reactions for isotopes in ``active[i]``
+            are requested for burnable material ``i``
+
+        """
         # Serpent has a hard limit of 992550
-        lines = [f"{z} {m}" for z, m in reactions if z < 992550]
-        fill = self._textwrapper.fill("\n".join(lines))
-        for m in self.burnable:
+        pairs = [(z, m) for z, m in reactions if z < 992550]
+        if active is None:
+            fill = self._textwrapper.fill("\n".join(f"{z} {m}" for z, m in pairs))
+            for m in self.burnable:
+                stream.write(f"set mdep {m.id} 1.0 1 {m.id}\n{fill}\n")
+            return
+
+        for m, isos in zip(self.burnable, active):
+            lines = [f"{z} {rxn}" for z, rxn in pairs if z in isos]
+            if not lines:
+                continue
+            fill = self._textwrapper.fill("\n".join(lines))
             stream.write(f"set mdep {m.id} 1.0 1 {m.id}\n{fill}\n")
 
     def writeMainFile(self, path, settings, chain):
@@ -732,12 +850,71 @@ class SerpentWriter(BaseWriter):
     hooks : hydep.internal.features.FeatureCollection
         Each entry indicates a specific type of physics that
         must be run.
+    cacheMaterials : bool
+        If ``True``, write each burnable material to a separate
+        file that is included in the steady-state file. Files are
+        only rewritten if the compositions of that material change
+        between calls to :meth:`writeSteadyStateFile`.
+        Default is ``False``
+    bufferSize : int
+        Size [bytes] of the buffer used when writing the steady-state
+        file
+    mdepThreshold : float or None
+        Density [#/b/cm] an isotope must reach in a burnable material
+        for its microscopic cross sections to be requested. Configured
+        from :attr:`hydep.settings.SerpentSettings.mdepThreshold` in
+        :meth:`writeBaseFile`. A value of ``None`` requests all reactions.
+        Isotopes below the threshold are still requested if they have
+        not been requested in a previous steady-state file, so every
+        reaction is requested in the first file
+    activeIsotopes : tuple of frozenset of int or None
+        Isotope ZAIs for which microscopic cross sections were requested
+        in each burnable material in the most recent call to
+        :meth:`writeSteadyStateFile`. ``None`` if all reactions were
+        requested
+    trimFraction : float or None
+        Fraction of the total importance in each burnable material that
+        may be omitted from steady-state files. Configured from
+        :attr:`hydep.settings.SerpentSettings.trimFraction` in
+        :meth:`writeBaseFile`. A value of ``None`` disables trimming
+    trimMode : str
+        Measure of isotope importance, ``"absorption"`` or ``"density"``
+    microXS : hydep.internal.MaterialDataArray or None
+        Most recent microscopic cross sections, used to compute
+        absorption rates, from fission and neutron disappearance
+        reactions, when trimming with :attr:`trimMode` ``"absorption"``
+    lumpedDensities : numpy.ndarray or None
+        Atom density [#/b/cm] omitted from each burnable material in
+        the most recent call to :meth:`writeSteadyStateFile`. The
+        total and largest values are logged at the ``INFO`` level
+    sourcefile : pathlib.Path or None
+        Fission source that will be written by the most recent
+        steady-state file. If fission source reuse is enabled through
+        :attr:`hydep.settings.SerpentSettings.fspInactiveBatches`,
+        the next steady-state file will start from this source with
+        fewer inactive cycles
 
     """
 
+    bufferSize = 2 ** 20
+
     def __init__(self):
         super().__init__()
         self.base = None
+        self.cacheMaterials = False
+        self.mdepThreshold = None
+        self.activeIsotopes = None
+        self._requested = None
+        self.sourcefile = None
+        self.trimFraction = None
+        self.trimMode = "absorption"
+        self.microXS = None
+        self.lumpedDensities = None
+        self._isoXSCache = None
+        self._pop = None
+        self._fspInactive = None
+        self._matcache = {}
+        self._reactionIndex = None
 
     def writeBaseFile(self, path, settings, chain):
         """Write the main input file
@@ -768,10 +945,68 @@ class SerpentWriter(BaseWriter):
             Absolute path to the file that has been written
 
         """
+        serpentSettings = settings.serpent
+        self.mdepThreshold = serpentSettings.mdepThreshold
+        self.activeIsotopes = None
+        self._requested = None
+        self.trimFraction = serpentSettings.trimFraction
+        self.trimMode = serpentSettings.trimMode
         base = self.writeMainFile(path, settings, chain)
         self.base = base
+        self.sourcefile = None
+        # Particles, active cycles, inactive cycles, k0, generations per
+        # batch to support overriding set pop in steady-state files
+        gen = serpentSettings.generationsPerBatch
+        self._pop = (
+            serpentSettings.particles,
+            gen * serpentSettings.active,
+            gen * serpentSettings.inactive,
+            serpentSettings.k0 or 1.0,
+            gen,
+        )
+        if serpentSettings.fspInactiveBatches is None:
+            self._fspInactive = None
+        else:
+            self._fspInactive = gen * serpentSettings.fspInactiveBatches
         return base
 
+    def _writeSourceReuse(self, stream, steadystate):
+        """Read the previous fission source and write a new one
+
+        Requires fission source reuse to be configured in
+        :meth:`writeBaseFile`. If the previous run wrote a fission
+        source, it is used as the initial source. The converged source
+        of this run will be written next to ``steadystate``
+
+        Returns
+        -------
+        bool
+            If the previous fission source will be read
+
+        """
+        previous = self.sourcefile
+        reading = previous is not None and previous.is_file()
+        if reading:
+            stream.write(
+                f'''% Start from the converged source of the previous solution
+src hydepfsrc sf "{previous}" 1
+'''
+            )
+        self.sourcefile = steadystate.resolve().with_name(
+            steadystate.name + ".src"
+        )
+        stream.write(f'set csw "{self.sourcefile}"\n')
+        return reading
+
+    def _writePop(self, stream, particles=None, inactive=None):
+        """Override the particle settings from the base file"""
+        baseParticles, active, baseInactive, k0, gen = self._pop
+        if particles is None:
+            particles = baseParticles
+        if inactive is None:
+            inactive = baseInactive
+        stream.write(f"set pop {particles} {active} {inactive} {k0:.5f} % {gen}\n")
+
     def _writematerials(self, stream, materials):
         self.commentblock(stream, "BEGIN MATERIAL BLOCK")
         for mat in materials:
@@ -779,6 +1014,12 @@ class SerpentWriter(BaseWriter):
                 continue
             self.writemat(stream, mat)
 
+    def _writehooks(self, stream, chain):
+        self.commentblock(stream, "BEGIN HOOKS")
+        self._writeFluxDetectors(stream)
+        # Remaining hooks are written for each step
+        self._reactionIndex = chain.reactionIndex
+
     def _writeMdep(self, stream, *args):
         self.commentblock(
             stream,
@@ -789,7 +1030,9 @@ of depletion. Add a single one day step here. Maybe hack something later""",
         stream.write("dep daystep 1\nset pcc 0\n")
         super()._writeMdep(stream, *args)
 
-    def writeSteadyStateFile(self, path, compositions, timestep, power, final=False):
+    def writeSteadyStateFile(
+        self, path, compositions, timestep, power, final=False, particles=None
+    ):
         """Write updated burnable materials for steady state solution
 
         Requires the base file with geometry, settings, and non-burnable
@@ -808,7 +1051,11 @@ of depletion. Add a single one day step here. Maybe hack something later""",
         power : float
             Current reactor power [W]
         final : bool, optional
-            If ``True``, no depletion information will be written.
+            If ``True``, no depletion information will be written,
+            and only flux detectors will be requested.
+        particles : int, optional
+            Particles per cycle for this solution. If not given, use
+            the value written to the base file
 
         Returns
         -------
@@ -823,7 +1070,7 @@ of depletion. Add a single one day step here. Maybe hack something later""",
             raise AttributeError(f"Base file to be included not found on {self}")
 
         steadystate = self._setupfile(path)
-        with steadystate.open("w") as stream:
+        with steadystate.open("w", buffering=self.bufferSize) as stream:
             stream.write(
                 f"""/*
  * Steady state input file
@@ -834,9 +1081,23 @@ of depletion. Add a single one day step here. Maybe hack something later""",
 include "{self.base.resolve()}"
 set power {power:.7E}\n"""
             )
+            inactive = None
+            if self._fspInactive is not None and self._writeSourceReuse(
+                stream, steadystate
+            ):
+                inactive = self._fspInactive
+            if particles is not None or inactive is not None:
+                self._writePop(stream, particles, inactive)
 
             zais = tuple((iso.triplet for iso in compositions.isotopes))
 
+            if self.trimFraction is None:
+                isoxs = None
+                self.lumpedDensities = None
+            else:
+                isoxs = self._getIsotopeXS(compositions.isotopes)
+                self.lumpedDensities = numpy.zeros(len(compositions.densities))
+
             for ix, densities in enumerate(compositions.densities):
                 matprops = self._buleads.get(ix)
                 if matprops is None:
@@ -851,17 +1112,217 @@ set power {power:.7E}\n"""
                     matdef, tlib = matprops
 
                 if final:
-                    # TODO Turn off all hooks except flux for final step
                     # TODO Only load decay, nfy for non-final steps
                     # META do we need decay, nfy libraries at all?
                     matdef = matdef.replace(" burn 1", "")
 
+                if self.trimFraction is None:
+                    keep = None
+                else:
+                    keep = self._trimIsotopes(
+                        densities, None if isoxs is None else isoxs[ix],
+                        self.trimFraction,
+                    )
+                    self.lumpedDensities[ix] = densities[~keep].sum()
+
+                if self.cacheMaterials:
+                    matfile = self._writeCachedMaterial(
+                        steadystate.parent, ix, matdef, zais, densities, tlib, keep,
+                    )
+                    stream.write(f'include "{matfile}"\n')
+                    continue
+
                 stream.write(f"{matdef}\n")
-                self.writeMatIsoDef(stream, zip(zais, densities), tlib)
+                self._writeIsoBlock(stream, zais, densities, tlib, keep=keep)
                 stream.write("\n")
 
+            if self.lumpedDensities is not None:
+                __logger__.info(
+                    "Trimmed isotopes from %s. Omitted atom density [#/b/cm] "
+                    "total %.4E, largest %.4E in a single material",
+                    steadystate, self.lumpedDensities.sum(),
+                    self.lumpedDensities.max(),
+                )
+                __logger__.debug(
+                    "Omitted atom densities from %s: %s",
+                    steadystate, self.lumpedDensities,
+                )
+
+            if not final and self.hooks:
+                if (
+                    self.mdepThreshold is not None
+                    and hdfeat.MICRO_REACTION_XS in self.hooks
+                ):
+                    self.activeIsotopes = self._findActiveIsotopes(
+                        compositions, self.mdepThreshold, self._requested
+                    )
+                    if self._requested is None:
+                        self._requested = self.activeIsotopes
+                    else:
+                        self._requested = tuple(
+                            previous | active for previous, active in zip(
+                                self._requested, self.activeIsotopes)
+                        )
+                else:
+                    self.activeIsotopes = None
+                self.commentblock(stream, "BEGIN STEP HOOKS")
+                self._writeFeatureHooks(
+                    stream, self._reactionIndex, self.activeIsotopes
+                )
+
         return steadystate
 
+    def _getIsotopeXS(self, isotopes):
+        """Microscopic absorption cross section for each isotope
+
+        Absorption is the sum of fission and neutron disappearance
+        reactions, MT 18 and 102 to 117. Other reactions, e.g.
+        (n,2n), are not included
+
+        Returns
+        -------
+        numpy.ndarray or None
+            Array of shape ``(nmaterials, nisotopes)`` with the
+            absorption cross sections for each isotope in each material,
+            ordered like ``isotopes``. ``None`` if trimming by density or
+            no cross sections are available
+
+        """
+        if self.trimMode != "absorption" or self.microXS is None:
+            return None
+        zais = tuple(iso.zai for iso in isotopes)
+        cached = self._isoXSCache
+        if cached is not None and cached[0] is self.microXS and cached[1] == zais:
+            return cached[2]
+
+        index = self.microXS.index
+        # Reactions for isotopes not requested from Serpent are NaN
+        data = numpy.nan_to_num(self.microXS.data)
+        absorbing = numpy.array([mt in _ABSORPTION_MTS for mt in index.rxns])
+        data = numpy.where(absorbing, data, 0.0)
+        zptr = numpy.asarray(index.zptr)
+        summed = numpy.add.reduceat(data, zptr[:-1], axis=1)
+        # reduceat does not handle isotopes without reactions
+        summed[:, zptr[:-1] == zptr[1:]] = 0.0
+        columns = {z: ix for ix, z in enumerate(index.zais)}
+        isoxs = numpy.zeros((data.shape[0], len(zais)))
+        for ix, z in enumerate(zais):
+            col = columns.get(z)
+            if col is not None:
+                isoxs[:, ix] = summed[:, col]
+
+        self._isoXSCache = (self.microXS, zais, isoxs)
+        return isoxs
+
+    @staticmethod
+    def _trimIsotopes(densities, isoxs, fraction):
+        """Find the isotopes that must be kept in a material
+
+        The least important isotopes are omitted until their summed
+        importance would exceed ``fraction`` of the total. If
+        cross sections are given, an isotope is only omitted if it is
+        unimportant with respect to both density and reaction rate
+
+        Parameters
+        ----------
+        densities : numpy.ndarray
+            Atom densities [#/b/cm] of each isotope
+        isoxs : numpy.ndarray or None
+            Microscopic absorption cross sections of each isotope
+        fraction : float
+            Fraction of total importance that can be omitted
+
+        Returns
+        -------
+        numpy.ndarray of bool
+            Flag for each isotope indicating it must be written
+
+        """
+        def important(values):
+            keep = numpy.ones(values.size, dtype=bool)
+            total = values.sum()
+            if total <= 0:
+                return keep
+            order = numpy.argsort(values, kind="stable")
+            cumulative = numpy.cumsum(values[order])
+            keep[order[cumulative <= fraction * total]] = False
+            return keep
+
+        densities = numpy.asarray(densities, dtype=float)
+        keep = important(numpy.maximum(densities, 0))
+        if isoxs is not None:
+            keep |= important(numpy.maximum(densities * isoxs, 0))
+        return keep
+
+    @staticmethod
+    def _findActiveIsotopes(compositions, threshold, requested=None):
+        """Isotopes in each material whose cross sections should be requested
+
+        Isotopes are active if their density is at or above a
+        threshold, or if their cross sections have not been
+        requested before. Otherwise, isotopes starting at zero
+        density, e.g. fission products in fresh fuel, would never
+        have cross sections to be reused from previous solutions.
+
+        Parameters
+        ----------
+        compositions : hydep.internal.CompBundle
+            Current burnable material compositions
+        threshold : float
+            Minimum atom density [#/b/cm]
+        requested : sequence of set of int, optional
+            ZAIs of isotopes requested in each burnable material by
+            all previous solutions. If not given, all isotopes are
+            active
+
+        Returns
+        -------
+        tuple of frozenset of int
+            ZAIs of active isotopes in each burnable material
+
+        """
+        zais = numpy.array([iso.zai for iso in compositions.isotopes])
+        everything = frozenset(zais.tolist())
+        if requested is None:
+            return (everything, ) * len(compositions.densities)
+        mask = numpy.greater_equal(compositions.densities, threshold)
+        return tuple(
+            frozenset(zais[row].tolist()) | (everything - previous)
+            for row, previous in zip(mask, requested)
+        )
+
+    def _writeCachedMaterial(
+        self, directory, index, matdef, zais, densities, tlib, keep=None
+    ):
+        """Write a single burnable material if it has changed
+
+        Returns the absolute path to the file containing the
+        material definition
+
+        """
+        previous = self._matcache.get(index)
+        if previous is not None:
+            prevdef, prevzais, prevdens, prevkeep, matfile = previous
+            if (
+                prevdef == matdef
+                and prevzais == zais
+                and numpy.array_equal(prevdens, densities)
+                and numpy.array_equal(prevkeep, keep)
+                and matfile.is_file()
+            ):
+                return matfile
+
+        matfile = (directory / f"serpent-bumat{index}").resolve()
+        with matfile.open("w", buffering=self.bufferSize) as stream:
+            stream.write(f"{matdef}\n")
+            self._writeIsoBlock(stream, zais, densities, tlib, keep=keep)
+            stream.write("\n")
+
+        self._matcache[index] = (
+            matdef, zais, numpy.array(densities), keep, matfile
+        )
+        return matfile
+
 
 class ExtDepWriter(BaseWriter):
     """Writer reponsible for setting up the external depletion
@@ -869,9 +1330,36 @@ class ExtDepWriter(BaseWriter):
     Relies on a patched version of Serpent that allows Serpent to
     read in new compositions at new depletion intervals. Only supports
     the signal-based communication now.
+
+    The restart file is processed with numpy structured arrays.
+    Each material record is laid out as
+
+    1. ``i8`` length of the material name
+    2. material name
+    3. :attr:`RESTART_HEADER` - burnup, time, number of nuclides,
+       atom density, mass density, material burnup
+    4. :attr:`RESTART_NUCLIDE` for every nuclide
+
+    If the isotopes written for every material are unchanged
+    from the previous call to :meth:`updateComps`, and the file
+    has not been modified by another process, densities are
+    patched in place rather than rewriting the entire file.
+
     """
 
     _FAKE_BURNUP = 12345.0
+    RESTART_HEADER = numpy.dtype(
+        [
+            ("burnup", "f8"),
+            ("days", "f8"),
+            ("nnucs", "i8"),
+            ("adens", "f8"),
+            ("mdens", "f8"),
+            ("matburnup", "f8"),
+        ]
+    )
+    RESTART_NUCLIDE = numpy.dtype([("zai", "i8"), ("adens", "f8")])
+    _NAME_LENGTH = numpy.dtype("i8")
 
     def __init__(self):
         super().__init__()
@@ -879,6 +1367,9 @@ class ExtDepWriter(BaseWriter):
         self.compFile = None
         self._names = None
         self._allowedZAI = None
+        self._allowedMask = None
+        self._layout = None
+        self._offsets = {}
 
     @property
     def burnable(self):
@@ -950,87 +1441,109 @@ set ppid {os.getpid()}
                 )
         return base
 
-    def _readZAI(self):
-        present = set()
-        # Read through restart file and find loaded isotopes from
-        # first material
-        with self.compFile.open("rb") as stream:
-            buf = stream.read(struct.calcsize("l"))
+    def _iterRestart(self, buf):
+        """Iterate over material records in a restart buffer
 
-            (namelen,) = struct.unpack("l", buf)
-            assert namelen > 0, (self.compFile, namelen)
+        Parameters
+        ----------
+        buf : buffer
+            Contents of the restart file, e.g. a :class:`numpy.memmap`
 
-            (name,) = struct.unpack(
-                f"{namelen}s", stream.read(struct.calcsize(f"{namelen}s"))
-            )
-            assert name in self._names, (self.compFile, name.decode())
+        Yields
+        ------
+        bytes
+            Name of the material
+        numpy.void
+            Material header with :attr:`RESTART_HEADER` fields
+        numpy.ndarray
+            Nuclide records with :attr:`RESTART_NUCLIDE` fields
 
-            # Skip days, nominal burnup
-            stream.read(struct.calcsize("2d"))
+        """
+        offset = 0
+        while offset < len(buf):
+            (namelen,) = numpy.frombuffer(buf, self._NAME_LENGTH, 1, offset)
+            assert namelen > 0, (self.compFile, namelen)
+            offset += self._NAME_LENGTH.itemsize
 
-            (nnucs,) = struct.unpack("l", stream.read(struct.calcsize("l")))
-            assert nnucs > 0, nnucs
+            name = bytes(buf[offset:offset + namelen])
+            offset += namelen
 
-            # Skip adens, mdens, material burnup
-            stream.read(struct.calcsize("3d"))
+            (header,) = numpy.frombuffer(buf, self.RESTART_HEADER, 1, offset)
+            offset += self.RESTART_HEADER.itemsize
+            nnucs = header["nnucs"]
+            assert nnucs > 0, nnucs
 
-            buf = stream.read(nnucs * struct.calcsize("ld"))
+            nucs = numpy.frombuffer(buf, self.RESTART_NUCLIDE, nnucs, offset)
+            offset += nucs.nbytes
 
-            for z, _a in struct.iter_unpack("ld", buf):
-                if z > 0:
-                    present.add(z)
+            yield name, header, nucs
 
-        return present
+    def _readZAI(self):
+        # Read through restart file and find loaded isotopes from
+        # first material
+        buf = numpy.memmap(self.compFile, dtype=numpy.uint8, mode="r")
+        name, _header, nucs = next(self._iterRestart(buf))
+        assert name in self._names, (self.compFile, name.decode())
+        zais = nucs["zai"]
+        return numpy.unique(zais[zais > 0])
 
     def updateFromRestart(self):
         """Fetch Serpent adens, mdens from file"""
         assert self._names is not None
 
-        zais = set()
+        zais = []
 
-        with self.compFile.open("rb") as stream:
-            buf = stream.read(struct.calcsize("l"))
-            assert buf
+        buf = numpy.memmap(self.compFile, dtype=numpy.uint8, mode="r")
+        for bname, header, nucs in self._iterRestart(buf):
+            mdata = self._names.get(bname)
+            assert mdata is not None, bname.decode()
 
-            while buf:
-                (namelen,) = struct.unpack("l", buf)
-                assert namelen > 0, namelen
+            adens = float(header["adens"])
+            mdens = float(header["mdens"])
+            assert adens > 0, adens
+            assert mdens > 0, mdens
 
-                (bname,) = struct.unpack(
-                    f"{namelen}s", stream.read(struct.calcsize(f"{namelen}s")),
-                )
-                mdata = self._names.get(bname)
-                assert mdata is not None, bname.decode()
+            mdata["adens"] = adens
+            mdata["mdens"] = mdens
 
-                # Skip days, nominal burnup
-                stream.read(struct.calcsize("2d"))
+            zais.append(nucs["zai"][nucs["zai"] > 0])
 
-                (nnucs,) = struct.unpack("l", stream.read(struct.calcsize("l")))
-                assert nnucs > 0, nnucs
+        del buf
 
-                adens, mdens, _mbu = struct.unpack(
-                    "3d", stream.read(struct.calcsize("3d")),
-                )
-                assert adens > 0, adens
-                assert mdens > 0, mdens
+        assert zais
+        zais = numpy.unique(numpy.concatenate(zais))
 
-                mdata["adens"] = adens
-                mdata["mdens"] = mdens
+        if self._allowedZAI is not None:
+            zais = numpy.union1d(self._allowedZAI, zais)
+        self._allowedZAI = zais
+        self._allowedMask = None
+        self._layout = None
 
-                # Process isotopes
-                buf = stream.read(struct.calcsize("ld") * nnucs)
-                for z, _a in struct.iter_unpack("ld", buf):
-                    if z > 0:
-                        zais.add(z)
+    def _getAllowedMask(self, zais):
+        """Mask of isotopes that Serpent has loaded, cached by ordering"""
+        if self._allowedMask is not None:
+            prevzais, mask = self._allowedMask
+            if numpy.array_equal(prevzais, zais):
+                return mask
+        mask = numpy.isin(zais, self._allowedZAI)
+        self._allowedMask = zais, mask
+        return mask
 
-                buf = stream.read(struct.calcsize("l"))
+    def updateComps(self, compositions, timestep, threshold=0):
+        """Write new compositions to the restart file
 
-        if self._allowedZAI is None:
-            self._allowedZAI = zais
-        else:
-            self._allowedZAI.update(zais)
+        Parameters
+        ----------
+        compositions : hydep.internal.CompBundle
+            New compositions for all burnable materials
+        timestep : hydep.internal.TimeStep
+            Current time step. Must not be the first step
+        threshold : float, optional
+            Isotopes with densities below this value will not be
+            written, and instead lumped into a single
+            placeholder nuclide
 
-    def updateComps(self, compositions, timestep, threshold=0):
+        """
         assert self._names is not None
         assert self.compFile is not None
 
@@ -1047,48 +1560,106 @@ set ppid {os.getpid()}
 
         day = timestep.currentTime / SECONDS_PER_DAY
 
-        zais = [isotope.zai for isotope in compositions.isotopes]
+        zais = numpy.fromiter(
+            (isotope.zai for isotope in compositions.isotopes),
+            dtype=self.RESTART_NUCLIDE["zai"],
+            count=len(compositions.isotopes),
+        )
+        allowed = self._getAllowedMask(zais)
+        densities = numpy.asarray(compositions.densities, dtype=float)
+
+        # This assumes that the mass density is constant over
+        # time, which is not true. Serpent uses the atom density
+        # over the mass density in the transport routine, but keep
+        # an eye on this
 
-        longDub = struct.calcsize("ld")
+        keep = allowed & (densities >= threshold)
 
-        with self.compFile.open("wb") as stream:
-            for (bname, matdata), densities in zip(
-                self._names.items(), compositions.densities,
+        if self._canPatch(keep):
+            self._patchComps(densities, keep, day)
+        else:
+            self._writeComps(zais, densities, keep, day)
+
+    def _canPatch(self, keep):
+        """Check if the previous restart file layout can be reused"""
+        if self._layout is None:
+            return False
+        prevkeep, stat = self._layout
+        if not numpy.array_equal(prevkeep, keep):
+            return False
+        try:
+            current = self.compFile.stat()
+        except FileNotFoundError:
+            return False
+        # Modified by Serpent or another process
+        return (current.st_size, current.st_mtime_ns) == stat
+
+    def _patchComps(self, densities, keep, day):
+        buf = numpy.memmap(self.compFile, dtype=numpy.uint8, mode="r+")
+        for bname, matdens, matkeep in zip(self._names, densities, keep):
+            header, nucs = self._writableRecord(buf, bname)
+            lost = matdens[~matkeep].sum()
+            kept = matdens[matkeep]
+            header["days"] = day
+            header["adens"] = kept.sum()
+            nucs["adens"][0] = lost
+            nucs["adens"][1:] = kept
+        buf.flush()
+        del buf
+        self._recordLayout(keep)
+
+    def _writableRecord(self, buf, name):
+        """Writable views into the header and nuclides of ``name``"""
+        offset = self._offsets[name]
+        header = numpy.ndarray(
+            (), dtype=self.RESTART_HEADER, buffer=buf, offset=offset,
+        )
+        nucs = numpy.ndarray(
+            (int(header["nnucs"]),),
+            dtype=self.RESTART_NUCLIDE,
+            buffer=buf,
+            offset=offset + self.RESTART_HEADER.itemsize,
+        )
+        return header, nucs
+
+    def _writeComps(self, zais, densities, keep, day):
+        self._offsets = {}
+        offset = 0
+        with self.compFile.open("wb", buffering=2 ** 20) as stream:
+            for (bname, matdata), matdens, matkeep in zip(
+                self._names.items(), densities, keep,
             ):
-                namelen = len(bname)
-                stream.write(struct.pack("l", namelen))
-                stream.write(struct.pack(f"{namelen}s", bname))
-                stream.write(struct.pack("2d", self._FAKE_BURNUP, day))
-
-                lost = 0.0
-                total = 0.0
-                isoZaiAdens = []
-                for zai, adens in zip(zais, densities):
-                    if adens < threshold or zai not in self._allowedZAI:
-                        lost += adens
-                        continue
-                    isoZaiAdens.append((zai, adens))
-                    total += adens
-
-                # This assumes that the mass density is constant over
-                # time, which is not true. Serpent uses the atom density
-                # over the mass density in the transport routine, but keep
-                # an eye on this
+                kept = matdens[matkeep]
 
-                stream.write(
-                    struct.pack(
-                        "l3d",
-                        len(isoZaiAdens) + 1,
-                        total,
+                records = numpy.empty(kept.size + 1, dtype=self.RESTART_NUCLIDE)
+                records[0] = (-1, matdens[~matkeep].sum())
+                records["zai"][1:] = zais[matkeep]
+                records["adens"][1:] = kept
+
+                header = numpy.array(
+                    (
+                        self._FAKE_BURNUP,
+                        day,
+                        records.size,
+                        kept.sum(),
                         matdata["mdens"],
                         self._FAKE_BURNUP,
-                    )
+                    ),
+                    dtype=self.RESTART_HEADER,
                 )
 
-                buf = bytearray((1 + len(isoZaiAdens)) * longDub)
-                struct.pack_into("ld", buf, 0, -1, lost)
+                namelen = numpy.array(len(bname), dtype=self._NAME_LENGTH)
+                stream.write(namelen.tobytes())
+                stream.write(bname)
+                offset += namelen.nbytes + len(bname)
+                self._offsets[bname] = offset
+
+                stream.write(header.tobytes())
+                stream.write(records.tobytes())
+                offset += header.nbytes + records.nbytes
 
-                for count, (z, a) in enumerate(isoZaiAdens, start=1):
-                    struct.pack_into("ld", buf, count * longDub, z, a)
+        self._recordLayout(keep)
 
-                stream.write(buf)
+    def _recordLayout(self, keep):
+        stat = self.compFile.stat()
+        self._layout = keep.copy(), (stat.st_size, stat.st_mtime_ns)
@@ -275,6 +275,23 @@ class Settings:
     useTempDir : bool, optional
         Use a temporary directory in place of :attr:`rundir` when running
         simulations. Default is False.
+    compositionInterval : int, optional
+        Write compositions every ``compositionInterval`` substeps, in
+        addition to every coarse step. Default is one, writing
+        compositions at every substep
+    compositionIsotopes : str or iterable of str, optional
+        Names of isotopes whose compositions should be written.
+        Default is to write all isotopes
+    aggregateCompositions : bool, optional
+        Write volume-averaged compositions over all burnable
+        materials rather than compositions in each material.
+        Default is False
+    checkpointInterval : int, optional
+        Write a checkpoint every ``checkpointInterval`` coarse steps.
+        Default is zero, do not write checkpoints
+    trackMemory : bool, optional
+        Record the peak memory use in each phase of the simulation.
+        Default is False
 
     Attributes
     ----------
@@ -307,6 +324,27 @@ class Settings:
     useTempDir : bool
         Flag signalling to use a temporary directory in :attr:`rundir`
         is ``None``
+    compositionInterval : int
+        Non-negative interval of substeps at which compositions are
+        written. Compositions at the beginning of each coarse step and
+        the final step are always written. Zero writes only these
+        coarse step compositions
+    compositionIsotopes : tuple of str or None
+        Names of isotopes whose compositions should be written. ``None``
+        indicates all isotopes in the depletion chain
+    aggregateCompositions : bool
+        Flag signalling to write volume-averaged compositions over all
+        burnable materials, rather than compositions in each material
+    checkpointInterval : int
+        Non-negative interval of coarse steps at which the state of the
+        simulation is written to a checkpoint file in :attr:`basedir`,
+        following the high-fidelity solution. Zero disables
+        checkpoints. See :meth:`hydep.lib.Integrator.integrate`
+    trackMemory : bool
+        Flag signalling to record the peak resident memory, including
+        child processes, in each phase of the simulation, and the
+        size of the largest arrays. See
+        :class:`hydep.internal.MemoryTracker`
 
     Examples
     --------
@@ -345,6 +383,10 @@ class Settings:
     _ALLOWED_BC = frozenset({"reflective", "periodic", "vacuum"})
     numFittingPoints = BoundedTyped("_numFittingPoints", int, gt=0)
     useTempDir = TypedAttr("_useTempDir", bool)
+    compositionInterval = BoundedTyped("_compositionInterval", int, ge=0)
+    aggregateCompositions = TypedAttr("_aggregateCompositions", bool)
+    checkpointInterval = BoundedTyped("_checkpointInterval", int, ge=0)
+    trackMemory = TypedAttr("_trackMemory", bool)
 
     def __init__(
         self,
@@ -355,6 +397,11 @@ class Settings:
         basedir: OptFile = None,
         rundir: OptFile = None,
         useTempDir: typing.Optional[bool] = False,
+        compositionInterval: typing.Optional[int] = 1,
+        compositionIsotopes: typing.Optional[typing.Iterable[str]] = None,
+        aggregateCompositions: typing.Optional[bool] = False,
+        checkpointInterval: typing.Optional[int] = 0,
+        trackMemory: typing.Optional[bool] = False,
     ):
         self.depletionSolver = depletionSolver
         if boundaryConditions is None:
@@ -366,6 +413,11 @@ class Settings:
         self.basedir = basedir or pathlib.Path.cwd()
         self.rundir = rundir
         self.useTempDir = useTempDir
+        self.compositionInterval = compositionInterval
+        self.compositionIsotopes = compositionIsotopes
+        self.aggregateCompositions = aggregateCompositions
+        self.checkpointInterval = checkpointInterval
+        self.trackMemory = trackMemory
 
     def __getattr__(self, name):
         klass = _CONFIG_CLASSES.get(name)
@@ -453,6 +505,27 @@ class Settings:
         else:
             self._rundir = None
 
+    @property
+    def compositionIsotopes(self) -> typing.Optional[typing.Tuple[str, ...]]:
+        return self._compositionIsotopes
+
+    @compositionIsotopes.setter
+    def compositionIsotopes(self, names):
+        if names is None:
+            self._compositionIsotopes = None
+            return
+        if isinstance(names, str):
+            names = names.replace(",", " ").split()
+        names = tuple(names)
+        for name in names:
+            if not isinstance(name, str):
+                raise TypeError(
+                    f"Composition isotopes must be strings, not {type(name)}"
+                )
+        if not names:
+            raise ValueError("Need at least one composition isotope, or None")
+        self._compositionIsotopes = names
+
     def updateAll(self, options):
         """Update settings for this instance and any subsections
 
@@ -524,6 +597,15 @@ class Settings:
         * ``"basedir"`` : path-like - update :attr:`basedir`
         * ``"rundir"`` : path-like - update :attr:`rundir`
         * ``"use temp dir"`` : boolean - update :attr:`useTempDir`
+        * ``"composition interval"`` : int - update
+          :attr:`compositionInterval`
+        * ``"composition isotopes"`` : string or iterable of string
+          - update :attr:`compositionIsotopes`
+        * ``"aggregate compositions"`` : boolean - update
+          :attr:`aggregateCompositions`
+        * ``"checkpoint interval"`` : int - update
+          :attr:`checkpointInterval`
+        * ``"track memory"`` : boolean - update :attr:`trackMemory`
 
         Parameters
         ----------
@@ -550,6 +632,13 @@ class Settings:
         rundir = options.pop("rundir", False)
         tempdir = options.pop("use temp dir", None)
 
+        # Composition output
+        compInterval = options.pop("composition interval", None)
+        compIsotopes = options.pop("composition isotopes", None)
+        aggregate = options.pop("aggregate compositions", None)
+        checkpoint = options.pop("checkpoint interval", None)
+        trackMemory = options.pop("track memory", None)
+
         if options:
             raise ValueError(
                 f"Not all {self.name} setting processed. The following did not "
@@ -584,6 +673,30 @@ class Settings:
         if tempdir is not None:
             self.useTempDir = asBool("use temp dir", tempdir)
 
+        if compInterval is not None:
+            compInterval = asInt("composition interval", compInterval)
+            if compInterval < 0:
+                raise ValueError(
+                    f"composition interval must be non-negative, not {compInterval}"
+                )
+            self.compositionInterval = compInterval
+        if compIsotopes is not None:
+            if isinstance(compIsotopes, str) and compIsotopes.lower() == "none":
+                self.compositionIsotopes = None
+            else:
+                self.compositionIsotopes = compIsotopes
+        if aggregate is not None:
+            self.aggregateCompositions = asBool("aggregate compositions", aggregate)
+        if checkpoint is not None:
+            checkpoint = asInt("checkpoint interval", checkpoint)
+            if checkpoint < 0:
+                raise ValueError(
+                    f"checkpoint interval must be non-negative, not {checkpoint}"
+                )
+            self.checkpointInterval = checkpoint
+        if trackMemory is not None:
+            self.trackMemory = asBool("track memory", trackMemory)
+
     def validate(self):
         """Validate settings"""
         if self.fittingOrder > self.numFittingPoints:
@@ -712,12 +825,89 @@ class SerpentSettings(SubSetting, sectionName="serpent"):
         product of :attr:`generationsPerBatch` and :attr:`fspInactiveBatches`,
         if provided. Instructs Serpent to activate fission source passing
         using ``set fsp``. The fission source will be passed between
-        transport steps. Value cannot be negative, and a value of
+        transport steps. For :class:`hydep.serpent.SerpentSolver`, where
+        each transport solution is a separate Serpent run, the converged
+        fission source is written to a file and used as the initial source
+        for the next solution. Value cannot be negative, and a value of
         ``None`` (default) will not activate this setting. A value of
         zero will run zero inactive cycles at subsequent transport solutions.
+    mdepThreshold : float or None
+        Atom density [#/b/cm] an isotope must reach in a burnable
+        material in order for microscopic cross sections to be requested
+        and processed for that material. Reactions for isotopes below
+        this threshold will reuse the most recent cross sections.
+        All reactions are requested at the first transport solution.
+        A value of ``None`` (default) requests all reactions for all
+        materials. Only applies to :class:`hydep.serpent.SerpentSolver`
+    keffUncertainty : float or None
+        Target absolute uncertainty on the multiplication factor. If
+        given, the number of particles per cycle for each transport
+        solution is scaled using the uncertainty of the previous
+        solution. Only applies to :class:`hydep.serpent.SerpentSolver`
+    fluxUncertainty : float or None
+        Target maximum relative uncertainty on the flux in burnable
+        materials. Used like :attr:`keffUncertainty`, and the larger
+        of the two requested particle counts is used if both are given
+    minParticles : int or None
+        Lower bound on particles per cycle when scheduling with
+        :attr:`keffUncertainty` or :attr:`fluxUncertainty`
+    maxParticles : int or None
+        Upper bound on particles per cycle when scheduling with
+        :attr:`keffUncertainty` or :attr:`fluxUncertainty`
+    particleRelaxation : float
+        Factor applied to :attr:`keffUncertainty` and
+        :attr:`fluxUncertainty` at the first transport solution,
+        decreasing geometrically to one at the final solution. Values
+        above one use fewer particles for preliminary steps and more
+        near end of life. Default is one, constant targets
+    trimFraction : float or None
+        Fraction of the total importance in each burnable material
+        that may be omitted from Serpent inputs. The least important
+        isotopes are omitted until their summed importance would exceed
+        this fraction. Compositions tracked by ``hydep`` are not
+        modified. A value of ``None`` (default) disables trimming.
+        Only applies to :class:`hydep.serpent.SerpentSolver`
+    trimMode : str, {"absorption", "density"}
+        Measure of isotope importance when trimming with
+        :attr:`trimFraction`. ``"absorption"`` uses the product of
+        atom density and the microscopic absorption cross section,
+        fission plus neutron disappearance reactions like (n,gamma),
+        from the most recent transport solution, falling back to
+        ``"density"`` if cross sections are not available.
+        ``"density"`` uses atom densities. Default is ``"absorption"``
+    cacheDir : pathlib.Path or None
+        Directory of cached transport results. Results are stored
+        under a hash of the written Serpent inputs, and restored in
+        place of running Serpent if an identical input is solved
+        again. A value of ``None`` (default) disables caching. Only
+        applies to :class:`hydep.serpent.SerpentSolver`
+    cacheSize : float
+        Maximum size [MB] of :attr:`cacheDir`. The least recently used
+        results are removed to stay within this limit. Default is 1024
 
     """
 
+    mdepThreshold = BoundedTyped(
+        "_mdepThreshold", numbers.Real, ge=0.0, allowNone=True
+    )
+    keffUncertainty = BoundedTyped(
+        "_keffUncertainty", numbers.Real, gt=0.0, allowNone=True
+    )
+    fluxUncertainty = BoundedTyped(
+        "_fluxUncertainty", numbers.Real, gt=0.0, allowNone=True
+    )
+    minParticles = BoundedTyped(
+        "_minParticles", numbers.Integral, gt=0, allowNone=True
+    )
+    maxParticles = BoundedTyped(
+        "_maxParticles", numbers.Integral, gt=0, allowNone=True
+    )
+    particleRelaxation = BoundedTyped("_particleRelaxation", numbers.Real, ge=1.0)
+    trimFraction = BoundedTyped(
+        "_trimFraction", numbers.Real, ge=0.0, lt=1.0, allowNone=True
+    )
+    cacheSize = BoundedTyped("_cacheSize", numbers.Real, gt=0.0)
+
     def __init__(
         self,
         # Writer settings
@@ -739,6 +929,16 @@ class SerpentSettings(SubSetting, sectionName="serpent"):
         fpyMode: typing.Optional[str] = "constant",
         constantFPYSpectrum: typing.Optional[str] = "thermal",
         fspInactiveBatches: OptIntegral = None,
+        mdepThreshold: OptReal = None,
+        keffUncertainty: OptReal = None,
+        fluxUncertainty: OptReal = None,
+        minParticles: OptIntegral = None,
+        maxParticles: OptIntegral = None,
+        particleRelaxation: float = 1.0,
+        trimFraction: OptReal = None,
+        trimMode: str = "absorption",
+        cacheDir: OptFile = None,
+        cacheSize: float = 1024,
     ):
         if datadir is None:
             datadir = os.environ.get("SERPENT_DATA") or None
@@ -762,6 +962,16 @@ class SerpentSettings(SubSetting, sectionName="serpent"):
         self.fpyMode = fpyMode
         self.constantFPYSpectrum = constantFPYSpectrum
         self.fspInactiveBatches = fspInactiveBatches
+        self.mdepThreshold = mdepThreshold
+        self.keffUncertainty = keffUncertainty
+        self.fluxUncertainty = fluxUncertainty
+        self.minParticles = minParticles
+        self.maxParticles = maxParticles
+        self.particleRelaxation = particleRelaxation
+        self.trimFraction = trimFraction
+        self.trimMode = trimMode
+        self.cacheDir = cacheDir
+        self.cacheSize = cacheSize
 
     @property
     def datadir(self) -> PossiblePath:
@@ -946,6 +1156,33 @@ class SerpentSettings(SubSetting, sectionName="serpent"):
         enforceInt("mpi", value, True)
         self._mpi = value
 
+    @property
+    def cacheDir(self) -> PossiblePath:
+        return self._cacheDir
+
+    @cacheDir.setter
+    def cacheDir(self, d: OptFile):
+        if d is None:
+            self._cacheDir = None
+            return
+        d = makeAbsPath(d)
+        if d.exists() and not d.is_dir():
+            raise NotADirectoryError(d)
+        self._cacheDir = d
+
+    @property
+    def trimMode(self) -> str:
+        return self._trimMode
+
+    @trimMode.setter
+    def trimMode(self, mode: str):
+        opts = {"absorption", "density"}
+        if not isinstance(mode, str):
+            raise TypeError(f"Trim mode must be string, not {type(mode)}")
+        elif mode not in opts:
+            raise ValueError(f"Trim mode must be one of {opts}, not {mode}")
+        self._trimMode = mode
+
     @property
     def fpyMode(self) -> str:
         return self._fpyMode
@@ -1015,6 +1252,16 @@ class SerpentSettings(SubSetting, sectionName="serpent"):
         * ``"fpy mode"`` -> :attr:`fpyMode`
         * ``"fpy spectrum"`` -> :attr:`constantFPYSpectrum`
         * ``"fsp inactive batches"`` -> :attr:`fspInactiveBatches`
+        * ``"mdep threshold"`` -> :attr:`mdepThreshold`
+        * ``"keff uncertainty"`` -> :attr:`keffUncertainty`
+        * ``"flux uncertainty"`` -> :attr:`fluxUncertainty`
+        * ``"min particles"`` -> :attr:`minParticles`
+        * ``"max particles"`` -> :attr:`maxParticles`
+        * ``"particle relaxation"`` -> :attr:`particleRelaxation`
+        * ``"trim fraction"`` -> :attr:`trimFraction`
+        * ``"trim mode"`` -> :attr:`trimMode`
+        * ``"cache dir"`` -> :attr:`cacheDir`
+        * ``"cache size"`` -> :attr:`cacheSize`
 
         Parameters
         ----------
@@ -1048,6 +1295,16 @@ class SerpentSettings(SubSetting, sectionName="serpent"):
         fpyMode = options.pop("fpy mode", None)
         fpySpectrum = options.pop("fpy spectrum", None)
         fspInactiveBatches = options.pop("fsp inactive batches", None)
+        mdepThreshold = options.pop("mdep threshold", False)
+        keffUncertainty = options.pop("keff uncertainty", None)
+        fluxUncertainty = options.pop("flux uncertainty", None)
+        minParticles = options.pop("min particles", None)
+        maxParticles = options.pop("max particles", None)
+        particleRelaxation = options.pop("particle relaxation", None)
+        trimFraction = options.pop("trim fraction", False)
+        trimMode = options.pop("trim mode", None)
+        cacheDir = options.pop("cache dir", False)
+        cacheSize = options.pop("cache size", None)
 
         if options:
             remain = ", ".join(sorted(options))
@@ -1151,6 +1408,77 @@ class SerpentSettings(SubSetting, sectionName="serpent"):
         if fspInactiveBatches is not None:
             self.fspInactiveBatches = asInt("fsp inactive batches", fspInactiveBatches)
 
+        if mdepThreshold is not False:
+            if mdepThreshold is None or (
+                isinstance(mdepThreshold, str) and mdepThreshold.lower() == "none"
+            ):
+                self.mdepThreshold = None
+            else:
+                try:
+                    value = float(mdepThreshold)
+                except ValueError as ve:
+                    raise TypeError(
+                        f"Failed to coerce mdep threshold={mdepThreshold} to float"
+                    ) from ve
+                self.mdepThreshold = value
+
+        for value, dest in [
+            [keffUncertainty, "keffUncertainty"],
+            [fluxUncertainty, "fluxUncertainty"],
+            [particleRelaxation, "particleRelaxation"],
+        ]:
+            if value is None:
+                continue
+            try:
+                coerced = float(value)
+            except ValueError as ve:
+                raise TypeError(
+                    f"Failed to coerce {dest}={value} to float"
+                ) from ve
+            setattr(self, dest, coerced)
+
+        for value, dest in [
+            [minParticles, "minParticles"],
+            [maxParticles, "maxParticles"],
+        ]:
+            if value is None:
+                continue
+            setattr(self, dest, asPositiveInt(dest, value))
+
+        if trimFraction is not False:
+            if trimFraction is None or (
+                isinstance(trimFraction, str) and trimFraction.lower() == "none"
+            ):
+                self.trimFraction = None
+            else:
+                try:
+                    value = float(trimFraction)
+                except ValueError as ve:
+                    raise TypeError(
+                        f"Failed to coerce trim fraction={trimFraction} to float"
+                    ) from ve
+                self.trimFraction = value
+
+        if trimMode is not None:
+            self.trimMode = trimMode.strip().lower()
+
+        if cacheDir is not False:
+            if cacheDir is None or (
+                isinstance(cacheDir, str) and cacheDir.lower() == "none"
+            ):
+                self.cacheDir = None
+            else:
+                self.cacheDir = cacheDir
+
+        if cacheSize is not None:
+            try:
+                value = float(cacheSize)
+            except ValueError as ve:
+                raise TypeError(
+                    f"Failed to coerce cache size={cacheSize} to float"
+                ) from ve
+            self.cacheSize = value
+
 
 class SfvSettings(SubSetting, sectionName="sfv"):
     """Configuration for the SFV solver
@@ -19,6 +19,7 @@ from hydep.constants import (
 )
 from hydep.lib import ReducedOrderSolver
 from hydep.internal import TransportResult, TimeTraveler
+from hydep.internal.timing import timed
 import hydep.internal.features as hdfeat
 from .lib import predict_spatial_flux, getAdjFwdEig
 
@@ -302,6 +303,53 @@ class SfvSolver(ReducedOrderSolver):
         nubar = [m["nubar"][0] for m in txresult.macroXS]
         self._nubar.push(timestep.currentTime, nubar)
 
+    def checkpoint(self):
+        """Return fission matrix moments, macroscopic data, and nubar history
+
+        Returns
+        -------
+        dict
+            State following the most recent :meth:`processBOS`
+
+        """
+        return {
+            "forwardMoments": self._forwardMoments,
+            "adjointMoments": self._adjointMoments,
+            "eigenvalues": self._eigenvalues,
+            "macroData": self._macroData,
+            "keff0": self._keff0,
+            "currentPower": self._currentPower,
+            "nubar": self._nubar,
+        }
+
+    def restore(self, state):
+        """Restore the state from :meth:`checkpoint` after :meth:`beforeMain`
+
+        Parameters
+        ----------
+        state : dict
+            State from a previous call to :meth:`checkpoint`
+
+        Raises
+        ------
+        ValueError
+            If the stored data are not consistent with the current
+            burnable materials
+
+        """
+        if state["macroData"].shape != self._macroData.shape:
+            raise ValueError(
+                f"Checkpoint has data for {state['macroData'].shape[0]} regions, "
+                f"expected {self._macroData.shape[0]}"
+            )
+        self._forwardMoments = state["forwardMoments"]
+        self._adjointMoments = state["adjointMoments"]
+        self._eigenvalues = state["eigenvalues"]
+        self._macroData = state["macroData"]
+        self._keff0 = state["keff0"]
+        self._currentPower = state["currentPower"]
+        self._nubar = state["nubar"]
+
     def _bosProcessFmtx(self, txresult, timestep):
         try:
             adj, fwd, eig = getAdjFwdEig(txresult.fmtx, self.numModes)
@@ -355,7 +403,8 @@ class SfvSolver(ReducedOrderSolver):
             meaningless multiplication factor
 
         """
-        self._updateMacroFromMicroXs(compositions, microxs)
+        with timed("sfv.reconstruct"):
+            self._updateMacroFromMicroXs(compositions, microxs)
         self._macroData[:, DataIndexes.NUBAR] = self._nubar.at(timestep.currentTime)
 
         start = time.time()
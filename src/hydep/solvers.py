@@ -63,6 +63,38 @@ class TransportSolver(ABC):
 
         """
 
+    def checkpoint(self):
+        """Return the state needed to resume a simulation
+
+        Called by :class:`hydep.lib.Integrator` when writing
+        checkpoints, following the high-fidelity solution and
+        :meth:`ReducedOrderSolver.processBOS`. The returned object
+        must be picklable, and will be passed to :meth:`restore`
+        after :meth:`beforeMain` when resuming. By default, no
+        state is saved.
+
+        Returns
+        -------
+        object
+            Any picklable object, or ``None`` if no state is needed
+
+        """
+        return None
+
+    def restore(self, state) -> None:
+        """Restore the state returned by :meth:`checkpoint`
+
+        Called after :meth:`beforeMain` when resuming a simulation.
+        By default, no actions are performed.
+
+        Parameters
+        ----------
+        state : object
+            Value returned from :meth:`checkpoint` in a previous
+            simulation
+
+        """
+
     def finalize(self, success) -> None:
         """All done, time to close up shop
 
@@ -3,16 +3,27 @@ Class for writting result data
 """
 
 from abc import ABC, abstractmethod
+import copy
+import functools
+import queue
+import threading
 import typing
 
-__all__ = ["BaseStore"]
+import numpy
+
+from hydep.internal import TransportResult
+
+__all__ = ["BaseStore", "AsyncStore"]
 
 
 class BaseStore(ABC):
     """Abstract base class for storing data after transport and depletion"""
 
     @abstractmethod
-    def beforeMain(self, nhf, ntransport, ngroups, isotopes, burnableIndexes) -> None:
+    def beforeMain(
+        self, nhf, ntransport, ngroups, isotopes, burnableIndexes,
+        compositionSteps=None,
+    ) -> None:
         """Called before main simulation sequence
 
         Parameters
@@ -35,6 +46,15 @@ class BaseStore(ABC):
             Each item is a 3-tuple of material id, name, and volume.
             Entries are ordered consistent to how the material are ordered
             are used across the sequence
+        compositionSteps : sequence of int, optional
+            Sorted indices of the time steps, consistent with
+            :attr:`hydep.internal.TimeStep.total`, where
+            :meth:`writeCompositions` will be called. Only passed if
+            compositions are not written at every time step, e.g. from
+            :attr:`hydep.Settings.compositionInterval`. Compositions
+            may then also be restricted to a subset of isotopes, or
+            aggregated into a single material, consistent with
+            ``isotopes`` and ``burnableIndexes``
 
         """
 
@@ -74,3 +94,313 @@ class BaseStore(ABC):
             :meth:`beforeMain`
 
         """
+
+    def flush(self) -> None:
+        """Write any buffered data
+
+        Called before the :class:`hydep.lib.Integrator` writes a
+        checkpoint, so all results up to the checkpoint are stored.
+        Default implementation does nothing.
+        """
+
+    def writeTimings(self, timings) -> None:
+        """Store the time spent in each phase of the simulation
+
+        Called by :class:`hydep.lib.Integrator` prior to
+        :meth:`finalize`, successful or not. Default implementation
+        does nothing.
+
+        Parameters
+        ----------
+        timings : dict of str to numpy.ndarray
+            Times for each phase from
+            :meth:`hydep.internal.PhaseTimer.toArrays`. Each value has
+            one row per time step that recorded the phase, with columns
+            of time step index, wall time [s], CPU time [s], and the
+            number of times the phase was recorded
+
+        """
+
+    def writeMemory(self, phases, arrays) -> None:
+        """Store the peak memory of each phase and size of large arrays
+
+        Called by :class:`hydep.lib.Integrator` prior to
+        :meth:`finalize` if :attr:`hydep.Settings.trackMemory` is
+        true. Default implementation does nothing.
+
+        Parameters
+        ----------
+        phases : dict of str to numpy.ndarray
+            Peak memory of each phase from
+            :meth:`hydep.internal.PhaseTimer.peakMemory`. Each value
+            has one row per time step, with columns of time step
+            index and peak memory [bytes]
+        arrays : dict of str to numpy.ndarray
+            Largest size of each tracked array from
+            :meth:`hydep.internal.PhaseTimer.largestArrays`, with
+            the same layout as ``phases``
+
+        """
+
+    def finalize(self, success) -> None:
+        """Called after the main sequence, successful or not
+
+        Stores that hold resources, like open files or buffered
+        data, should write any pending data and release them here.
+        Default implementation does nothing.
+
+        Parameters
+        ----------
+        success : bool
+            ``True`` if the simulation completed without error
+
+        """
+
+
+class AsyncStore(BaseStore):
+    """Forward results to another store from a background thread
+
+    Arguments to :meth:`postTransport` and :meth:`writeCompositions`
+    are copied and placed on a bounded queue. Only the quantities
+    written by stores are copied from transport results, so large
+    and possibly shared data like fission yields and microscopic
+    cross sections are not duplicated. A dedicated writer thread
+    passes them, in order, to the wrapped store. If the queue is full,
+    calls block until the writer catches up, limiting memory use.
+
+    Exceptions raised by the wrapped store are re-raised by every
+    subsequent call to this store, including :meth:`flush` and
+    :meth:`finalize`. Items submitted or queued after a failure are
+    discarded, but the wrapped store is always finalized.
+
+    Parameters
+    ----------
+    store : hydep.lib.BaseStore
+        Store that will perform the writing
+    maxPending : int, optional
+        Maximum number of queued calls before blocking. Default: 4
+
+    Attributes
+    ----------
+    store : hydep.lib.BaseStore
+        Store that performs the writing
+    maxPending : int
+        Maximum number of queued calls before blocking
+
+    """
+
+    def __init__(self, store, maxPending=4):
+        if not isinstance(store, BaseStore):
+            raise TypeError(f"Expected BaseStore, not {type(store)}")
+        if isinstance(store, AsyncStore):
+            raise TypeError("Refusing to nest asynchronous stores")
+        if int(maxPending) < 1:
+            raise ValueError(f"maxPending must be positive, not {maxPending}")
+        self.store = store
+        self.maxPending = int(maxPending)
+        self._queue = queue.Queue(maxsize=self.maxPending)
+        self._thread = None
+        self._error = None
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                method, args, always = item
+                if always or self._error is None:
+                    method(*args)
+            except BaseException as ee:
+                if self._error is None:
+                    self._error = ee
+            finally:
+                self._queue.task_done()
+
+    def _raiseError(self):
+        # Failure is kept until finalize so queued items are discarded
+        if self._error is not None:
+            raise self._error
+
+    def _submit(self, method, *args):
+        self._raiseError()
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._work, name="hydep-store", daemon=True
+            )
+            self._thread.start()
+        self._queue.put((method, args, False))
+
+    def beforeMain(
+        self, nhf, ntransport, ngroups, isotopes, burnableIndexes,
+        compositionSteps=None,
+    ):
+        """Queue the setup of the wrapped store
+
+        Parameters
+        ----------
+        nhf : int
+            Number of high-fidelity transport solutions
+        ntransport : int
+            Number of total transport solutions
+        ngroups : int
+            Number of energy groups
+        isotopes : tuple of hydep.internal.Isotope
+            Isotopes used in the depletion chain
+        burnableIndexes : iterable of [int, str, float]
+            Each item is a 3-tuple of material id, name, and volume.
+        compositionSteps : sequence of int, optional
+            Indices of time steps where compositions will be written.
+            Only forwarded to the wrapped store if given
+
+        """
+        method = self.store.beforeMain
+        if compositionSteps is not None:
+            method = functools.partial(
+                method, compositionSteps=tuple(compositionSteps)
+            )
+        self._submit(
+            method,
+            nhf,
+            ntransport,
+            ngroups,
+            tuple(isotopes),
+            [tuple(b) for b in burnableIndexes],
+        )
+
+    def postTransport(self, timeStep, transportResult) -> None:
+        """Queue a copy of transport results for writing
+
+        Only the flux, multiplication factor, fission matrix, flux
+        uncertainty, particles, and run time are copied and passed
+        to the wrapped store
+
+        Parameters
+        ----------
+        timeStep : hydep.internal.TimeStep
+            Point in calendar time from where these results were
+            generated
+        transportResult : hydep.internal.TransportResult
+            Collection of data to be written
+
+        """
+        fmtx = transportResult.fmtx
+        unc = transportResult.fluxUncertainty
+        result = TransportResult(
+            numpy.array(transportResult.flux),
+            transportResult.keff,
+            runTime=transportResult.runTime,
+            fmtx=None if fmtx is None else fmtx.copy(),
+            particles=transportResult.particles,
+            fluxUncertainty=None if unc is None else numpy.array(unc),
+        )
+        self._submit(self.store.postTransport, copy.copy(timeStep), result)
+
+    def writeCompositions(self, timeStep, compBundle) -> None:
+        """Queue a copy of compositions for writing
+
+        Parameters
+        ----------
+        timeStep : hydep.internal.TimeStep
+            Point in calendar time that corresponds to the
+            compositions
+        compBundle : hydep.internal.CompBundle
+            New compositions
+
+        """
+        self._submit(
+            self.store.writeCompositions,
+            copy.copy(timeStep),
+            compBundle._replace(densities=numpy.array(compBundle.densities)),
+        )
+
+    def flush(self) -> None:
+        """Block until all queued items have been written
+
+        The wrapped store is then flushed from the writer thread, so
+        any data it buffers are also written.
+
+        Raises
+        ------
+        Exception
+            Any error raised by the wrapped store
+
+        """
+        self._raiseError()
+        if self._thread is None:
+            self.store.flush()
+            return
+        self._queue.put((self.store.flush, (), False))
+        self._queue.join()
+        self._raiseError()
+
+    def writeTimings(self, timings) -> None:
+        """Queue the phase timings for the wrapped store
+
+        Unlike other methods, errors from previous writes are not
+        raised here but by the following call to :meth:`finalize`
+
+        Parameters
+        ----------
+        timings : dict of str to numpy.ndarray
+            Times for each phase
+
+        """
+        if self._thread is None:
+            self.store.writeTimings(timings)
+            return
+        self._queue.put((self.store.writeTimings, (timings, ), False))
+
+    def writeMemory(self, phases, arrays) -> None:
+        """Queue the peak memory and array sizes for the wrapped store
+
+        Errors from previous writes are not raised here, following
+        :meth:`writeTimings`
+
+        Parameters
+        ----------
+        phases : dict of str to numpy.ndarray
+            Peak memory of each phase
+        arrays : dict of str to numpy.ndarray
+            Largest size of each tracked array
+
+        """
+        if self._thread is None:
+            self.store.writeMemory(phases, arrays)
+            return
+        self._queue.put((self.store.writeMemory, (phases, arrays), False))
+
+    def finalize(self, success) -> None:
+        """Write all queued items, finalize the wrapped store, and stop
+
+        Parameters
+        ----------
+        success : bool
+            ``True`` if the simulation completed without error
+
+        Raises
+        ------
+        Exception
+            Any error raised by the wrapped store
+
+        """
+        if self._thread is not None:
+            self._queue.put((self.store.finalize, (success, ), True))
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        else:
+            try:
+                self.store.finalize(success)
+            except BaseException as ee:
+                if self._error is None:
+                    self._error = ee
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        self.finalize(exc_type is None)
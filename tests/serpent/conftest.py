@@ -18,6 +18,14 @@ hdserpent = pytest.importorskip("hydep.serpent")
 from hydep.serpent.utils import Library
 
 
+@pytest.fixture(autouse=True)
+def xsdataCacheDir(tmp_path_factory, monkeypatch):
+    """Keep cached cross section indexes out of the user cache"""
+    cachedir = tmp_path_factory.getbasetemp() / "hydep-cache"
+    monkeypatch.setenv("HYDEP_CACHE_DIR", str(cachedir))
+    return cachedir
+
+
 @pytest.fixture(params=[hydep.serpent.SerpentWriter, hydep.serpent.ExtDepWriter])
 def writer(request):
     return request.param()
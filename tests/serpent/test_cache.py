@@ -0,0 +1,116 @@
+import os
+from unittest.mock import Mock
+
+import numpy
+import pytest
+import hydep.internal.features as hdfeat
+from hydep.internal import TransportResult, TimeStep
+hdserpent = pytest.importorskip("hydep.serpent")
+from hydep.serpent.cache import ResultCache
+
+
+def writeInputs(directory, coarse, power=1e4):
+    directory.mkdir(parents=True, exist_ok=True)
+    base = directory / "serpent-base.sss"
+    base.write_text("set pop 1000 20 10\nmat water -1.0\n1001.09c 2\n8016.09c 1\n")
+    steadystate = directory / f"serpent-s{coarse}"
+    steadystate.write_text(
+        f"""/*
+ * Steady state input file
+ * Time step : {coarse}
+ * Base file : {base}
+ */
+include "{base}"
+set power {power:.7E}
+set csw "{steadystate}.src"
+mat fuel -10.0 burn 1
+92235.09c 1
+"""
+    )
+    return steadystate
+
+
+@pytest.mark.serpent
+def test_cacheKeys(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    first = writeInputs(tmp_path / "first", 0)
+
+    key = cache.key(first, fluxErrors=False)
+    # Comments and locations of included files do not change the key
+    assert cache.key(writeInputs(tmp_path / "second", 0), fluxErrors=False) == key
+    assert cache.key(first, fluxErrors=True) != key
+    assert cache.key(writeInputs(tmp_path / "third", 0, 2e4), fluxErrors=False) != key
+
+    # Included file contents are hashed
+    base = tmp_path / "first" / "serpent-base.sss"
+    base.write_text(base.read_text().replace("1000", "2000"))
+    assert cache.key(first, fluxErrors=False) != key
+
+
+@pytest.mark.serpent
+def test_cacheEviction(tmp_path):
+    cache = ResultCache(tmp_path / "cache", maxBytes=2**20)
+    source = tmp_path / "fsrc"
+    source.write_bytes(b"source")
+
+    assert cache.get("missing") == (None, None)
+    assert cache.misses == 1
+
+    cache.put("a", TransportResult(numpy.ones((1, 1)), [1.0, 1e-5]), files=[source])
+    result, files = cache.get("a")
+    assert result.flux == pytest.approx(numpy.ones((1, 1)))
+    assert files == {"fsrc": b"source"}
+    assert cache.hits == 1
+
+    # Keep only the most recently used of two, similarly sized results
+    big = numpy.ones((200, 200))
+    for key in ("old", "new"):
+        path = cache.directory / f"{key}.pkl"
+        cache.put(key, TransportResult(big, [1.0, 1e-5]))
+    stamp = (cache.directory / "new.pkl").stat().st_mtime_ns
+    os.utime(cache.directory / "old.pkl", ns=(stamp - 10**9, stamp - 10**9))
+    os.utime(cache.directory / "a.pkl", ns=(stamp - 2 * 10**9, stamp - 2 * 10**9))
+
+    cache.maxBytes = path.stat().st_size + 10
+    cache.evict()
+    assert sorted(p.name for p in cache.directory.iterdir()) == ["new.pkl"]
+    assert cache.size == path.stat().st_size
+
+    # Unreadable results are removed
+    (cache.directory / "bad.pkl").write_bytes(b"not a pickle")
+    assert cache.get("bad") == (None, None)
+    assert not (cache.directory / "bad.pkl").exists()
+
+
+@pytest.mark.serpent
+def test_solverCache(tmp_path):
+    fluxes = numpy.array([[10.0], [20.0]])
+
+    def solve(directory):
+        solver = hdserpent.SerpentSolver()
+        solver.setHooks(hdfeat.FeatureCollection({hdfeat.FISSION_YIELDS}))
+        solver._volumes = numpy.ones((2, 1))
+        solver.cache = ResultCache(tmp_path / "cache")
+        solver._cacheOptions = {}
+        solver._writer = Mock(sourcefile=None, activeIsotopes=None)
+        solver._writer.writeSteadyStateFile.side_effect = (
+            lambda *args, **kwargs: writeInputs(directory, 0)
+        )
+        solver._runner = Mock()
+        solver._process = Mock(
+            return_value=TransportResult(fluxes, [1.0, 1e-5], fissionYields=[{}] * 2)
+        )
+        res = solver.bosSolve(None, TimeStep(), 1e4)
+        return solver, res
+
+    first, res = solve(tmp_path / "first")
+    first.runner.assert_called_once()
+    first._process.assert_called_once()
+    assert first.cache.misses == 1
+
+    second, cached = solve(tmp_path / "second")
+    second.runner.assert_not_called()
+    second._process.assert_not_called()
+    assert second.cache.hits == 1
+    assert cached.flux == pytest.approx(res.flux)
+    assert cached.keff == pytest.approx(res.keff)
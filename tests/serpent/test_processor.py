@@ -0,0 +1,130 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+import numpy
+import pytest
+from hydep.internal import (
+    Isotope, FissionYieldDistribution, FissionYieldBank, XsIndex,
+)
+from hydep.constants import CM2_PER_BARN
+from hydep.serpent.processor import (
+    SerpentProcessor, WeightedFPYHelper, ConstantFPYHelper, READERS,
+)
+
+
+@pytest.fixture
+def fpyIsotopes():
+    u235 = Isotope("U235", 92, 235, 0)
+    u235.fissionYields = FissionYieldDistribution(
+        {
+            0.0253: {531350: 0.06, 541350: 0.002},
+            5e5: {531350: 0.05, 541350: 0.004, 551370: 0.06},
+            1.4e7: {531350: 0.04, 541350: 0.006, 551370: 0.05},
+        }
+    )
+    u238 = Isotope("U238", 92, 238, 0)
+    u238.fissionYields = FissionYieldDistribution(
+        {5e5: {531350: 0.07, 541350: 0.003}}
+    )
+    return u235, u238
+
+
+@pytest.mark.serpent
+def test_weightedFPYHelper(fpyIsotopes):
+    u235, u238 = fpyIsotopes
+    helper = WeightedFPYHelper(["1", "2"], fpyIsotopes)
+
+    tallies = numpy.array([[1.0, 3.0], [2.0, 0.0], [1.0, 1.0]])
+    detector = Mock()
+    detector.name = f"fy{u235.zai}"
+    detector.indexes = ("energy", "universe")
+    detector.tallies = tallies
+
+    fpy = helper.collapseYieldsFromDetectors([detector])
+    assert isinstance(fpy, FissionYieldBank)
+    assert len(fpy) == 2
+    assert not fpy.shared
+
+    for matindex, matyields in enumerate(fpy):
+        weights = tallies[:, matindex] / tallies[:, matindex].sum()
+        expected = sum(
+            w * row for w, row in zip(weights, u235.fissionYields.yield_matrix)
+        )
+        actual = matyields[u235.zai]
+        assert actual.products == u235.fissionYields.products
+        assert actual.yields == pytest.approx(expected)
+        for prod, value in matyields[u238.zai].items():
+            assert value == u238.fissionYields.at(0).get(prod, 0.0)
+
+
+@pytest.mark.serpent
+def test_constantFPYHelper(fpyIsotopes):
+    u235, u238 = fpyIsotopes
+    helper = ConstantFPYHelper(["1", "2", "3"], fpyIsotopes, "fast")
+
+    fpy = helper.collapseYieldsFromDetectors()
+    assert isinstance(fpy, FissionYieldBank)
+    assert fpy.shared
+    assert len(fpy) == 3
+    assert numpy.shares_memory(fpy[0].matrix, fpy[2].matrix)
+
+    for matyields in fpy:
+        assert matyields[u235.zai][551370] == pytest.approx(0.05)
+        assert matyields[u238.zai][531350] == pytest.approx(0.07)
+
+
+@pytest.mark.serpent
+def test_activeMicroXS():
+    index = XsIndex([922350, 922380], [18, 102, 102], [0, 2, 3])
+    microxs = {
+        "1": {(922350, 18, 0): 500.0, (922350, 102, 0): 80.0},
+        "2": {(922380, 102, 0): 2.0},
+    }
+    processor = SerpentProcessor(["1", "2"], index)
+
+    with patch.object(processor, "read", return_value=Mock(xsVal=microxs)):
+        full = processor.processMicroXS("mdx")
+        processor.activeIsotopes = ({922350}, {922380})
+        active = processor.processMicroXS("mdx")
+
+    assert full.data == pytest.approx(
+        numpy.array([[500, 80, 0], [0, 0, 2]]) * CM2_PER_BARN
+    )
+    assert active.data[0, :2] == pytest.approx(full.data[0, :2])
+    assert numpy.isnan(active.data[0, 2])
+    assert numpy.isnan(active.data[1, :2]).all()
+    assert active.data[1, 2] == pytest.approx(full.data[1, 2])
+
+
+@pytest.mark.serpent
+def test_readLocked():
+    processor = SerpentProcessor()
+    # Both detector files must be parsing at the same time to pass
+    barrier = threading.Barrier(2, timeout=5)
+    parsed = []
+
+    class Reader:
+        def __init__(self, filePath):
+            assert SerpentProcessor._rcLock.locked()
+            self.filePath = filePath
+
+        def read(self):
+            if self.filePath.endswith("_res.m"):
+                assert SerpentProcessor._rcLock.locked()
+            else:
+                barrier.wait()
+            parsed.append(self.filePath)
+
+    with patch.dict(READERS, {"det": Reader, "results": Reader}):
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [
+                pool.submit(processor.read, f"base_det{i}.m", "det")
+                for i in range(2)
+            ]
+            readers = [f.result() for f in futures]
+        assert processor.read("base_res.m", "results").filePath == "base_res.m"
+
+    assert [r.filePath for r in readers] == ["base_det0.m", "base_det1.m"]
+    assert sorted(parsed) == ["base_det0.m", "base_det1.m", "base_res.m"]
+    assert not SerpentProcessor._rcLock.locked()
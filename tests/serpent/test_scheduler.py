@@ -0,0 +1,73 @@
+import numpy
+import pytest
+from hydep.internal import TransportResult
+from hydep.settings import SerpentSettings
+from hydep.serpent import ParticleScheduler
+
+
+def test_particleScheduler():
+    assert ParticleScheduler.fromSettings(SerpentSettings(particles=100)) is None
+
+    with pytest.raises(ValueError):
+        ParticleScheduler(100)
+    with pytest.raises(ValueError):
+        ParticleScheduler(100, keffTarget=1e-4, minParticles=10, maxParticles=5)
+
+    scheduler = ParticleScheduler.fromSettings(
+        SerpentSettings(
+            particles=1000, keffUncertainty=1e-4, fluxUncertainty=0.01,
+            maxParticles=8000,
+        )
+    )
+    assert scheduler.particles == 1000
+
+    flux = numpy.ones((2, 1))
+    # Twice the target uncertainty -> four times the particles
+    result = TransportResult(flux, [1.0, 2e-4], fluxUncertainty=[0.01, 0.005])
+    assert scheduler.update(result) == 4000
+
+    # Flux uncertainty controls
+    result = TransportResult(
+        flux, [1.0, 1e-4], particles=4000, fluxUncertainty=[0.005, 0.015]
+    )
+    # 9000 particles needed, limited by maximum
+    assert scheduler.update(result) == 8000
+
+    # Fewer particles needed
+    result = TransportResult(flux, [1.0, 5e-5], particles=8000)
+    assert scheduler.update(result) == 2000
+
+    # No usable uncertainties -> unchanged
+    result = TransportResult(flux, [1.0, numpy.nan])
+    scheduler.fluxTarget = None
+    assert scheduler.update(result) == 2000
+
+
+def test_relaxedSchedule():
+    with pytest.raises(ValueError):
+        ParticleScheduler(100, keffTarget=1e-4, relaxation=0.5)
+
+    scheduler = ParticleScheduler.fromSettings(
+        SerpentSettings(
+            particles=4000, keffUncertainty=1e-4, particleRelaxation=2.0,
+            minParticles=500,
+        ),
+        nsolutions=3,
+    )
+    # Targets doubled at first solution, so a quarter of the particles
+    assert scheduler.particles == 1000
+    assert scheduler.relaxationAt(0) == pytest.approx(2.0)
+    assert scheduler.relaxationAt(1) == pytest.approx(2 ** 0.5)
+    assert scheduler.relaxationAt(2) == pytest.approx(1.0)
+    assert scheduler.relaxationAt(None) == 1.0
+
+    flux = numpy.ones((1, 1))
+    # Met the relaxed target exactly, tighter targets need more particles
+    result = TransportResult(flux, [1.0, 2e-4], particles=1000)
+    assert scheduler.update(result, nextIndex=1) == pytest.approx(2000, abs=1)
+    result = TransportResult(flux, [1.0, 2 ** 0.5 * 1e-4], particles=2000)
+    assert scheduler.update(result, nextIndex=2) == pytest.approx(4000, abs=1)
+
+    # Bounds are respected when setting particles directly
+    assert scheduler.setParticles(10) == 500
+    assert scheduler.particles == 500
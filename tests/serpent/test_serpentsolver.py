@@ -0,0 +1,74 @@
+from unittest.mock import Mock
+
+import numpy
+from scipy.sparse import csr_matrix
+import pytest
+import hydep.internal.features as hdfeat
+from hydep.serpent import SerpentSolver
+from hydep.serpent.processor import ResTuple
+
+
+@pytest.mark.serpent
+def test_concurrentProcess():
+    NMATS = 2
+    volumes = numpy.array([[2.0], [4.0]])
+    fluxes = numpy.array([[10.0], [20.0]])
+    keff = numpy.array([1.1, 1e-4])
+    macroXS = [{"abs": 1.0}, {"abs": 2.0}]
+    fmtx = csr_matrix(numpy.eye(NMATS))
+    fyields = [{}] * NMATS
+
+    processor = Mock()
+    processor.processDetectorFluxes.return_value = fluxes
+    processor.processResult.return_value = ResTuple(keff, macroXS)
+    processor.processFmtx.return_value = fmtx
+    processor.processFissionYields.return_value = fyields
+
+    solver = SerpentSolver()
+    solver._processor = processor
+    solver._volumes = volumes
+    solver.setHooks(hdfeat.FeatureCollection(
+        {hdfeat.FISSION_MATRIX, hdfeat.FISSION_YIELDS}, {"abs"}))
+
+    res = solver._process("base", index=1)
+
+    processor.processDetectorFluxes.assert_called_once_with("base_det1.m", "flux")
+    processor.processResult.assert_called_once_with(
+        "base_res.m", frozenset({"abs"}), index=1)
+    processor.processFmtx.assert_called_once_with("base_fmtx1.m")
+    processor.processFissionYields.assert_called_once_with("base_det1.m")
+    processor.getKeff.assert_not_called()
+    processor.processMicroXS.assert_not_called()
+
+    assert res.flux == pytest.approx(fluxes / volumes)
+    assert res.keff == pytest.approx(keff)
+    assert res.macroXS == macroXS
+    assert (res.fmtx != fmtx).nnz == 0
+    assert res.fissionYields is fyields
+
+    # Failures in any parser are raised
+    processor.processFmtx.side_effect = ValueError("bad fmtx")
+    with pytest.raises(ValueError, match="bad fmtx"):
+        solver._process("base", index=1)
+
+
+@pytest.mark.serpent
+def test_processFluxErrors():
+    volumes = numpy.array([[2.0], [4.0]])
+    fluxes = numpy.array([[10.0], [20.0]])
+    errors = numpy.array([[0.01], [0.02]])
+
+    processor = Mock()
+    processor.processDetectorFluxes.return_value = fluxes, errors
+    processor.getKeff.return_value = numpy.array([1.0, 1e-4])
+
+    solver = SerpentSolver()
+    solver._processor = processor
+    solver._volumes = volumes
+    solver.setHooks(hdfeat.FeatureCollection())
+
+    res = solver._process("base", fluxErrors=True)
+    processor.processDetectorFluxes.assert_called_once_with(
+        "base_det0.m", "flux", errors=True)
+    assert res.flux == pytest.approx(fluxes / volumes)
+    assert res.fluxUncertainty == pytest.approx(errors)
@@ -162,3 +162,24 @@ def test_update(cleanEnviron, mockSerpentData, useDataDir, allStrings, onHydep):
     assert serpent.k0 == 1.2
     assert serpent.fpyMode == "weighted"
     assert serpent.fspInactiveBatches == 5
+
+
+@pytest.mark.serpent
+@pytest.mark.parametrize(
+    "key, bad",
+    (
+        ("keff uncertainty", "-0.1"),
+        ("flux uncertainty", "-0.1"),
+        ("particle relaxation", "0.5"),
+        ("mdep threshold", "-1e-20"),
+        ("trim fraction", "1.5"),
+        ("cache size", "0"),
+    ),
+)
+def test_updateFloats(cleanEnviron, key, bad):
+    serpent = SerpentSettings()
+    # Out of range values are not reported as failed conversions
+    with pytest.raises(ValueError):
+        serpent.update({key: bad})
+    with pytest.raises(TypeError):
+        serpent.update({key: "one"})
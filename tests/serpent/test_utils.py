@@ -3,7 +3,13 @@ import pathlib
 from unittest.mock import patch
 
 import pytest
-from hydep.serpent.utils import Library, findLibraries, findProblemIsotopes
+from hydep.serpent.utils import (
+    Library,
+    findLibraries,
+    findProblemIsotopes,
+    XsdataIndex,
+    getXsdataIndex,
+)
 
 
 def _testDataLib(fileMap, referenceFiles):
@@ -72,3 +78,31 @@ def test_problemIsotopes(fakeXsDataStream):
     p = findProblemIsotopes(fakeXsDataStream, ((95, 242, 0), bad))
     assert not p.replacements
     assert p.missing == set((bad,))
+
+
+def test_xsdataIndex(tmp_path, fakeXsDataStream):
+    candidates = ((95, 242, 0), (95, 242, 1), (1, 200, 0))
+    reference = findProblemIsotopes(fakeXsDataStream, candidates)
+
+    xsfile = tmp_path / "fake.xsdata"
+    xsfile.write_text(fakeXsDataStream.getvalue())
+    cachedir = tmp_path / "cache"
+
+    index = getXsdataIndex(xsfile, cachedir)
+    assert index.suffixes[(95, 242, 1)] == ("03c", )
+    assert index.findProblemIsotopes(candidates) == reference
+    assert len(list(cachedir.glob("xsdata-*.json"))) == 1
+
+    # Second look up uses the cache, rather than reading the file
+    with patch.object(XsdataIndex, "fromStream") as parser:
+        cached = getXsdataIndex(xsfile, cachedir)
+    parser.assert_not_called()
+    assert cached.zais == index.zais
+    assert cached.suffixes == index.suffixes
+
+    # Modifying the file invalidates the cache
+    xsfile.write_text(
+        "\n".join(l for l in fakeXsDataStream.getvalue().split("\n") if "95342" not in l)
+    )
+    updated = getXsdataIndex(xsfile, cachedir)
+    assert (95, 242, 1) not in updated.zais
@@ -35,3 +35,52 @@ def test_write2x2(serpentcfg, write2x2Model, simpleChain):
 
     output.unlink()
     failfile.unlink()
+
+
+@pytest.mark.serpent
+def test_sourceReuse(tmp_path, serpentcfg, write2x2Model, simpleChain):
+    from hydep.internal import TimeStep, compBundleFromMaterials
+
+    burnable = tuple(write2x2Model.root.findBurnableMaterials())
+    writer = hydep.serpent.SerpentWriter()
+    writer.burnable = burnable
+    writer.model = write2x2Model
+    writer.writeBaseFile(tmp_path / "base", serpentcfg, simpleChain)
+
+    comp = compBundleFromMaterials(burnable)
+
+    first = writer.writeSteadyStateFile(tmp_path / "s0", comp, TimeStep(), 1e4)
+    content = first.read_text()
+    source = (tmp_path / "s0.src").resolve()
+    assert writer.sourcefile == source
+    assert f'set csw "{source}"' in content
+    assert " sf " not in content
+
+    # Source not written by Serpent -> flat start
+    writer.writeSteadyStateFile(tmp_path / "s1", comp, TimeStep(), 1e4)
+    source = writer.sourcefile
+    source.write_bytes(b"")
+
+    final = writer.writeSteadyStateFile(
+        tmp_path / "s2", comp, TimeStep(), 1e4, final=True
+    )
+    content = final.read_text()
+    assert f'src hydepfsrc sf "{source}" 1' in content
+    # One fsp batch of five generations
+    assert "set pop 200 25 5 1.00000 % 5" in content
+    assert writer.sourcefile == (tmp_path / "s2.src").resolve()
+
+    # Scheduled particles without a previous source
+    writer.sourcefile = None
+    content = writer.writeSteadyStateFile(
+        tmp_path / "s3", comp, TimeStep(), 1e4, particles=400).read_text()
+    assert "set pop 400 25 10 1.00000 % 5" in content
+
+    # Disabled by default
+    serpentcfg.serpent.fspInactiveBatches = None
+    writer.writeBaseFile(tmp_path / "base", serpentcfg, simpleChain)
+    content = writer.writeSteadyStateFile(
+        tmp_path / "s4", comp, TimeStep(), 1e4).read_text()
+    assert "set csw" not in content
+    assert "set pop" not in content
+    assert writer.sourcefile is None
@@ -1,5 +1,6 @@
 import io
 import pathlib
+from unittest.mock import patch
 
 import numpy
 import pytest
@@ -161,6 +162,165 @@ def test_writeSteadyStateFile(tmp_path, beavrsMaterials):
     testfile.unlink()
 
 
+@pytest.mark.serpent
+def test_cachedSteadyStateMaterials(tmp_path, beavrsMaterials):
+    fuel = beavrsMaterials["fuel32"]
+    comp = compBundleFromMaterials((fuel,))
+
+    writer = hydep.serpent.SerpentWriter()
+    writer.burnable = (fuel,)
+    writer.base = tmp_path / "base"
+    writer.cacheMaterials = True
+
+    first = writer.writeSteadyStateFile(tmp_path / "s0", comp, TimeStep(), 1e4)
+    matfile = (tmp_path / "serpent-bumat0").resolve()
+    assert f'include "{matfile}"' in first.read_text()
+    assert matfile.read_text() == REF_FUEL.split("\n", 1)[1]
+
+    # Unchanged compositions -> material file is not rewritten
+    matfile.write_text("untouched")
+    writer.writeSteadyStateFile(tmp_path / "s1", comp, TimeStep(), 1e4)
+    assert matfile.read_text() == "untouched"
+
+    # Updated compositions and final step force a rewrite
+    comp.densities[0, 0] *= 2
+    writer.writeSteadyStateFile(tmp_path / "s2", comp, TimeStep(), 1e4, final=True)
+    content = matfile.read_text()
+    assert "burn 1" not in content
+    assert f"8016.09c {comp.densities[0, 0]:13.9E}" in content
+
+
+@pytest.mark.serpent
+def test_steadyStateHooks(tmp_path, beavrsMaterials):
+    import hydep.internal.features as hdfeat
+
+    fuel = beavrsMaterials["fuel32"]
+    comp = compBundleFromMaterials((fuel,))
+
+    writer = hydep.serpent.SerpentWriter()
+    writer.burnable = (fuel,)
+    writer.base = tmp_path / "base"
+    writer.hooks = hdfeat.FeatureCollection(
+        {hdfeat.FISSION_MATRIX, hdfeat.HOMOG_LOCAL, hdfeat.FISSION_YIELDS}, {"abs"}
+    )
+    writer.fpyDetectors = ["det fy922350 de fyenergies922350 dr 18 fy922350"]
+
+    bos = writer.writeSteadyStateFile(tmp_path / "bos", comp, TimeStep(), 1e4)
+    content = bos.read_text()
+    assert f"set fmtx 2 {fuel.id}" in content
+    assert f"set gcu {fuel.id}" in content
+    assert writer.fpyDetectors[0] in content
+
+    eol = writer.writeSteadyStateFile(
+        tmp_path / "eol", comp, TimeStep(), 1e4, final=True
+    )
+    content = eol.read_text()
+    for card in ["set fmtx", "set gcu", "det fy", "set mdep", "burn 1"]:
+        assert card not in content
+
+
+@pytest.mark.serpent
+def test_activeMdep(tmp_path, beavrsMaterials):
+    import hydep.internal.features as hdfeat
+    from hydep.internal import XsIndex
+
+    fuel = beavrsMaterials["fuel32"]
+    comp = compBundleFromMaterials((fuel,))
+    # U234 below threshold, O17 at threshold
+    comp.densities[0] = [1e-2, 1e-5, 1e-8, 1e-3, 1e-2]
+
+    writer = hydep.serpent.SerpentWriter()
+    writer.burnable = (fuel,)
+    writer.base = tmp_path / "base"
+    writer.hooks = hdfeat.FeatureCollection({hdfeat.MICRO_REACTION_XS})
+    writer._reactionIndex = XsIndex(
+        [80160, 80170, 922340, 922350, 922380],
+        [102, 102, 102, 18, 102],
+        [0, 1, 2, 3, 4, 5],
+    )
+
+    content = writer.writeSteadyStateFile(
+        tmp_path / "all", comp, TimeStep(), 1e4).read_text()
+    assert writer.activeIsotopes is None
+    assert "922340 102" in content
+
+    writer.mdepThreshold = 1e-5
+    # All reactions are requested in the first file with a threshold
+    content = writer.writeSteadyStateFile(
+        tmp_path / "first", comp, TimeStep(), 1e4).read_text()
+    assert writer.activeIsotopes == (
+        frozenset({80160, 80170, 922340, 922350, 922380}),
+    )
+    assert "922340 102" in content
+
+    content = writer.writeSteadyStateFile(
+        tmp_path / "active", comp, TimeStep(), 1e4).read_text()
+    assert writer.activeIsotopes == (
+        frozenset({80160, 80170, 922350, 922380}),
+    )
+    assert f"set mdep {fuel.id} 1.0 1 {fuel.id}" in content
+    assert "922340 102" not in content
+    for line in ["80160 102", "80170 102", "922350 18", "922380 102"]:
+        assert line in content
+
+
+@pytest.mark.serpent
+def test_trimmedMaterials(tmp_path, beavrsMaterials, caplog):
+    from hydep.internal import XsIndex, MaterialDataArray
+
+    fuel = beavrsMaterials["fuel32"]
+    comp = compBundleFromMaterials((fuel,))
+    # O16, O17, U234, U235, U238
+    comp.densities[0] = [4e-2, 2e-6, 1e-6, 1e-3, 2e-2]
+
+    writer = hydep.serpent.SerpentWriter()
+    writer.burnable = (fuel,)
+    writer.base = tmp_path / "base"
+    writer.trimFraction = 1e-4
+    writer.trimMode = "density"
+
+    content = writer.writeSteadyStateFile(
+        tmp_path / "density", comp, TimeStep(), 1e4).read_text()
+    for name in ["8017.09c", "92234.09c"]:
+        assert name not in content
+    for name in ["8016.09c", "92235.09c", "92238.09c"]:
+        assert name in content
+    assert writer.lumpedDensities == pytest.approx([3e-6])
+    # Full compositions are not modified
+    assert comp.densities[0, 1] == 2e-6
+
+    # Without cross sections, absorption falls back to density
+    writer.trimMode = "absorption"
+    content = writer.writeSteadyStateFile(
+        tmp_path / "fallback", comp, TimeStep(), 1e4).read_text()
+    assert "92234.09c" not in content
+
+    # Large capture cross section for U234 keeps it
+    index = XsIndex([80160, 922340, 922350], [102, 102, 18], [0, 1, 2, 3])
+    writer.microXS = MaterialDataArray(index, numpy.array([[1e-4, 1e2, 5e2]]))
+    content = writer.writeSteadyStateFile(
+        tmp_path / "absorption", comp, TimeStep(), 1e4).read_text()
+    assert "92234.09c" in content
+    assert "8017.09c" not in content
+    assert writer.lumpedDensities == pytest.approx([2e-6])
+
+    # Neutron producing reactions, like (n,2n), are not absorption
+    index = XsIndex([80160, 922340, 922350], [102, 16, 18], [0, 1, 2, 3])
+    writer.microXS = MaterialDataArray(index, numpy.array([[1e-4, 1e2, 5e2]]))
+    with caplog.at_level("INFO", logger="hydep.serpent"):
+        content = writer.writeSteadyStateFile(
+            tmp_path / "n2n", comp, TimeStep(), 1e4).read_text()
+    assert "92234.09c" not in content
+    assert writer.lumpedDensities == pytest.approx([3e-6])
+    assert "Omitted atom density" in caplog.text
+
+    writer.trimFraction = None
+    content = writer.writeSteadyStateFile(
+        tmp_path / "full", comp, TimeStep(), 1e4).read_text()
+    assert "8017.09c" in content
+    assert writer.lumpedDensities is None
+
+
 @pytest.mark.serpent
 def test_filteredMaterials(tmp_path, fakeXsDataStream):
     xsdataf = tmp_path / "fake.xsdata"
@@ -309,3 +469,143 @@ def test_sab(mockSAB, writer):
     fake = pathlib.Path("fakesab")
     with pytest.raises(FileNotFoundError, match=".*fakesab"):
         writer._findSABTables([], fake)
+
+
+def _readRestart(path):
+    """Reference parser for the external depletion restart file"""
+    import struct
+
+    materials = {}
+    with path.open("rb") as stream:
+        buf = stream.read(struct.calcsize("l"))
+        while buf:
+            (namelen,) = struct.unpack("l", buf)
+            name = stream.read(namelen)
+            bu, days = struct.unpack("2d", stream.read(struct.calcsize("2d")))
+            nnucs, adens, mdens, matbu = struct.unpack(
+                "l3d", stream.read(struct.calcsize("l3d"))
+            )
+            nucs = list(struct.iter_unpack("ld", stream.read(nnucs * 16)))
+            materials[name] = (days, adens, mdens, nucs)
+            buf = stream.read(struct.calcsize("l"))
+    return materials
+
+
+def _writeRestart(path, materials):
+    import struct
+
+    with path.open("wb") as stream:
+        for name, (adens, mdens, nucs) in materials.items():
+            stream.write(struct.pack("l", len(name)))
+            stream.write(name)
+            stream.write(struct.pack("2d", 0, 0))
+            stream.write(struct.pack("l3d", len(nucs), adens, mdens, 0))
+            for z, a in nucs:
+                stream.write(struct.pack("ld", z, a))
+
+
+@pytest.mark.serpent
+def test_extDepRestart(tmp_path):
+    from hydep.constants import SECONDS_PER_DAY
+    from hydep.internal import getIsotope
+
+    fuel1 = hydep.BurnableMaterial("f1", mdens=10, U235=1e-3, U238=2e-2)
+    fuel2 = hydep.BurnableMaterial("f2", mdens=10, U235=2e-3, U238=2e-2)
+
+    writer = hydep.serpent.ExtDepWriter()
+    writer.burnable = (fuel1, fuel2)
+    writer.compFile = tmp_path / "restart.exdep"
+
+    names = [str(m.id).encode() for m in (fuel1, fuel2)]
+    _writeRestart(
+        writer.compFile,
+        {
+            names[0]: (0.021, 9.5, [(922350, 1e-3), (922380, 2e-2)]),
+            names[1]: (0.022, 9.6, [(922350, 2e-3), (922380, 2e-2)]),
+        },
+    )
+    writer.updateFromRestart()
+    assert writer._names[names[0]] == {"adens": 0.021, "mdens": 9.5}
+    assert writer._names[names[1]] == {"adens": 0.022, "mdens": 9.6}
+
+    isotopes = tuple(getIsotope(name=n) for n in ("U235", "U238", "Xe135"))
+    densities = numpy.array([[1e-3, 2e-2, 1e-8], [2e-3, 3e-2, 2e-8]])
+    step = TimeStep(1, 1, 1, 2 * SECONDS_PER_DAY)
+
+    def check(densities, day):
+        written = _readRestart(writer.compFile)
+        for name, matdens in zip(names, densities):
+            days, adens, mdens, nucs = written[name]
+            assert days == day
+            assert adens == pytest.approx(matdens[:2].sum())
+            assert mdens == writer._names[name]["mdens"]
+            # Xe135 not loaded by Serpent -> lumped into placeholder
+            assert nucs == [(-1, matdens[2]), (922350, matdens[0]), (922380, matdens[1])]
+
+    writer.updateComps(CompBundle(isotopes, densities), step)
+    check(densities, 2)
+
+    # Same isotopes -> densities patched in place
+    densities *= 1.5
+    step.currentTime = 3 * SECONDS_PER_DAY
+    with patch.object(writer, "_writeComps") as full:
+        writer.updateComps(CompBundle(isotopes, densities), step)
+    full.assert_not_called()
+    check(densities, 3)
+
+    # Isotopes removed through threshold force a rewrite
+    writer.updateComps(CompBundle(isotopes, densities), step, threshold=2e-3)
+    written = _readRestart(writer.compFile)
+    assert written[names[0]][3] == [
+        (-1, densities[0, 0] + densities[0, 2]), (922380, densities[0, 1])
+    ]
+
+
+@pytest.mark.serpent
+def test_activeMdepInitialXS(tmp_path, beavrsMaterials):
+    """Isotopes starting at zero density have cross sections at step 0"""
+    from unittest.mock import Mock
+    import hydep.internal.features as hdfeat
+    from hydep.internal import XsIndex, DataBank
+    from hydep.serpent.processor import SerpentProcessor
+
+    fuel = beavrsMaterials["fuel32"]
+    comp = compBundleFromMaterials((fuel,))
+    # U234 absent from fresh fuel
+    comp.densities[0] = [1e-2, 1e-5, 0.0, 1e-3, 1e-2]
+    index = XsIndex(
+        [80160, 80170, 922340, 922350, 922380],
+        [102, 102, 102, 18, 102],
+        [0, 1, 2, 3, 4, 5],
+    )
+
+    writer = hydep.serpent.SerpentWriter()
+    writer.burnable = (fuel,)
+    writer.base = tmp_path / "base"
+    writer.hooks = hdfeat.FeatureCollection({hdfeat.MICRO_REACTION_XS})
+    writer._reactionIndex = index
+    writer.mdepThreshold = 1e-20
+
+    microxs = {
+        str(fuel.id): {
+            (80160, 102, 0): 1e-4, (80170, 102, 0): 1e-3,
+            (922340, 102, 0): 20.0, (922350, 18, 0): 500.0,
+            (922380, 102, 0): 2.0,
+        }
+    }
+    processor = SerpentProcessor([str(fuel.id)], index)
+    bank = DataBank(nsteps=2, nmaterials=1, rxnIndex=index)
+
+    for step in range(2):
+        writer.writeSteadyStateFile(tmp_path / f"s{step}", comp, TimeStep(), 1e4)
+        processor.activeIsotopes = writer.activeIsotopes
+        with patch.object(processor, "read", return_value=Mock(xsVal=microxs)):
+            bank.push(step, processor.processMicroXS("mdx"))
+
+    # U234 only requested in the first solution, and reused after
+    assert 922340 not in writer.activeIsotopes[0]
+    u234 = index(922340, 102)
+    for step in range(2):
+        assert bank.at(step).data[0, u234] == pytest.approx(
+            20.0 * hydep.constants.CM2_PER_BARN
+        )
@@ -0,0 +1,139 @@
+import threading
+
+import numpy
+import pytest
+from hydep.lib import BaseStore, AsyncStore
+from hydep.internal import TimeStep, TransportResult, CompBundle
+
+
+class RecordingStore(BaseStore):
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.fail = False
+
+    def beforeMain(self, nhf, ntransport, ngroups, isotopes, burnableIndexes):
+        self.calls.append(("beforeMain", nhf))
+
+    def postTransport(self, timeStep, transportResult):
+        self.gate.wait()
+        if self.fail:
+            raise ValueError("bad write")
+        self.calls.append(("postTransport", timeStep.total, transportResult.flux))
+
+    def writeCompositions(self, timeStep, compBundle):
+        self.calls.append(("writeCompositions", timeStep.total, compBundle.densities))
+
+    def flush(self):
+        self.calls.append(("flush", threading.current_thread().name))
+
+    def writeTimings(self, timings):
+        self.calls.append(("writeTimings", timings))
+
+    def finalize(self, success):
+        self.calls.append(("finalize", success))
+
+
+def test_asyncStore():
+    with pytest.raises(TypeError):
+        AsyncStore(object())
+
+    # Without a writer thread, the wrapped store is flushed directly
+    wrapped = RecordingStore()
+    AsyncStore(wrapped).flush()
+    assert wrapped.calls == [("flush", threading.current_thread().name)]
+
+    wrapped = RecordingStore()
+    store = AsyncStore(wrapped, maxPending=1)
+
+    store.beforeMain(2, 3, 1, (), [])
+
+    timestep = TimeStep()
+    result = TransportResult(numpy.ones((2, 1)), [1.0, 1e-5])
+    comps = CompBundle((), numpy.ones((2, 3)))
+
+    store.postTransport(timestep, result)
+    store.writeCompositions(timestep, comps)
+
+    # Payloads are copied, so later modifications are not written
+    timestep.increment(10)
+    result.flux[:] = 2
+    comps.densities[:] = 2
+    store.postTransport(timestep, result)
+    store.flush()
+
+    # Wrapped store is flushed on the writer thread after queued items
+    assert [c[0] for c in wrapped.calls] == [
+        "beforeMain", "postTransport", "writeCompositions", "postTransport",
+        "flush"]
+    assert wrapped.calls[-1][1] == "hydep-store"
+    assert wrapped.calls[1][1] == 0
+    assert wrapped.calls[1][2] == pytest.approx(1)
+    assert wrapped.calls[2][2] == pytest.approx(1)
+    assert wrapped.calls[3][1] == 1
+    assert wrapped.calls[3][2] == pytest.approx(2)
+
+    store.writeTimings({"store": numpy.zeros((1, 4))})
+    store.flush()
+    assert wrapped.calls[-2][0] == "writeTimings"
+    assert list(wrapped.calls[-2][1]) == ["store"]
+
+    # Backpressure: writer blocked on first item, second fills queue
+    wrapped.gate.clear()
+    store.postTransport(timestep, result)
+    store.postTransport(timestep, result)
+    blocked = threading.Thread(target=store.postTransport, args=(timestep, result))
+    blocked.start()
+    blocked.join(timeout=0.1)
+    assert blocked.is_alive()
+    wrapped.gate.set()
+    blocked.join()
+    store.flush()
+
+    # Failures are raised by every call until the wrapped store is
+    # finalized, and items queued after the failure are discarded
+    wrapped.fail = True
+    nCalls = len(wrapped.calls)
+    wrapped.gate.clear()
+    store.postTransport(timestep, result)
+    store.writeCompositions(timestep, comps)
+    wrapped.gate.set()
+    with pytest.raises(ValueError, match="bad write"):
+        store.flush()
+    with pytest.raises(ValueError, match="bad write"):
+        store.postTransport(timestep, result)
+    with pytest.raises(ValueError, match="bad write"):
+        store.finalize(False)
+    assert wrapped.calls[nCalls:] == [("finalize", False)]
+
+
+class ResultStore(RecordingStore):
+    def postTransport(self, timeStep, transportResult):
+        self.calls.append(transportResult)
+
+
+def test_asyncStoreCopies():
+    wrapped = ResultStore()
+    store = AsyncStore(wrapped)
+    yields = numpy.broadcast_to(numpy.ones(1000), (500, 1000))
+    result = TransportResult(
+        numpy.ones((2, 1)), [1.0, 1e-5], fissionYields=[{}] * 2,
+        fluxUncertainty=numpy.zeros((2, 1)), particles=100, runTime=1.0,
+    )
+    result.fmtx = numpy.eye(2)
+    # Shared, read-only data must not be expanded by the copy
+    result.fissionYields = [{922350: yields}] * 2
+
+    store.postTransport(TimeStep(), result)
+    store.finalize(True)
+    queued = wrapped.calls[0]
+
+    assert queued.fissionYields is None
+    assert queued.microXS is None
+    assert queued.flux is not result.flux
+    assert queued.flux == pytest.approx(result.flux)
+    assert queued.fluxUncertainty is not result.fluxUncertainty
+    assert queued.fmtx.toarray() == pytest.approx(numpy.eye(2))
+    assert queued.particles == 100
+    assert queued.runTime == 1.0
@@ -0,0 +1,67 @@
+import json
+
+import numpy
+import pytest
+h5py = pytest.importorskip("h5py")
+import hydep
+import hydep.hdf
+from hydep.catalog import ResultCatalog
+from hydep.internal import TimeStep, TransportResult, CompBundle
+
+DAYS = [0, 10, 20]
+N_MATS = 2
+
+
+def writeRun(dest, chain, keff, scale):
+    store = hydep.hdf.Store(filename=dest)
+    store.beforeMain(
+        len(DAYS), len(DAYS), 1, tuple(chain),
+        [(ix, f"mat {ix}", 1.0) for ix in range(N_MATS)],
+    )
+    for ix, day in enumerate(DAYS):
+        step = TimeStep(ix, None, ix, day * hydep.constants.SECONDS_PER_DAY)
+        store.postTransport(step, TransportResult(numpy.ones((N_MATS, 1)), [keff, 1e-5]))
+        densities = numpy.full((N_MATS, len(chain)), scale * (ix + 1))
+        store.writeCompositions(step, CompBundle(tuple(chain), densities))
+    store.finalize(True)
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_resultCatalog(tmp_path, simpleChain, processes):
+    (tmp_path / "sweep").mkdir()
+    writeRun(tmp_path / "a.h5", simpleChain, 1.0, 1.0)
+    writeRun(tmp_path / "sweep" / "b.h5", simpleChain, 1.1, 2.0)
+
+    catalog = ResultCatalog.build(tmp_path, processes=processes)
+    assert set(catalog) == {"a.h5", "sweep/b.h5"}
+    sidecar = tmp_path / ResultCatalog.SIDECAR
+    assert sidecar.is_file()
+
+    # Identical tables are shared
+    assert len(catalog.tables) == 2
+    assert catalog.isotopes("a.h5")["names"] == [iso.name for iso in simpleChain]
+    assert catalog.materials("sweep/b.h5")["names"] == ["mat 0", "mat 1"]
+    assert catalog["a.h5"]["days"] == pytest.approx(DAYS)
+    assert len(catalog["a.h5"]["checksum"]) == 64
+
+    keff = catalog.getKeff()
+    days, kb = keff["sweep/b.h5"]
+    assert days == pytest.approx(DAYS)
+    assert kb[:, 0] == pytest.approx(1.1)
+
+    u5 = catalog.getDensities(names="U235", days=20, processes=processes)
+    assert u5["a.h5"] == pytest.approx(3.0)
+    assert u5["sweep/b.h5"] == pytest.approx(6.0)
+
+    with pytest.raises(IndexError, match="a.h5"):
+        catalog.getDensities(names="U235", days=15)
+    with pytest.raises(ValueError, match="bad"):
+        catalog.getDensities(names="bad")
+
+    # Unchanged files are reused from the sidecar
+    data = json.loads(sidecar.read_text())
+    data["runs"]["a.h5"]["checksum"] = "reused"
+    sidecar.write_text(json.dumps(data))
+    catalog = ResultCatalog.build(tmp_path, processes=processes)
+    assert catalog["a.h5"]["checksum"] == "reused"
+    assert ResultCatalog.load(sidecar)["a.h5"]["checksum"] == "reused"
@@ -43,6 +43,7 @@ def test_u5(simpleChain):
     assert simpleChain.find(zai=(92, 235)) is u5
 
     assert u5.decayConstant == pytest.approx(math.log(2) / 2.22102e16)
+    assert u5.decayEnergy == pytest.approx(4619192.11)
     assert len(u5.reactions) == len(u5Reactions)
 
     for rxn in u5.reactions:
@@ -92,3 +93,39 @@ def test_xsindex(simpleChain):
         assert index.zais[start] == zai
         assert index[ix] == (zai, rxn)
         assert index(zai, rxn) == ix
+
+
+def test_bankedFormMatrix(simpleChain):
+    import numpy
+    from hydep.internal import MaterialDataArray, FissionYieldBank
+
+    index = simpleChain.reactionIndex
+    rates = MaterialDataArray(
+        index, numpy.linspace(1, 2, 2 * len(index)).reshape(2, len(index))
+    )
+
+    yields = {}
+    for isotope in simpleChain:
+        if isotope.fissionYields is not None:
+            yields[isotope.zai] = isotope.fissionYields.at(0)
+    assert yields
+
+    bank = FissionYieldBank.fromMapping(yields, len(rates))
+    ordering = {zai: ix for ix, zai in enumerate(simpleChain.zaiOrder)}
+
+    for matRates, matYields in zip(rates, bank):
+        reference = simpleChain.formMatrix(matRates, yields, ordering)
+        actual = simpleChain.formMatrix(matRates, matYields, ordering)
+        assert actual.toarray() == pytest.approx(reference.toarray())
+
+
+def test_bankReadOnly():
+    import numpy
+    from hydep.internal import FissionYieldBank
+
+    yields = numpy.ones((2, 1, 3))
+    bank = FissionYieldBank([922350], [531350, 541350, 551370], yields)
+    assert not bank.yields.flags.writeable
+    # Caller's array is not modified
+    assert yields.flags.writeable
+    yields[0] = 2
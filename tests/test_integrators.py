@@ -22,6 +22,7 @@ an adaptive RK4/5 are ``[A, B](5) = [0.0105478107949492 0.4873257599455337]``
 """
 
 import collections
+import unittest.mock
 import pathlib
 import math
 
@@ -115,14 +116,18 @@ SCHEMES = {
 }
 
 
-@pytest.fixture
-def model():
+def buildModel():
     mat = hydep.BurnableMaterial("analytic", adens=1.0, volume=1.0)
     mat["U235"] = 1.0
 
     return hydep.Model(hydep.InfiniteMaterial(mat))
 
 
+@pytest.fixture
+def model():
+    return buildModel()
+
+
 @pytest.fixture
 def manager(clearIsotopes):
     dep = hydep.Manager(buildDepletionChain(), [5 / SECONDS_PER_DAY], [1.0], [1])
@@ -161,3 +166,332 @@ def test_brave_integrators(recwarn, model, manager, scheme, brave):
         assert klass.__name__ in str(w.message)
     assert len(recwarn) == 0
     assert store.densities[-1] == pytest.approx([eosXe, eosU])
+
+
+class RecordingStore(AnalyticStore):
+    def __init__(self):
+        super().__init__()
+        self.setup = None
+        self.steps = []
+
+    def beforeMain(self, *args, **kwargs):
+        self.setup = args, kwargs
+
+    def writeCompositions(self, timestep, compBundle):
+        super().writeCompositions(timestep, compBundle)
+        self.steps.append(timestep.total)
+        self.isotopes = compBundle.isotopes
+
+
+@pytest.mark.parametrize("interval", [0, 1, 2])
+def test_compositionDecimation(model, clearIsotopes, interval):
+    dep = hydep.Manager(
+        buildDepletionChain(), [2 / SECONDS_PER_DAY, 3 / SECONDS_PER_DAY],
+        [1.0, 1.0], [4, 3],
+    )
+    store = RecordingStore()
+    solver = hydep.PredictorIntegrator(
+        model, AnalyticHFSolver(), AnalyticROSolver(), dep, store=store
+    )
+    solver.settings.compositionInterval = interval
+    solver.settings.compositionIsotopes = ["U235"]
+    solver.settings.aggregateCompositions = True
+
+    solver.integrate()
+
+    expected = {
+        0: [0, 4, 7],
+        1: list(range(8)),
+        2: [0, 2, 4, 6, 7],
+    }[interval]
+    assert store.steps == expected
+    args, kwargs = store.setup
+    if interval == 1:
+        assert "compositionSteps" not in kwargs
+    else:
+        assert kwargs["compositionSteps"] == expected
+    assert kwargs["ntransport"] == 8
+    assert [iso.name for iso in kwargs["isotopes"]] == ["U235"]
+    assert kwargs["burnableIndexes"] == [(-1, "aggregate", 1.0)]
+    assert [iso.name for iso in store.isotopes] == ["U235"]
+    assert all(len(d) == 1 for d in store.densities)
+
+
+def test_badCompositionIsotopes(model, manager):
+    solver = hydep.PredictorIntegrator(
+        model, AnalyticHFSolver(), AnalyticROSolver(), manager,
+        store=AnalyticStore(),
+    )
+    solver.settings.compositionIsotopes = ["Pu239"]
+    with pytest.raises(ValueError, match="Pu239"):
+        solver.integrate()
+
+
+class FailingHFSolver(AnalyticHFSolver):
+    """Count high-fidelity solutions, failing at a requested solution"""
+    def __init__(self, failAt=None):
+        self.failAt = failAt
+        self.calls = []
+
+    def bosSolve(self, compositions, timestep, power):
+        if self.failAt is not None and len(self.calls) == self.failAt:
+            raise RuntimeError("Simulated failure")
+        self.calls.append(timestep.coarse)
+        return super().bosSolve(compositions, timestep, power)
+
+
+def test_checkpointRestart(tmp_path, clearIsotopes):
+    def run(hf, restart=False):
+        dep = hydep.Manager(
+            buildDepletionChain(), [1 / SECONDS_PER_DAY, 2 / SECONDS_PER_DAY,
+                                    2 / SECONDS_PER_DAY],
+            [1.0, 1.0, 1.0], [2, 3, 2],
+        )
+        store = AnalyticStore()
+        solver = hydep.PredictorIntegrator(
+            buildModel(), hf, AnalyticROSolver(), dep, store=store
+        )
+        solver.settings.basedir = tmp_path
+        solver.settings.checkpointInterval = 1
+        solver.integrate(restart=restart)
+        return solver, store
+
+    reference = FailingHFSolver()
+    solver, refStore = run(reference)
+    assert reference.calls == [0, 1, 2, 3]
+    assert solver.checkpointFile.is_file()
+
+    # Fail during the third high-fidelity solution, resuming from the second
+    failing = FailingHFSolver(failAt=2)
+    with pytest.raises(RuntimeError, match="Simulated"):
+        run(failing)
+    assert failing.calls == [0, 1]
+
+    resumed = FailingHFSolver()
+    _solver, store = run(resumed, restart=True)
+    # Coarse step 1 is resumed from the checkpoint without a new solution
+    assert resumed.calls == [2, 3]
+    # Compositions following the start of coarse step 1 are rewritten
+    assert len(store.densities) == len(refStore.densities) - 3
+    for actual, expected in zip(store.densities, refStore.densities[3:]):
+        assert actual == pytest.approx(expected)
+
+
+class BufferedStore(AnalyticStore):
+    """Hold compositions in memory until flushed"""
+    def __init__(self):
+        super().__init__()
+        self.pending = []
+
+    def writeCompositions(self, _timestep, compBundle):
+        self.pending.append(compBundle.densities[0])
+
+    def flush(self):
+        self.densities.extend(self.pending)
+        self.pending.clear()
+
+    def finalize(self, success):
+        self.flush()
+
+
+def test_asyncCheckpoint(tmp_path, model, manager):
+    wrapped = BufferedStore()
+    solver = hydep.PredictorIntegrator(
+        model, AnalyticHFSolver(), AnalyticROSolver(), manager,
+        store=hydep.lib.AsyncStore(wrapped),
+    )
+    solver.settings.basedir = tmp_path
+    solver.settings.checkpointInterval = 1
+
+    replace = hydep._integrator.os.replace
+    written = []
+
+    def checkpoint(src, dest):
+        # All compositions so far are written by the wrapped store
+        written.append((len(wrapped.densities), len(wrapped.pending)))
+        replace(src, dest)
+
+    with unittest.mock.patch.object(hydep._integrator.os, "replace", checkpoint):
+        solver.integrate()
+
+    assert written
+    assert all(nWritten > 0 and nPending == 0 for nWritten, nPending in written)
+    assert solver.checkpointFile.is_file()
+
+
+def test_checkpointMismatch(tmp_path, model, manager):
+    solver = hydep.PredictorIntegrator(
+        model, AnalyticHFSolver(), AnalyticROSolver(), manager,
+        store=AnalyticStore(),
+    )
+    solver.settings.basedir = tmp_path
+    with pytest.raises(FileNotFoundError):
+        solver.integrate(restart=True)
+
+    solver.settings.checkpointInterval = 1
+    solver.integrate()
+
+    other = hydep.Manager(
+        buildDepletionChain(), [10 / SECONDS_PER_DAY], [1.0], [1]
+    )
+    solver = hydep.PredictorIntegrator(
+        buildModel(), AnalyticHFSolver(), AnalyticROSolver(), other,
+        store=AnalyticStore(),
+    )
+    solver.settings.basedir = tmp_path
+    with pytest.raises(ValueError, match="schedule"):
+        solver.integrate(restart=True)
+
+
+class TimingStore(AnalyticStore):
+    memory = None
+
+    def writeTimings(self, timings):
+        self.timings = timings
+
+    def writeMemory(self, phases, arrays):
+        self.memory = phases, arrays
+
+
+def test_phaseTimings(model, manager, caplog):
+    store = TimingStore()
+    solver = hydep.PredictorIntegrator(
+        model, AnalyticHFSolver(), AnalyticROSolver(), manager, store=store
+    )
+    with caplog.at_level("INFO", logger="hydep"):
+        solver.integrate()
+
+    expected = {
+        "beforeMain", "hf.solve", "ro.processBOS", "scheme", "store",
+        "deplete.matrix", "deplete.pool", "deplete.cram", "xs.extrapolate",
+    }
+    assert expected.issubset(store.timings)
+    # Single coarse step without substeps: BOS and EOL solutions
+    hf = store.timings["hf.solve"]
+    assert hf[:, 0].tolist() == [0, 1]
+    assert hf[:, 3].tolist() == [1, 1]
+    assert (hf[:, 1:3] >= 0).all()
+    assert store.timings["deplete.pool"][:, 3].tolist() == [2]
+    assert "deplete.cram" in caplog.text
+    assert store.memory is None
+
+
+
+class FailingTimingStore(AnalyticStore):
+    finalized = None
+
+    def writeTimings(self, timings):
+        raise OSError("disk full")
+
+    def finalize(self, success):
+        self.finalized = success
+
+
+def test_finalizeAfterTimingFailure(model, manager):
+    store = FailingTimingStore()
+    hf = AnalyticHFSolver()
+    ro = AnalyticROSolver()
+    solver = hydep.PredictorIntegrator(model, hf, ro, manager, store=store)
+
+    with unittest.mock.patch.object(hf, "finalize") as hfFinal, \
+            unittest.mock.patch.object(ro, "finalize") as roFinal:
+        with pytest.raises(OSError, match="disk full"):
+            solver.integrate()
+
+    assert store.finalized is True
+    hfFinal.assert_called_once_with(True)
+    roFinal.assert_called_once_with(True)
+    assert not solver._locked
+
+
+def test_trackMemory(model, manager, caplog):
+    store = TimingStore()
+    solver = hydep.PredictorIntegrator(
+        model, AnalyticHFSolver(), AnalyticROSolver(), manager, store=store
+    )
+    solver.settings.trackMemory = True
+    with caplog.at_level("INFO", logger="hydep"):
+        solver.integrate()
+
+    assert solver.timer.memory is None
+    phases, arrays = store.memory
+    assert {"hf.solve", "deplete.cram"}.issubset(phases)
+    assert phases["hf.solve"][:, 0].tolist() == [0, 1]
+    assert (phases["hf.solve"][:, 1] > 0).all()
+    # Initial and end of life compositions
+    comps = arrays["compositions"]
+    assert comps[:, 0].tolist() == [0, 1]
+    assert (comps[:, 1] > 0).all()
+    # Microscopic cross sections from both transport solutions
+    microXS = arrays["microXS"]
+    assert microXS[:, 0].tolist() == [0, 1]
+    assert microXS[:, 1].tolist() == [16, 16]
+    assert "Peak memory" in caplog.text
+
+
+def test_hooks(model, manager):
+    solver = hydep.PredictorIntegrator(
+        model, AnalyticHFSolver(), AnalyticROSolver(), manager,
+        store=AnalyticStore(),
+    )
+    events = []
+    asyncEvents = []
+
+    def record(event):
+        events.append((event.name, event.timestep.total))
+        for array in (
+            getattr(event.result, "flux", None),
+            getattr(event.compositions, "densities", None),
+        ):
+            if array is not None:
+                assert not array.flags.writeable
+
+    for name in hydep.internal.hooks.EVENTS:
+        solver.hooks.add(name, record)
+        solver.hooks.add(
+            name, lambda e: asyncEvents.append(e.name), asynchronous=True
+        )
+    solver.integrate()
+
+    assert events == [
+        ("after_store", 0),
+        ("before_hf_solve", 0),
+        ("after_transport", 0),
+        ("after_store", 0),
+        ("after_deplete", 1),
+        ("after_store", 1),
+        ("step_complete", 1),
+        ("before_hf_solve", 1),
+        ("after_transport", 1),
+        ("after_store", 1),
+        ("step_complete", 1),
+    ]
+    assert asyncEvents == [e[0] for e in events]
+
+    solver.hooks.remove("after_store", record)
+    with pytest.raises(ValueError):
+        solver.hooks.remove("after_store", record)
+    with pytest.raises(ValueError, match="Unknown event"):
+        solver.hooks.add("after_flux", record)
+
+
+class AbortError(Exception):
+    pass
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_hookAbort(model, manager, asynchronous):
+    store = AnalyticStore()
+    solver = hydep.PredictorIntegrator(
+        model, AnalyticHFSolver(), AnalyticROSolver(), manager, store=store
+    )
+
+    def abort(event):
+        raise AbortError(event.timestep)
+
+    solver.hooks.add("after_transport", abort, asynchronous=asynchronous)
+    with pytest.raises(AbortError):
+        solver.integrate()
+    if not asynchronous:
+        # Only initial compositions were written
+        assert len(store.densities) == 1
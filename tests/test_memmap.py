@@ -0,0 +1,119 @@
+import numpy
+import pytest
+import scipy.sparse
+import hydep
+from hydep.internal import TimeStep, TransportResult, CompBundle
+from hydep.memmap import MemmapStore, MemmapProcessor, toHdf
+
+N_GROUPS = 2
+N_BU_MATS = 3
+BU_INDEXES = [[x, f"mat {x}", 0.5 * (x + 1)] for x in range(N_BU_MATS)]
+STEPS = [
+    TimeStep(0, 0, 0, 0),
+    TimeStep(0, 1, 1, 2.5 * hydep.constants.SECONDS_PER_DAY),
+    TimeStep(1, 0, 2, 5 * hydep.constants.SECONDS_PER_DAY),
+]
+
+
+@pytest.fixture
+def memmapDestination(tmp_path, simpleChain):
+    rng = numpy.random.default_rng(seed=98765)
+    dest = tmp_path / "results"
+    store = MemmapStore(dest)
+    store.beforeMain(2, len(STEPS), N_GROUPS, tuple(simpleChain), BU_INDEXES)
+
+    written = []
+    for step in STEPS:
+        hf = not step.substep
+        result = TransportResult(
+            rng.random((N_BU_MATS, N_GROUPS)),
+            [1.0 + step.total * 0.01, 1e-4],
+            runTime=10.0,
+            fmtx=scipy.sparse.random(N_BU_MATS, N_BU_MATS, density=0.5, format="csr")
+            if hf else None,
+            particles=1000 * (step.total + 1) if hf else None,
+            fluxUncertainty=numpy.full((N_BU_MATS, N_GROUPS), 0.01) if hf else None,
+        )
+        comps = CompBundle(tuple(simpleChain), rng.random((N_BU_MATS, len(simpleChain))))
+        store.postTransport(step, result)
+        store.writeCompositions(step, comps)
+        written.append((result, comps))
+
+    assert store.lastWrittenStep == len(STEPS) - 1
+    store.finalize(True)
+    return dest, written
+
+
+def test_memmapStore(memmapDestination, simpleChain):
+    dest, written = memmapDestination
+    with pytest.raises(FileExistsError):
+        MemmapStore(dest, existOkay=False)
+
+    proc = MemmapProcessor(dest)
+    assert proc.nTotalSteps == len(STEPS)
+    assert proc.nCoarseSteps == 2
+    assert proc.nBurnableMats == N_BU_MATS
+    assert proc.nEnergyGroups == N_GROUPS
+    assert proc.nIsotopes == len(simpleChain)
+    assert proc.lastWrittenStep == len(STEPS) - 1
+    assert proc.names == tuple(iso.name for iso in simpleChain)
+    assert proc.materialNames == tuple(b[1] for b in BU_INDEXES)
+    assert proc.volumes == pytest.approx([b[2] for b in BU_INDEXES])
+    assert isinstance(proc.compositions, numpy.memmap)
+
+    days, keff = proc.getKeff()
+    assert days == pytest.approx([0, 5])
+    assert keff[:, 0] == pytest.approx([1.0, 1.02])
+    assert proc.getKeff(hfOnly=False)[0] == pytest.approx([0, 2.5, 5])
+    assert proc.particles.tolist() == [1000, 0, 3000]
+    assert numpy.isnan(proc.fluxUncertainty[1]).all()
+
+    for step, (result, comps) in zip(STEPS, written):
+        day = step.currentTime / hydep.constants.SECONDS_PER_DAY
+        assert proc.getFluxes(day) == pytest.approx(result.flux)
+        assert proc.getDensities(days=day) == pytest.approx(comps.densities)
+        if result.fmtx is None:
+            with pytest.raises(IndexError):
+                proc.getFissionMatrix(day)
+        else:
+            assert (proc.getFissionMatrix(day) != result.fmtx).nnz == 0
+
+    # Outer selections on several axes
+    names = [simpleChain[2].name, simpleChain[0].name]
+    expected = numpy.array([c.densities for _r, c in written])[
+        numpy.ix_([2, 0], [1, 2], [2, 0])
+    ]
+    actual = proc.getDensities(names=names, days=[5, 0], materials=[1, 2])
+    assert actual == pytest.approx(expected)
+    single = proc.getDensities(zais=simpleChain[0].zai, days=[5, 0], materials=[1, 2])
+    assert single == pytest.approx(expected[..., 1])
+    assert proc.getFluxes([0, 5], materials=1) == pytest.approx(
+        numpy.array([written[0][0].flux[1], written[2][0].flux[1]])
+    )
+
+    with pytest.raises(IndexError):
+        proc.getFluxes(1.0)
+    with pytest.raises(ValueError):
+        proc.getIsotopeIndexes(names="Bad1")
+
+
+def test_memmapToHdf(memmapDestination, tmp_path):
+    pytest.importorskip("h5py")
+    from hydep.hdf import Processor
+
+    dest, written = memmapDestination
+    mm = MemmapProcessor(dest)
+    h5file = toHdf(dest, tmp_path / "converted.h5")
+    assert h5file.is_file()
+
+    with Processor(h5file) as proc:
+        assert proc.days == pytest.approx(mm.days)
+        assert proc.keff[:] == pytest.approx(numpy.array(mm.keff))
+        assert proc.hfFlags[:].tolist() == mm.hfFlags.tolist()
+        assert proc.zais[:].tolist() == mm.zais.tolist()
+        assert proc.compositions[:] == pytest.approx(numpy.array(mm.compositions))
+        assert proc.fluxes[:] == pytest.approx(numpy.array(mm.fluxes))
+        assert proc.particles[:].tolist() == mm.particles.tolist()
+        for day in (0, 5):
+            expected = mm.getFissionMatrix(day)
+            assert (proc.getFissionMatrix(day) != expected).nnz == 0
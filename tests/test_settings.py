@@ -59,6 +59,42 @@ def test_settings():
         Settings(fittingOrder=2, numFittingPoints=1).validate()
 
 
+def test_compositionOutput():
+    settings = Settings()
+    assert settings.compositionInterval == 1
+    assert settings.compositionIsotopes is None
+    assert not settings.aggregateCompositions
+
+    settings.update(
+        {
+            "composition interval": "0",
+            "composition isotopes": "U235, Xe135 Pu239",
+            "aggregate compositions": "yes",
+        }
+    )
+    assert settings.compositionInterval == 0
+    assert settings.compositionIsotopes == ("U235", "Xe135", "Pu239")
+    assert settings.aggregateCompositions
+
+    assert settings.checkpointInterval == 0
+    settings.update({"checkpoint interval": "3"})
+    assert settings.checkpointInterval == 3
+
+    assert not settings.trackMemory
+    settings.update({"track memory": "yes"})
+    assert settings.trackMemory
+
+    settings.update({"composition isotopes": "none"})
+    assert settings.compositionIsotopes is None
+
+    with pytest.raises(ValueError):
+        settings.update({"composition interval": -1})
+    with pytest.raises(ValueError):
+        settings.compositionIsotopes = []
+    with pytest.raises(TypeError):
+        settings.compositionIsotopes = [922350]
+
+
 def test_subsettings():
     randomSection = "".join(random.sample(string.ascii_letters, 10))
     settings = Settings()
@@ -200,6 +236,11 @@ def test_exampleConfig(serpentdata):
     assert not settings.useTempDir
     assert settings.fittingOrder == 0
     assert settings.numFittingPoints == 2
+    assert settings.compositionInterval == 2
+    assert settings.compositionIsotopes is None
+    assert not settings.aggregateCompositions
+    assert settings.checkpointInterval == 1
+    assert settings.trackMemory
 
     serpent = settings.serpent
 
@@ -225,6 +266,16 @@ def test_exampleConfig(serpentdata):
     assert serpent.constantFPYSpectrum == "fast"
 
     assert serpent.fspInactiveBatches == 2
+    assert serpent.mdepThreshold == 1e-20
+    assert serpent.keffUncertainty == 5e-4
+    assert serpent.fluxUncertainty == 0.01
+    assert serpent.minParticles == int(1e6)
+    assert serpent.maxParticles == int(2e7)
+    assert serpent.particleRelaxation == 2.0
+    assert serpent.trimFraction == 1e-6
+    assert serpent.trimMode == "absorption"
+    assert serpent.cacheDir == pathlib.Path("example/cache").resolve()
+    assert serpent.cacheSize == 2048
 
     sfv = settings.sfv
     assert sfv.modes == 10
@@ -16,6 +16,7 @@ BU_INDEXES = [[x, f"mat {x}", VOLUME] for x in range(N_BU_MATS)]
 # Emulate some depletion time
 START = TimeStep(0, 0, 0, 0)
 END = TimeStep(2, 1, 4, 10 * hydep.constants.SECONDS_PER_DAY)
+MIDDLE = TimeStep(1, 1, 2, 5 * hydep.constants.SECONDS_PER_DAY)
 
 
 @pytest.fixture(scope="module")
@@ -47,7 +48,7 @@ def h5Destination(tmp_path, result, compositions, simpleChain):
     assert store.fp.samefile(dest)
     assert store.fp.is_absolute()
 
-    assert store.VERSION[0] == 0, "Test not updated for current file version"
+    assert store.VERSION[0] == 1, "Test not updated for current file version"
 
     # Need to add an additional step to account for zeroth time step
     store.beforeMain(
@@ -58,6 +59,14 @@ def h5Destination(tmp_path, result, compositions, simpleChain):
     store.writeCompositions(END, compositions)
 
     store.postTransport(END, result)
+
+    # Stochastic solution with particles and flux uncertainties
+    scheduled = TransportResult(
+        result.flux, result.keff, particles=1000,
+        fluxUncertainty=numpy.full(result.flux.shape, 0.01),
+    )
+    store.postTransport(MIDDLE, scheduled)
+    store.finalize(True)
     yield dest
     dest.unlink()
 
@@ -80,12 +89,15 @@ def compareHdfStore(result, timestep, h5file):
         shape = fgroup.attrs["shape"]
         assert len(shape) == 2 and shape[0] == shape[1], shape
 
-        datag = fgroup[str(index)]
-        assert datag.attrs["nnz"] == fmtx.nnz
+        position = list(fgroup["steps"][:]).index(index)
+        nnz = fgroup["nnz"][position]
+        assert nnz == fmtx.nnz
+        start = fgroup["offsets"][position]
 
-        for attr in {"data", "indices", "indptr"}:
+        assert fgroup["indptr"][position] == pytest.approx(fmtx.indptr)
+        for attr in {"data", "indices"}:
             ref = getattr(fmtx, attr)
-            actual = datag[attr][:]
+            actual = fgroup[attr][start:start + nnz]
             assert actual == pytest.approx(ref), attr
 
 
@@ -93,7 +105,7 @@ def test_hdfStore(result, simpleChain, h5Destination, compositions):
     """Test that what goes in is what is written"""
 
     with h5py.File(h5Destination, "r") as h5:
-        assert tuple(h5.attrs["fileVersion"][:]) == (0, 1)
+        assert tuple(h5.attrs["fileVersion"][:]) == (1, 1)
         assert tuple(h5.attrs["hydepVersion"][:]) == tuple(
             int(x) for x in hydep.__version__.split(".")[:3]
         )
@@ -126,6 +138,79 @@ def test_hdfStore(result, simpleChain, h5Destination, compositions):
         hydep.hdf.Store(filename=h5Destination, existOkay=False)
 
 
+def test_hdfFlushPolicy(tmp_path, result, compositions, simpleChain):
+    dest = tmp_path / "flush.h5"
+    store = hydep.hdf.Store(filename=dest, flushSteps=2, flushSeconds=1e6)
+    store.beforeMain(
+        END.coarse + 1, END.total + 1, N_GROUPS, tuple(simpleChain), BU_INDEXES,
+    )
+
+    def written(index):
+        with h5py.File(dest, "r") as h5:
+            return h5["cpuTimes"][index] == pytest.approx(result.runTime)
+
+    store.postTransport(START, result)
+    assert not written(START.total)
+
+    store.writeCompositions(MIDDLE, compositions)
+    assert written(START.total)
+
+    store.postTransport(MIDDLE, result)
+    assert not written(MIDDLE.total)
+    store.flush()
+    assert written(MIDDLE.total)
+
+    store.postTransport(END, result)
+    store.finalize(False)
+    assert written(END.total)
+    with h5py.File(dest, "r") as h5:
+        assert h5["compositions"][MIDDLE.total] == pytest.approx(
+            compositions.densities)
+        assert list(h5["fissionMatrix/steps"]) == [
+            START.total, MIDDLE.total, END.total]
+
+    with pytest.raises(ValueError):
+        hydep.hdf.Store(filename=dest, flushSteps=0)
+
+
+def test_hdfCompressedLayout(tmp_path, result, compositions, simpleChain):
+    dest = tmp_path / "compressed.h5"
+    with pytest.raises(ValueError):
+        hydep.hdf.Store(filename=dest, compression="bad")
+    with pytest.raises(ValueError):
+        hydep.hdf.Store(filename=dest, compression="lzf", compressionOpts=4)
+
+    store = hydep.hdf.Store(
+        filename=dest, compression="gzip", compressionOpts=4, shuffle=True,
+        singlePrecision=True, chunkSteps=2, chunkIsotopes=4,
+    )
+    store.beforeMain(
+        END.coarse + 1, END.total + 1, N_GROUPS, tuple(simpleChain), BU_INDEXES,
+    )
+    store.postTransport(START, result)
+    store.postTransport(MIDDLE, TransportResult(result.flux, result.keff))
+    store.writeCompositions(END, compositions)
+    store.postTransport(END, result)
+    store.finalize(True)
+
+    with hydep.hdf.Processor(dest) as processor:
+        comps = processor.compositions
+        assert comps.dtype == numpy.float32
+        assert comps.compression == "gzip"
+        assert comps.shuffle
+        assert comps.chunks == (2, N_BU_MATS, 4)
+        assert comps[END.total] == pytest.approx(compositions.densities, rel=1e-6)
+        assert processor.fluxes.chunks == (2, N_BU_MATS, N_GROUPS)
+        assert processor.keff.dtype == numpy.float64
+
+        assert processor["fissionMatrix/data"].compression == "gzip"
+        for time in [START, END]:
+            fmtx = processor.getFissionMatrix(processor.days[time.total])
+            assert (fmtx != result.fmtx).nnz == 0
+        with pytest.raises(IndexError):
+            processor.getFissionMatrix(processor.days[MIDDLE.total])
+
+
 def test_hdfProcessor(result, simpleChain, compositions, h5Destination):
 
     processor = hydep.hdf.Processor(h5Destination)
@@ -225,6 +310,15 @@ def test_hdfProcessor(result, simpleChain, compositions, h5Destination):
     with pytest.raises(ValueError):
         processor.getIsotopeIndexes(names=randomNames, zais=randomZais)
 
+    particles = processor.particles
+    assert particles.shape == (END.total + 1, )
+    assert particles[MIDDLE.total] == 1000
+    assert particles[START.total] == particles[END.total] == 0
+    fluxUnc = processor.fluxUncertainty
+    assert fluxUnc.shape == processor.fluxes.shape
+    assert fluxUnc[MIDDLE.total] == pytest.approx(0.01)
+    assert numpy.isnan(fluxUnc[END.total]).all()
+
     for time in [START, END]:
         fmtx = processor.getFissionMatrix(processor.days[time.total])
         assert fmtx.data == pytest.approx(result.fmtx.data)
@@ -271,3 +365,256 @@ def test_hdfenums():
 
     bydig = RootNames.CALENDAR.dig(SecondNames.CALENDAR_TIME, "foo")
     assert bydig == expected + "/foo"
+
+
+def test_processorSelections(result, compositions, h5Destination):
+    processor = hydep.hdf.Processor(h5Destination, cacheSize=2)
+    full = processor.compositions[:]
+    days = processor.days[[END.total, START.total]]
+
+    # Out of order and repeated selections across multiple axes
+    names = [processor.names[5], processor.names[1], processor.names[5]]
+    isos = processor.getIsotopeIndexes(names=names)
+    dens = processor.getDensities(names=names, days=days, materials=[1, 0])
+    assert dens.shape == (2, 2, 3)
+    expected = full[[END.total, START.total]][:, [1, 0]][..., isos]
+    assert dens == pytest.approx(expected)
+
+    single = processor.getDensities(names=names[0], days=days[0], materials=1)
+    assert single == pytest.approx(full[END.total, 1, isos[0]])
+
+    fluxes = processor.getFluxes(days=days, materials=0)
+    assert fluxes == pytest.approx(processor.fluxes[:][[END.total, START.total], 0])
+
+    # Cached results are copies, and least recently used are evicted
+    dens[:] = -1
+    again = processor.getDensities(names=names, days=days, materials=[1, 0])
+    assert again == pytest.approx(expected)
+    assert len(processor._cache) == 2
+    processor.getFissionMatrix(days[0])
+    assert len(processor._cache) == 2
+    processor.clearCache()
+    assert not processor._cache
+
+
+def test_decimatedCompositions(tmp_path, result, compositions, simpleChain):
+    dest = tmp_path / "decimated.h5"
+    steps = [START.total, END.total]
+    with hydep.hdf.Store(filename=dest) as store:
+        store.beforeMain(
+            END.coarse + 1, END.total + 1, N_GROUPS, tuple(simpleChain), BU_INDEXES,
+            compositionSteps=steps,
+        )
+        store.writeCompositions(START, compositions)
+        with pytest.raises(ValueError, match="not expected"):
+            store.writeCompositions(MIDDLE, compositions)
+        for step in (START, MIDDLE, END):
+            store.postTransport(step, result)
+        store.writeCompositions(
+            END, compositions._replace(densities=2 * compositions.densities)
+        )
+
+    with hydep.hdf.Processor(dest) as processor:
+        assert processor.compositions.shape == (
+            2, N_BU_MATS, len(simpleChain))
+        assert processor.compositionSteps.tolist() == steps
+        assert processor.compositionDays == pytest.approx([0, 10])
+        assert processor.getDensities(days=10) == pytest.approx(
+            2 * compositions.densities)
+        name = simpleChain[1].name
+        assert processor.getDensities(names=name, days=[10, 0]) == pytest.approx(
+            compositions.densities[:, 1] * numpy.array([[2], [1]]))
+        # Transport results are still available on the full time grid
+        assert processor.getFluxes(5) == pytest.approx(result.flux)
+        with pytest.raises(IndexError):
+            processor.getDensities(days=5)
+
+
+@pytest.mark.parametrize("maxBytes", [2**20, 8])
+def test_derivedQuantities(tmp_path, simpleChain, compositions, maxBytes):
+    dest = tmp_path / "derived.h5"
+    store = hydep.hdf.Store(filename=dest)
+    store.beforeMain(
+        END.coarse + 1, END.total + 1, N_GROUPS, tuple(simpleChain), BU_INDEXES,
+    )
+    # Remove some heavy metal at later time steps
+    for step, factor in [(START, 1), (MIDDLE, 0.9), (END, 0.8)]:
+        store.writeCompositions(
+            step, CompBundle(compositions.isotopes, compositions.densities * factor)
+        )
+    store.finalize(True)
+
+    with h5py.File(dest, "a") as h5:
+        processor = hydep.hdf.Processor(h5)
+        derived = hydep.hdf.DerivedQuantities(
+            processor, simpleChain, fissionEnergy=200e6, maxBytes=maxBytes
+        )
+        values = derived.compute()
+
+        comps = processor.compositions[:]
+        atoms = comps * 1e24 * VOLUME
+        lam = numpy.array([iso.decayConstant or 0 for iso in simpleChain])
+        energy = numpy.array([iso.decayEnergy or 0 for iso in simpleChain])
+        amass = numpy.array([iso.triplet.a for iso in simpleChain])
+        isHM = numpy.array([iso.z >= 90 for iso in simpleChain])
+
+        assert values["activity"] == pytest.approx(atoms.dot(lam))
+        assert values["decayHeat"] == pytest.approx(
+            atoms.dot(lam * energy) * hydep.constants.JOULES_PER_EV)
+        mass = atoms.dot(amass) / hydep.constants.AVOGADRO
+        assert values["mass"] == pytest.approx(mass)
+        hmMass = atoms.dot(amass * isHM) / hydep.constants.AVOGADRO
+        assert values["heavyMetalMass"] == pytest.approx(hmMass)
+
+        hmAtoms = atoms.dot(isHM)
+        joules = (hmAtoms[0] - hmAtoms) * 200e6 * hydep.constants.JOULES_PER_EV
+        burnup = joules / (hmMass[0] * 1e-3) / (1e6 * hydep.constants.SECONDS_PER_DAY)
+        assert values["burnup"][START.total] == pytest.approx(0)
+        assert values["burnup"] == pytest.approx(burnup)
+
+        group = derived.write(quantities=["decayHeat", "burnup"])
+        assert set(group) == {"decayHeat", "burnup"}
+        assert group["burnup"].attrs["units"] == "MWd/kgHM"
+        assert group["decayHeat"][:] == pytest.approx(values["decayHeat"])
+
+        with pytest.raises(ValueError):
+            derived.compute("bad quantity")
+
+        # Default fission energy weighted by initial heavy metal atoms
+        fissionQ = numpy.array([
+            max((r.Q for r in iso.reactions if r.mt == 18), default=0)
+            for iso in simpleChain
+        ])
+        weights = atoms[0].sum(axis=0) * (fissionQ > 0)
+        default = hydep.hdf.DerivedQuantities(processor, simpleChain, maxBytes=maxBytes)
+        if weights.any():
+            expected = weights.dot(fissionQ) / weights.sum()
+        else:
+            expected = default._DEFAULT_FISSION_ENERGY
+        assert default.fissionEnergy == pytest.approx(expected)
+        values = default.compute("heavyMetalMass")
+        assert values["heavyMetalMass"] == pytest.approx(hmMass)
+
+
+def test_swmrMonitoring(tmp_path, result, compositions, simpleChain):
+    dest = tmp_path / "swmr.h5"
+    with pytest.raises(ValueError):
+        hydep.hdf.Store(filename=dest, libver="earliest", swmr=True)
+
+    store = hydep.hdf.Store(filename=dest, flushSteps=1, swmr=True)
+    store.beforeMain(
+        END.coarse + 1, END.total + 1, N_GROUPS, tuple(simpleChain), BU_INDEXES,
+    )
+    assert store.lastWrittenStep == -1
+
+    processor = hydep.hdf.Processor(dest, swmr=True)
+    assert processor.lastWrittenStep == -1
+    assert processor.refresh() == slice(0, 0)
+
+    store.postTransport(START, result)
+    store.writeCompositions(START, compositions)
+    assert store.lastWrittenStep == START.total
+    new = processor.refresh()
+    assert new == slice(START.total, START.total + 1)
+    assert processor.keff[new][0] == pytest.approx(result.keff)
+
+    store.postTransport(MIDDLE, result)
+    store.postTransport(END, result)
+    new = processor.refresh()
+    assert new == slice(START.total + 1, END.total + 1)
+    assert processor.days[END.total] == pytest.approx(
+        END.currentTime / hydep.constants.SECONDS_PER_DAY)
+    assert processor.getFluxes(processor.days[END.total]) == pytest.approx(result.flux)
+    assert (processor.getFissionMatrix(processor.days[END.total]) != result.fmtx).nnz == 0
+
+    # Optional datasets exist from the start
+    assert processor.particles is not None
+    assert processor.fluxUncertainty is not None
+    store.finalize(True)
+    processor._root.close()
+
+
+def test_hdfAppend(tmp_path, result, compositions, simpleChain):
+    dest = tmp_path / "append.h5"
+    setup = (END.coarse + 1, END.total + 1, N_GROUPS, tuple(simpleChain), BU_INDEXES)
+    with hydep.hdf.Store(filename=dest) as store:
+        assert not store.append
+        store.beforeMain(*setup)
+        for step in (START, MIDDLE):
+            store.postTransport(step, result)
+            store.writeCompositions(step, compositions)
+
+    with hydep.hdf.Store(filename=dest, append=True) as store:
+        assert store.append
+        with pytest.raises(ValueError, match="isotopes"):
+            store.beforeMain(*setup[:3], tuple(simpleChain)[::-1], BU_INDEXES)
+        store.beforeMain(*setup)
+        assert store.lastWrittenStep == MIDDLE.total
+        store.postTransport(END, result)
+        store.writeCompositions(
+            END, compositions._replace(densities=2 * compositions.densities)
+        )
+
+    with hydep.hdf.Processor(dest) as processor:
+        assert processor.getDensities(days=0) == pytest.approx(compositions.densities)
+        assert processor.getDensities(days=10) == pytest.approx(
+            2 * compositions.densities)
+
+    # Appending to a missing file creates a new file
+    with hydep.hdf.Store(filename=tmp_path / "new.h5", append=True) as store:
+        assert not store.append
+
+
+def test_hdfTimings(tmp_path, result, compositions, simpleChain):
+    dest = tmp_path / "timing.h5"
+    timings = {
+        "hf.solve": numpy.array([[0, 2.0, 1.0, 1], [END.total, 3.0, 2.0, 1]]),
+        "store": numpy.array([[MIDDLE.total, 0.5, 0.25, 3]]),
+    }
+    with hydep.hdf.Store(filename=dest) as store:
+        store.beforeMain(
+            END.coarse + 1, END.total + 1, N_GROUPS, tuple(simpleChain), BU_INDEXES
+        )
+        store.postTransport(START, result)
+        store.writeTimings(timings)
+
+    with hydep.hdf.Processor(dest) as processor:
+        found = processor.getTimings()
+    assert sorted(found) == ["hf.solve", "store"]
+    expected = numpy.zeros((END.total + 1, 3))
+    expected[[0, END.total]] = [[2.0, 1.0, 1], [3.0, 2.0, 1]]
+    assert found["hf.solve"] == pytest.approx(expected)
+    assert found["store"][MIDDLE.total] == pytest.approx([0.5, 0.25, 3])
+
+    # Appended timings only replace the steps that were recorded
+    with hydep.hdf.Store(filename=dest, append=True) as store:
+        store.beforeMain(
+            END.coarse + 1, END.total + 1, N_GROUPS, tuple(simpleChain), BU_INDEXES
+        )
+        store.writeTimings({"hf.solve": numpy.array([[END.total, 4.0, 3.0, 1]])})
+
+    with hydep.hdf.Processor(dest) as processor:
+        found = processor.getTimings()
+    expected[END.total] = [4.0, 3.0, 1]
+    assert found["hf.solve"] == pytest.approx(expected)
+
+
+def test_hdfMemory(tmp_path, result, simpleChain):
+    dest = tmp_path / "memory.h5"
+    with hydep.hdf.Store(filename=dest) as store:
+        store.beforeMain(
+            END.coarse + 1, END.total + 1, N_GROUPS, tuple(simpleChain), BU_INDEXES
+        )
+        store.postTransport(START, result)
+        store.writeMemory(
+            {"hf.solve": numpy.array([[0, 2048], [END.total, 4096]])},
+            {"compositions": numpy.array([[MIDDLE.total, 512]])},
+        )
+
+    with hydep.hdf.Processor(dest) as processor:
+        phases, arrays = processor.getMemory()
+    expected = numpy.zeros(END.total + 1, dtype=int)
+    expected[[0, END.total]] = [2048, 4096]
+    assert phases["hf.solve"].tolist() == expected.tolist()
+    assert arrays["compositions"][MIDDLE.total] == 512
+    assert arrays["compositions"].sum() == 512
@@ -216,3 +216,32 @@ def test_extrapolation(xsArray, order):
             assert rate == pytest.approx(
                 xsArray.data[0, xsArray.index(zai, rxn)] * weight * flux[0, 0]
             )
+
+
+def test_missingReactions(xsArray):
+    bank = DataBank(
+        nsteps=3, nmaterials=xsArray.data.shape[0], rxnIndex=xsArray.index,
+    )
+
+    # No previous data to replace missing reactions
+    first = xsArray.data.copy()
+    first[0, 1] = numpy.nan
+    with pytest.raises(ValueError, match="missing"):
+        bank.push(0, MaterialDataArray(xsArray.index, first))
+    bank.push(0, MaterialDataArray(xsArray.index, xsArray.data))
+
+    second = xsArray.data * 2
+    second[0, 1] = numpy.nan
+    bank.push(1, MaterialDataArray(xsArray.index, second))
+
+    # Missing reactions take the most recent values
+    third = xsArray.data * 3
+    third[:, 2] = numpy.nan
+    bank.push(2, MaterialDataArray(xsArray.index, third))
+    d2 = bank.at(2).data
+    assert d2[:, 2] == pytest.approx(second[:, 2])
+    assert d2[:, 3] == pytest.approx(third[:, 3])
+    assert bank.at(1).data[0, 1] == pytest.approx(xsArray.data[0, 1])
+    # Pushed data is not modified
+    assert numpy.isnan(second[0, 1])
+    assert not numpy.isnan(bank.at(3).data).any()